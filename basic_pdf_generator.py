@@ -6,80 +6,37 @@
 完全避免Unicode字符，确保兼容性
 """
 
-from fpdf import FPDF
 import json
-import pandas as pd
-from datetime import datetime
 import os
 
+from data_cleaner_pro.report.renderer import ReportPDF, resolve_style
+
+
+class BasicPDFReport(ReportPDF):
+    """
+    基础PDF报告生成器，使用ASCII字符（统一报告引擎的 basic 样式）
+
+    标点和带重音的字母转换为 ASCII；遇到中文时改用缓存的中文字体，找不到字体时才替换为空格。
+    """
 
-class BasicPDFReport(FPDF):
-    """基础PDF报告生成器，完全使用ASCII字符"""
-    
     def __init__(self, title="Data Cleaner Pro Report"):
-        super().__init__()
-        self.title = title
-        self.set_auto_page_break(auto=True, margin=15)
-        
-    def header(self):
-        """页眉"""
-        self.set_font('Arial', 'B', 16)
-        self.cell(0, 10, self.title, 0, 1, 'C')
-        self.set_font('Arial', '', 10)
-        self.cell(0, 5, f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", 0, 1, 'C')
-        self.ln(5)
-    
-    def footer(self):
-        """页脚"""
-        self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
-        self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
-    
+        super().__init__(title, resolve_style('basic'))
+
     def add_title(self, text, size=14):
         """添加标题"""
-        self.set_font('Arial', 'B', size)
-        self.cell(0, 10, text, 0, 1)
-        self.ln(2)
-    
+        self.heading(text, size=size)
+
     def add_text(self, text):
         """添加文本"""
-        self.set_font('Arial', '', 11)
-        # 确保文本只包含ASCII字符
-        ascii_text = ''.join(c if ord(c) < 128 else ' ' for c in text)
-        self.multi_cell(0, 6, ascii_text)
-        self.ln(3)
-    
+        self.paragraph(text)
+
     def add_table(self, headers, data):
         """添加表格"""
-        # 计算列宽
-        num_cols = len(headers)
-        col_width = 190 / num_cols
-        
-        # 表头
-        self.set_fill_color(200, 220, 255)
-        self.set_font('Arial', 'B', 10)
-        for header in headers:
-            self.cell(col_width, 7, str(header), border=1, align='C', fill=True)
-        self.ln()
-        
-        # 表格内容
-        self.set_font('Arial', '', 10)
-        fill = False
-        for row in data:
-            for cell in row:
-                self.cell(col_width, 6, str(cell), border=1, align='C', fill=fill)
-            self.ln()
-            fill = not fill
-        self.ln(5)
-    
+        self.table(headers, data)
+
     def add_list(self, items):
         """添加列表"""
-        self.set_font('Arial', '', 11)
-        for item in items:
-            self.cell(10, 6, '-')
-            ascii_item = ''.join(c if ord(c) < 128 else ' ' for c in str(item))
-            self.multi_cell(0, 6, ascii_item)
-        self.ln(3)
+        self.bullets(items)
 
 
 def create_test_data():
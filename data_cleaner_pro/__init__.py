@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+"""
+Data Cleaner Pro
+智能数据清洗工具
+"""
+
+import importlib
+import importlib.util
+
+__version__ = '0.1.0'
+
+from .compiler import compile_record_cleaner, compile_batch_cleaner, clean_records
+from .columnar import ColumnTable
+
+# DataFrame 引擎依赖 pandas，轻量部署中可以不安装
+PANDAS_AVAILABLE = importlib.util.find_spec('pandas') is not None
+
+# pandas 相关接口按需导入，import data_cleaner_pro 本身不加载 pandas
+_LAZY_ATTRS = {
+    'DataCleaner': '.cleaner',
+    'RULES': '.rules',
+    'rule': '.rules',
+    'get_rule': '.rules',
+    'clean_csv': '.streaming',
+    'learn_spec': '.learning',
+}
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""
+内存预算
+把 '4GB' 这样的预算换算为块大小、进程数和去重状态的内存上限
+"""
+
+import math
+import os
+import re
+
+
+SIZE_UNITS = {'': 1, 'B': 1, 'K': 1024, 'KB': 1024, 'M': 1024 ** 2, 'MB': 1024 ** 2,
+              'G': 1024 ** 3, 'GB': 1024 ** 3, 'T': 1024 ** 4, 'TB': 1024 ** 4}
+
+# 精确去重时每个已见键（64 位哈希放在 set 中）约占的字节数
+SEEN_KEY_BYTES = 72
+
+# 规则执行时额外分配的内存约为数据块本身的倍数（DataFrame 副本和输出列）
+RULE_MEMORY_FACTOR = 2.0
+
+# 预算中留给去重等跨块状态的比例，超出后溢写到磁盘
+STATE_SHARE = 0.25
+
+MIN_CHUNKSIZE = 1000
+MAX_CHUNKSIZE = 200000
+
+
+def parse_size(size):
+    """解析内存大小，支持整数字节数或 '512MB'、'4GB' 这样的字符串"""
+    if isinstance(size, (int, float)):
+        return int(size)
+    match = re.fullmatch(r'\s*([\d.]+)\s*([A-Za-z]*)\s*', str(size))
+    if match is None or match[2].upper() not in SIZE_UNITS:
+        raise ValueError(f"无效的内存大小: {size}")
+    return int(float(match[1]) * SIZE_UNITS[match[2].upper()])
+
+
+def estimate_memory(frame_bytes_per_row, rule_bytes_per_row, state_bytes, chunksize, workers,
+                    queue_size=None):
+    """
+    clean_csv 的内存估算：在途数据块 + 每个进程清洗时的峰值 + 写出阶段的跨块状态
+
+    Args:
+        frame_bytes_per_row: 数据块 DataFrame 每行字节数
+        rule_bytes_per_row: 单条规则执行时每行额外分配的峰值字节数
+        state_bytes: 去重等跨块状态的字节数
+    """
+    queue_size = queue_size or workers * 2
+    chunk_bytes = frame_bytes_per_row * chunksize
+    return int((queue_size + workers) * chunk_bytes + workers * rule_bytes_per_row * chunksize + state_bytes)
+
+
+def suggest_settings(frame_bytes_per_row, rule_bytes_per_row, state_bytes, max_memory,
+                     max_workers=None, parallel_seconds=None, serial_seconds=None):
+    """
+    在内存预算内选择进程数和块大小
+
+    进程数不超过 max_workers（默认 CPU 核数）；给出耗时时也不超过可并行部分与串行部分
+    （读取、有状态规则、写出）之比，再多的进程只会排队等写出线程。
+    预算放不下最小块时先减少进程数，然后在预算内取尽量大的块。
+    """
+    workers = max_workers or os.cpu_count() or 1
+    if parallel_seconds is not None and serial_seconds:
+        workers = min(workers, math.ceil(parallel_seconds / serial_seconds))
+    workers = max(1, workers)
+    while True:
+        budget = max_memory - state_bytes
+        per_row = estimate_memory(frame_bytes_per_row, rule_bytes_per_row, 0, 1, workers)
+        chunksize = int(budget / per_row) if per_row > 0 and budget > 0 else 0
+        if chunksize >= MIN_CHUNKSIZE or workers == 1:
+            break
+        workers -= 1
+    chunksize = max(MIN_CHUNKSIZE, min(MAX_CHUNKSIZE, chunksize))
+    return {'chunksize': chunksize, 'workers': workers}
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+
+"""
+基于内容寻址的结果缓存
+键 = 输入文件字节哈希 + 规范化的规则配置 + 引擎版本与参数；命中时直接返回缓存的清洗结果和概况
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'DATA_CLEANER_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'data-cleaner'))
+
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_digest(path):
+    """分块计算文件内容哈希（blake2b）"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(input_path, kind, spec=None, options=None):
+    """
+    计算缓存键
+
+    Args:
+        kind: 结果类型，如 'clean' / 'profile'
+        spec: 规则配置，保留规则顺序，只对每条规则的参数按键排序
+        options: 其他影响输出的参数（引擎、块大小、编码等）
+    """
+    from . import __version__
+    from .checkpoint import ordered_spec
+
+    spec = ordered_spec(spec) if spec is not None else None
+    meta = json.dumps([kind, __version__, spec, options], ensure_ascii=False, sort_keys=True, default=str)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(file_digest(input_path).encode('ascii'))
+    digest.update(meta.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    本地磁盘结果缓存
+
+    每个条目是 <dir>/<key[:2]>/<key>/ 目录，内含结果文件和 meta.json，
+    写入时从同一文件系统的临时目录 rename 过来，读者不会看到写了一半的条目。
+    命中时刷新目录 mtime，超过容量上限时按 mtime 从旧到新淘汰（LRU）。
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = str(path or DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+
+    def entry_path(self, key):
+        return os.path.join(self.path, key[:2], key)
+
+    def get(self, key):
+        """
+        查询缓存
+
+        Returns:
+            (条目目录, meta) 或 None
+        """
+        entry = self.entry_path(key)
+        try:
+            with open(os.path.join(entry, 'meta.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        os.utime(entry)
+        return entry, meta
+
+    def put(self, key, files=None, meta=None):
+        """
+        写入缓存条目
+
+        Args:
+            files: {条目内文件名: 源文件路径}
+            meta: 可 JSON 序列化的元数据
+        """
+        entry = self.entry_path(key)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.tmp-', dir=os.path.dirname(entry))
+        try:
+            for name, source in (files or {}).items():
+                shutil.copyfile(source, os.path.join(staging, name))
+            with open(os.path.join(staging, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump(meta or {}, f, ensure_ascii=False)
+            if os.path.exists(entry):
+                shutil.rmtree(entry)
+            os.rename(staging, entry)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self.evict()
+        return entry
+
+    def entries(self):
+        """返回 [(mtime, 大小, 目录)]"""
+        result = []
+        if not os.path.isdir(self.path):
+            return result
+        for prefix in os.listdir(self.path):
+            bucket = os.path.join(self.path, prefix)
+            # 同一目录下还有字体、章节等子缓存（fonts/、sections/），只扫描两位前缀的分桶
+            if len(prefix) != 2 or not os.path.isdir(bucket):
+                continue
+            for name in os.listdir(bucket):
+                entry = os.path.join(bucket, name)
+                if name.startswith('.tmp-') or not os.path.isdir(entry):
+                    continue
+                size = sum(e.stat().st_size for e in os.scandir(entry) if e.is_file())
+                result.append((os.stat(entry).st_mtime, size, entry))
+        return result
+
+    def evict(self):
+        """超出容量上限时淘汰最久未使用的条目"""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+def cached_output(input_path, output_path, kind, build, spec=None, options=None, cache=None):
+    """
+    带缓存地生成单个输出文件
+
+    Args:
+        kind: 结果类型，参与缓存键
+        build: 无参函数，生成 output_path 并返回可 JSON 序列化的统计
+        cache: ResultCache，默认使用 DEFAULT_CACHE_DIR
+
+    Returns:
+        统计信息，cache_hit 表示是否命中缓存
+    """
+    cache = cache or ResultCache()
+    key = cache_key(input_path, kind, spec, options)
+
+    hit = cache.get(key)
+    if hit is not None:
+        entry, stats = hit
+        shutil.copyfile(os.path.join(entry, 'output'), output_path)
+        return dict(stats, cache_hit=True)
+
+    stats = build() or {}
+    cache.put(key, {'output': output_path}, stats)
+    return dict(stats, cache_hit=False)
+
+
+def cached_clean(input_path, output_path, spec, cache=None, clean=None, **options):
+    """
+    带缓存的清洗
+
+    Args:
+        clean: 实际清洗函数 clean(input_path, output_path, spec, **options) -> stats，
+            默认为 streaming.clean_csv
+        options: 传给清洗函数的参数，同时参与缓存键计算
+
+    Returns:
+        清洗统计，cache_hit 表示是否命中缓存
+    """
+    if clean is None:
+        from .streaming import clean_csv as clean
+    # 断点、并发度和规范化字典不影响输出内容，不参与缓存键
+    key_options = {k: v for k, v in options.items()
+                   if k not in ('checkpoint', 'resume', 'workers', 'queue_size', 'normdict')}
+    key_options['clean'] = f"{clean.__module__}.{clean.__qualname__}"
+    return cached_output(input_path, output_path, 'clean',
+                         lambda: clean(input_path, output_path, spec, **options),
+                         spec=spec, options=key_options, cache=cache)
+
+
+def cached_profile(input_path, cache=None, encoding='utf-8', spec=None):
+    """带缓存的数据概况统计，给出 spec 时统计清洗度量（metrics.collect_metrics）"""
+    cache = cache or ResultCache()
+    key = cache_key(input_path, 'profile', spec=spec, options={'encoding': encoding})
+    hit = cache.get(key)
+    if hit is not None:
+        return hit[1]
+    if spec is None:
+        from .profiling import profile_csv
+        profile = profile_csv(input_path, encoding=encoding)
+    else:
+        from .metrics import collect_metrics
+        profile = collect_metrics(input_path, spec, encoding=encoding)
+    cache.put(key, meta=profile)
+    return profile
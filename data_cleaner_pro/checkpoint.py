@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+"""
+分块清洗的断点续跑
+每写完一个数据块提交一次断点：输入行偏移、输出字节偏移、去重与填充状态
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+CHECKPOINT_VERSION = 1
+
+
+def ordered_spec(spec):
+    """
+    规则配置的可序列化形式
+
+    规则按顺序执行，顺序不同结果可能不同，因此顶层保留为有序列表，
+    序列化时只对每条规则的参数按键排序。
+    """
+    return [[column, options] for column, options in spec.items()]
+
+
+def spec_hash(spec):
+    """规则配置的稳定哈希，规则顺序不同哈希不同"""
+    text = json.dumps(ordered_spec(spec), ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def write_atomic(path, data):
+    """写临时文件后 rename，保证断点文件要么是旧版本要么是新版本"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class Checkpoint:
+    """
+    断点文件
+
+    主文件为 JSON，原子替换；去重已见键较大，按列追加写到 <path>.<n>.seen，
+    主文件记录每个日志的有效长度，续跑时截断到该长度再加载。
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+
+    def seen_path(self, index):
+        return f"{self.path}.{index}.seen"
+
+    def load(self):
+        """读取断点，不存在时返回 None"""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'r', encoding='utf-8') as f:
+            record = json.load(f)
+        if record.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f"不支持的断点版本: {record.get('version')}")
+        return record
+
+    def restore(self, record, state):
+        """把断点中的去重与填充状态恢复到 StreamState"""
+        for index, (column, length) in enumerate(record['seen']):
+            path = self.seen_path(index)
+            with open(path, 'r+b') as f:
+                f.truncate(length)
+            state.seen[column].update(np.fromfile(path, dtype=np.uint64))
+        state.fill_stats = {column: list(stats) for column, stats in record['fill_stats'].items()}
+
+    def commit(self, record, state):
+        """追加新的已见键并原子写入断点主文件"""
+        seen = []
+        for index, column in enumerate(state.seen):
+            added = state.added.pop(column, [])
+            with open(self.seen_path(index), 'ab') as f:
+                if added:
+                    f.write(np.asarray(added, dtype=np.uint64).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                seen.append([column, f.tell()])
+        record = dict(record, version=CHECKPOINT_VERSION, seen=seen,
+                      fill_stats=state.fill_stats)
+        write_atomic(self.path, json.dumps(record, ensure_ascii=False).encode('utf-8'))
+
+    def clear(self):
+        """任务完成后删除断点文件"""
+        index = 0
+        while os.path.exists(self.seen_path(index)):
+            os.remove(self.seen_path(index))
+            index += 1
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+"""
+DataCleaner 主入口
+"""
+
+import numpy as np
+import pandas as pd
+
+from .rules import get_rule
+
+
+def apply_rule(df, column, func, params, store=None):
+    """执行单条规则，有规范化字典时逐值规则先查表"""
+    if store is not None and getattr(func, 'cacheable', False):
+        from .normdict import apply_cached
+        return apply_cached(df, column, func, params, store)
+    return func(df, column, **params)
+
+
+def apply_canonical(df, column, func, params, store=None):
+    """
+    只对不是规范形式的行执行完整规则
+
+    规范形式的行由规则的 canonical 判定直接给出输出，其余行单独清洗后按位置写回
+    （不按索引标签对齐，索引有重复值时同样适用）。
+    """
+    raw = df[column].astype('string')
+    found = func.canonical(raw, **params)
+    if found is None:
+        return apply_rule(df, column, func, params, store)
+    mask, values = found
+
+    rest = df.loc[~mask, [column]].copy()
+    cleaned = apply_rule(rest, column, func, dict(params, output_col=None), store)[column]
+    result = np.empty(len(df), dtype=object)
+    result[mask] = values
+    result[~mask] = cleaned.to_numpy(dtype=object)
+    df[params.get('output_col') or column] = pd.Series(result, index=df.index).astype(cleaned.dtype)
+    return df
+
+
+def apply_step(df, column, func, params, store=None):
+    """执行 prepare_spec 解析出的一步，按规则声明选择快速路径或规范化字典"""
+    params = dict(params)
+    fast_path = params.pop('fast_path', True)
+    if fast_path and getattr(func, 'canonical', None) is not None:
+        return apply_canonical(df, column, func, params, store)
+    return apply_rule(df, column, func, params, store)
+
+
+def prepare_spec(spec):
+    """
+    解析规则配置
+
+    Returns:
+        [(列名, 规则函数, 参数)]，可以缓存后反复交给 DataCleaner.apply
+    """
+    prepared = []
+    for column, options in spec.items():
+        options = dict(options)
+        prepared.append((column, get_rule(options.pop('method')), options))
+    return prepared
+
+
+class DataCleaner:
+    """数据清洗器，按规则配置批量清洗 DataFrame"""
+
+    def __init__(self, df, normdict=None):
+        """
+        Args:
+            df: 待清洗的 DataFrame
+            normdict: 可选的规范化字典（路径或 NormalizationDict），逐值规则先查表再解析
+
+        规则参数 fast_path=False 可关闭该规则的规范形式快速路径
+        """
+        self.df = df
+        self.normdict = normdict
+
+    def auto_clean(self, spec):
+        """
+        一键清洗
+
+        Args:
+            spec: {列名: {'method': 规则名, 其他参数...}}，按字典顺序依次执行
+
+        Returns:
+            清洗后的 DataFrame（不修改原始数据）
+        """
+        return self.apply(prepare_spec(spec))
+
+    def apply(self, prepared):
+        """执行 prepare_spec 解析好的规则"""
+        df = self.df.copy()
+        store = None
+        if self.normdict is not None:
+            from .normdict import open_normdict
+            store = open_normdict(self.normdict)
+        for column, func, params in prepared:
+            df = apply_step(df, column, func, params, store)
+        return df
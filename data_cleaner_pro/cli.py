@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+
+"""
+data-cleaner 命令行入口
+
+子命令：clean / learn / profile / report / bench / daemon / submit
+pandas、NumPy、fpdf 只在需要它们的子命令里导入，保证 cron 和管道中频繁调用时启动足够快
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import time
+
+from .cache import DEFAULT_CACHE_DIR
+
+# 电商订单默认清洗规则
+DEFAULT_SPEC = {
+    '价格': {'method': 'extract_number', 'output_col': '价格_clean'},
+    '购买时间': {'method': 'standardize_datetime', 'format': '%Y-%m-%d %H:%M:%S', 'output_col': '购买时间_clean'},
+    '手机号': {'method': 'validate_phone', 'country_code': 'CN', 'output_col': '手机号_valid'},
+    '订单号': {'method': 'deduplicate', 'keep': 'first'}
+}
+
+
+def load_spec(path):
+    """读取 JSON 规则配置，未指定时使用默认电商规则"""
+    if not path:
+        return DEFAULT_SPEC
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def print_json(data):
+    print(json.dumps(data, ensure_ascii=False, indent=2))
+
+
+def default_engine():
+    """有 pandas 时默认使用 DataFrame 引擎，否则使用列式引擎"""
+    from . import PANDAS_AVAILABLE
+    return 'pandas' if PANDAS_AVAILABLE else 'columnar'
+
+
+def numeric_columns(spec):
+    """列式引擎需要按数值读入的列（均值填充）"""
+    return [c for c, o in spec.items() if o['method'] == 'fillna' and o.get('strategy') == 'mean']
+
+
+def clean_columnar(input_path, output_path, spec, encoding):
+    """用不依赖 pandas 的列式引擎清洗"""
+    from .columnar import ColumnTable
+
+    table = ColumnTable.from_csv(input_path, encoding=encoding, numeric=numeric_columns(spec))
+    rows_in = len(table)
+    table.auto_clean(spec)
+    table.to_csv(output_path, encoding=encoding)
+    return {'rows_in': rows_in, 'rows_out': len(table)}
+
+
+def make_cache(args):
+    """--cache 指定时返回结果缓存，否则返回 None"""
+    if not args.cache:
+        return None
+    from .cache import ResultCache
+    return ResultCache(args.cache)
+
+
+def cmd_clean(args):
+    """清洗 CSV 文件"""
+    spec = load_spec(args.spec)
+    output = args.output or f"{os.path.splitext(args.input)[0]}_cleaned.csv"
+    engine = args.engine or default_engine()
+    cache = make_cache(args)
+
+    if args.dry_run:
+        from .dryrun import dry_run
+        print_json(dry_run(args.input, spec, sample_size=args.sample_size, encoding=args.encoding,
+                           max_memory=args.max_memory))
+        return 0
+
+    started = time.perf_counter()
+    if engine == 'columnar':
+        if args.gate:
+            raise ValueError("列式引擎不支持质量闸门，请使用 --engine pandas")
+        options = {'encoding': args.encoding}
+        clean = clean_columnar
+    else:
+        from .gates import parse_gate
+        from .streaming import clean_csv
+        options = {'chunksize': args.chunksize, 'workers': args.workers, 'encoding': args.encoding,
+                   'checkpoint': args.checkpoint, 'resume': args.resume, 'normdict': args.normdict,
+                   'max_memory': args.max_memory}
+        if args.gate:
+            options['gates'] = [parse_gate(text) for text in args.gate]
+        clean = clean_csv
+    try:
+        if cache is None:
+            stats = clean(args.input, output, spec, **options)
+        else:
+            from .cache import cached_clean
+            stats = cached_clean(args.input, output, spec, cache=cache, clean=clean, **options)
+    except ValueError as e:
+        # 质量闸门未通过时输出问题概况，供排查上传文件
+        if hasattr(e, 'profile'):
+            print_json(e.profile)
+        raise
+    stats['engine'] = engine
+    stats['output'] = output
+    stats['elapsed_seconds'] = time.perf_counter() - started
+    print_json(stats)
+    return 0
+
+
+def cmd_learn(args):
+    """抽样学习解析计划，写回规则配置"""
+    from .learning import learn_csv
+
+    spec = load_spec(args.spec)
+    learned, report = learn_csv(args.input, spec, sample_rows=args.sample_rows, encoding=args.encoding)
+    output = args.output or args.spec
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(learned, f, ensure_ascii=False, indent=2)
+        print_json(report)
+    else:
+        print_json(learned)
+    return 0
+
+
+def cmd_profile(args):
+    """输出数据概况"""
+    cache = make_cache(args)
+    spec = load_spec(args.spec) if args.spec else None
+    if cache is not None:
+        from .cache import cached_profile
+        profile = cached_profile(args.input, cache=cache, encoding=args.encoding, spec=spec)
+    elif spec is not None:
+        from .metrics import collect_metrics
+        profile = collect_metrics(args.input, spec, encoding=args.encoding)
+    else:
+        from .profiling import profile_csv
+        profile = profile_csv(args.input, encoding=args.encoding)
+    if args.pdf:
+        from .report.renderer import get_renderer
+        from .report.templates import profile_report
+        get_renderer('cjk').render(profile_report(profile, os.path.basename(args.input)), args.pdf)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(profile, f, ensure_ascii=False, indent=2)
+    else:
+        print_json(profile)
+    return 0
+
+
+def build_report(kind, path):
+    """按报告类型读取输入并生成版式模型"""
+    from .report.templates import cleaning_report, ecommerce_report
+
+    if kind == 'ecommerce' and not path.endswith('.json'):
+        from .metrics import collect_metrics
+        return ecommerce_report(collect_metrics(path))
+    # 测试结果 JSON，或 profile --spec 输出的度量
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return ecommerce_report(data) if kind == 'ecommerce' else cleaning_report(data)
+
+
+def cmd_report(args):
+    """生成 PDF 报告"""
+    from .report.renderer import get_renderer
+
+    output = args.output or ('ecommerce_cleaning_report.pdf' if args.kind == 'ecommerce'
+                             else 'data_cleaner_pro_report.pdf')
+
+    def generate(path, output, cache=None):
+        get_renderer('cjk').render(build_report(args.kind, path), output, cache=cache)
+        print(f"PDF报告已生成: {output}")
+        return output
+
+    cache = make_cache(args)
+    if cache is None:
+        generate(args.input, output)
+    else:
+        from .cache import cached_output
+        from .report.sections import SectionCache
+        # 输入变化时整份 PDF 需要重新生成，未变化的章节仍复用缓存的页面内容
+        generate = functools.partial(generate, cache=SectionCache(os.path.join(cache.path, 'sections')))
+        # 输入数据和报告类型不变时直接复用上次生成的 PDF
+        cached_output(args.input, output, 'report', lambda: {'output': generate(args.input, output)},
+                      options={'kind': args.kind}, cache=cache)
+    return 0
+
+
+def cmd_bench(args):
+    """对给定数据重复执行清洗，输出吞吐量"""
+    spec = load_spec(args.spec)
+    engine = args.engine or default_engine()
+
+    timings = []
+    rows = 0
+    for _ in range(args.repeat):
+        if engine == 'columnar':
+            from .columnar import ColumnTable
+            started = time.perf_counter()
+            table = ColumnTable.from_csv(args.input, encoding=args.encoding, numeric=numeric_columns(spec))
+            loaded = time.perf_counter()
+            table.auto_clean(spec)
+            rows = len(table)
+        else:
+            import pandas as pd
+            from .cleaner import DataCleaner
+            started = time.perf_counter()
+            df = pd.read_csv(args.input, dtype=str, encoding=args.encoding)
+            loaded = time.perf_counter()
+            DataCleaner(df).auto_clean(spec)
+            rows = len(df)
+        finished = time.perf_counter()
+        timings.append((loaded - started, finished - loaded))
+
+    read_seconds, clean_seconds = min(timings, key=lambda t: t[0] + t[1])
+    result = {
+        'engine': engine,
+        'rows': rows,
+        'repeat': args.repeat,
+        'read_seconds': read_seconds,
+        'clean_seconds': clean_seconds,
+        'rows_per_second': rows / clean_seconds if clean_seconds else None,
+        'timings': [list(t) for t in timings],
+    }
+    if args.pdf:
+        from .report.renderer import get_renderer
+        from .report.templates import bench_report
+        get_renderer('cjk').render(bench_report(result), args.pdf)
+    print_json(result)
+    return 0
+
+
+def cmd_daemon(args):
+    """启动常驻清洗守护进程"""
+    from .daemon import serve
+
+    print(f"data-cleaner 守护进程监听: {args.socket}", file=sys.stderr)
+    serve(args.socket, workers=args.workers)
+    return 0
+
+
+def cmd_submit(args):
+    """把清洗任务提交给守护进程"""
+    from .daemon import submit
+
+    spec = load_spec(args.spec)
+    for event in submit(args.input, spec, args.output, socket_path=args.socket, encoding=args.encoding):
+        if event['event'] == 'data':
+            sys.stdout.write(event['text'])
+        elif event['event'] == 'error':
+            print(f"错误: {event['message']}", file=sys.stderr)
+            return 1
+        elif event['event'] == 'done':
+            # 未指定输出文件时标准输出是清洗结果，统计信息写到标准错误
+            stream = sys.stdout if args.output else sys.stderr
+            print(json.dumps(event['stats'], ensure_ascii=False), file=stream)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='data-cleaner', description='Data Cleaner Pro 命令行工具')
+    parser.add_argument('--encoding', default='utf-8', help='输入输出编码')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    clean = commands.add_parser('clean', help='清洗 CSV 文件')
+    clean.add_argument('input')
+    clean.add_argument('-o', '--output')
+    clean.add_argument('--spec', help='JSON 规则配置文件')
+    clean.add_argument('--engine', choices=['pandas', 'columnar'])
+    clean.add_argument('--chunksize', type=int, help='每块行数，默认 50000 或按 --max-memory 自动确定')
+    clean.add_argument('--max-memory', help="内存预算，如 '4GB'")
+    clean.add_argument('--workers', type=int)
+    clean.add_argument('--checkpoint', help='断点文件路径')
+    clean.add_argument('--resume', action='store_true', help='从断点继续')
+    clean.add_argument('--dry-run', action='store_true', help='抽样试运行，估算耗时和内存并建议块大小与进程数')
+    clean.add_argument('--sample-size', type=int, default=10000, help='试运行的样本行数')
+    clean.add_argument('--gate', action='append', help="质量闸门，如 '价格:invalid_ratio<=0.3'，可重复指定")
+    clean.add_argument('--normdict', help='规范化字典路径（SQLite），跨运行复用已解析的值')
+    clean.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_DIR, help='启用结果缓存，可指定缓存目录')
+    clean.set_defaults(func=cmd_clean)
+
+    learn = commands.add_parser('learn', help='抽样学习解析计划并写回规则配置')
+    learn.add_argument('input')
+    learn.add_argument('--spec', help='JSON 规则配置文件，未指定 -o 时原地更新')
+    learn.add_argument('-o', '--output', help='学习后的规则配置输出路径')
+    learn.add_argument('--sample-rows', type=int, default=100000)
+    learn.set_defaults(func=cmd_learn)
+
+    profile = commands.add_parser('profile', help='输出数据概况')
+    profile.add_argument('input')
+    profile.add_argument('-o', '--output')
+    profile.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_DIR, help='启用结果缓存，可指定缓存目录')
+    profile.add_argument('--spec', help='同时按规则清洗，统计每条规则的问题行数、修复行数和耗时')
+    profile.add_argument('--pdf', help='同时生成带图表的 PDF 概况报告')
+    profile.set_defaults(func=cmd_profile)
+
+    report = commands.add_parser('report', help='生成 PDF 报告')
+    report.add_argument('input', help='测试结果 JSON、电商数据 CSV 或 profile --spec 输出的度量 JSON')
+    report.add_argument('-o', '--output')
+    report.add_argument('--kind', choices=['cleaning', 'ecommerce'], default='cleaning')
+    report.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_DIR, help='启用结果缓存，可指定缓存目录')
+    report.set_defaults(func=cmd_report)
+
+    bench = commands.add_parser('bench', help='清洗吞吐量基准测试')
+    bench.add_argument('input')
+    bench.add_argument('--spec', help='JSON 规则配置文件')
+    bench.add_argument('--engine', choices=['pandas', 'columnar'])
+    bench.add_argument('--repeat', type=int, default=3)
+    bench.add_argument('--pdf', help='同时生成带图表的 PDF 基准报告')
+    bench.set_defaults(func=cmd_bench)
+
+    daemon = commands.add_parser('daemon', help='启动常驻清洗守护进程')
+    daemon.add_argument('--socket', default=None, help='Unix socket 路径')
+    daemon.add_argument('--workers', type=int)
+    daemon.set_defaults(func=cmd_daemon)
+
+    submit = commands.add_parser('submit', help='提交任务给守护进程')
+    submit.add_argument('input')
+    submit.add_argument('-o', '--output', help='输出文件；不指定时结果写到标准输出')
+    submit.add_argument('--spec', help='JSON 规则配置文件')
+    submit.add_argument('--socket', default=None, help='Unix socket 路径')
+    submit.set_defaults(func=cmd_submit)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, 'socket', False) is None:
+        from .daemon import DEFAULT_SOCKET
+        args.socket = DEFAULT_SOCKET
+    try:
+        return args.func(args)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+
+"""
+轻量列式引擎（不依赖 pandas / numpy）
+数值列使用 array('d') / array('q') 加空值位图，字符串列使用字典编码，
+行通过 __slots__ 视图访问，适合启动要求毫秒级的短任务
+"""
+
+import csv
+import re
+from array import array
+
+from .patterns import DATETIME_FORMATS, NUMBER_PATTERN, PHONE_PATTERNS
+
+
+class NullBitmap:
+    """空值位图，每行 1 bit，置位表示空值"""
+
+    __slots__ = ('bits', 'length')
+
+    def __init__(self, length=0):
+        self.bits = bytearray((length + 7) // 8)
+        self.length = length
+
+    def append(self, is_null):
+        if self.length % 8 == 0:
+            self.bits.append(0)
+        if is_null:
+            self.bits[self.length >> 3] |= 1 << (self.length & 7)
+        self.length += 1
+
+    def is_null(self, index):
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
+    def clear(self, index):
+        self.bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+    def null_count(self):
+        return sum(bin(b).count('1') for b in self.bits)
+
+    def nulls(self):
+        """依次返回为空的行号"""
+        for byte_index, byte in enumerate(self.bits):
+            if byte:
+                base = byte_index << 3
+                for bit in range(8):
+                    if byte & (1 << bit):
+                        yield base + bit
+
+
+class NumberColumn:
+    """数值列：array('d') 浮点或 array('q') 整数，空值位置存 0"""
+
+    __slots__ = ('values', 'nulls')
+
+    def __init__(self, typecode='d'):
+        self.values = array(typecode)
+        self.nulls = NullBitmap()
+
+    def __len__(self):
+        return len(self.values)
+
+    def append(self, value):
+        self.nulls.append(value is None)
+        self.values.append(0 if value is None else value)
+
+    def get(self, index):
+        return None if self.nulls.is_null(index) else self.values[index]
+
+    def mean(self):
+        count = len(self.values) - self.nulls.null_count()
+        return sum(self.values) / count if count else None
+
+    def fillna(self, value):
+        """原地填充；整数列填充浮点值时转为浮点列"""
+        if self.values.typecode == 'q' and isinstance(value, float):
+            self.values = array('d', self.values)
+        for index in self.nulls.nulls():
+            self.values[index] = value
+        self.nulls = NullBitmap(len(self.values))
+
+
+class StringColumn:
+    """字符串列：去重后的字符串表 + array('i') 编码，-1 表示空值"""
+
+    __slots__ = ('codes', 'table', 'lookup')
+
+    def __init__(self):
+        self.codes = array('i')
+        self.table = []
+        self.lookup = {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def encode(self, value):
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.table)
+            self.table.append(value)
+        return code
+
+    def append(self, value):
+        self.codes.append(-1 if value is None else self.encode(value))
+
+    def get(self, index):
+        code = self.codes[index]
+        return None if code < 0 else self.table[code]
+
+    def fillna(self, value):
+        code = self.encode(value)
+        codes = self.codes
+        for index in range(len(codes)):
+            if codes[index] < 0:
+                codes[index] = code
+
+    def map_unique(self, func, typecode='d'):
+        """对去重后的字符串表执行 func，结果展开为数值列（每个不同值只计算一次）"""
+        mapped = [func(value) for value in self.table]
+        column = NumberColumn(typecode)
+        for code in self.codes:
+            column.append(None if code < 0 else mapped[code])
+        return column
+
+    def map_strings(self, func):
+        """对去重后的字符串表执行 func，结果仍为字典编码的字符串列，func 返回 None 的值为空值"""
+        column = StringColumn()
+        mapped = []
+        for value in self.table:
+            result = func(value)
+            mapped.append(-1 if result is None else column.encode(result))
+        column.codes = array('i', (-1 if code < 0 else mapped[code] for code in self.codes))
+        return column
+
+
+def infer_column(values):
+    """根据取值推断列类型"""
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+        column = NumberColumn('q')
+    elif present and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        column = NumberColumn('d')
+    else:
+        column = StringColumn()
+    for value in values:
+        column.append(value)
+    return column
+
+
+class Row:
+    """行视图，只保存表引用和行号，不复制数据"""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, name):
+        return self._table.columns[name].get(self._index)
+
+    def to_dict(self):
+        return {name: column.get(self._index) for name, column in self._table.columns.items()}
+
+
+class ColumnTable:
+    """列式数据表"""
+
+    def __init__(self, columns=None):
+        self.columns = columns or {}
+
+    def __len__(self):
+        for column in self.columns.values():
+            return len(column)
+        return 0
+
+    @classmethod
+    def from_records(cls, records):
+        """从 dict 记录列表构建"""
+        records = list(records)
+        names = list(records[0]) if records else []
+        return cls({name: infer_column([r[name] for r in records]) for name in names})
+
+    @classmethod
+    def from_csv(cls, path, encoding='utf-8', numeric=()):
+        """
+        读取 CSV
+
+        Args:
+            numeric: 按数值解析的列名，其余列按字符串存储；空单元格视为空值
+        """
+        with open(path, 'r', newline='', encoding=encoding) as f:
+            reader = csv.reader(f)
+            names = next(reader)
+            columns = {name: NumberColumn('d') if name in numeric else StringColumn() for name in names}
+            targets = [columns[name] for name in names]
+            for row in reader:
+                for column, cell in zip(targets, row):
+                    if cell == '':
+                        column.append(None)
+                    elif isinstance(column, NumberColumn):
+                        column.append(float(cell))
+                    else:
+                        column.append(cell)
+        return cls(columns)
+
+    def row(self, index):
+        return Row(self, index)
+
+    def rows(self):
+        for index in range(len(self)):
+            yield Row(self, index)
+
+    def to_records(self):
+        names = list(self.columns)
+        getters = [self.columns[name].get for name in names]
+        return [dict(zip(names, [get(i) for get in getters])) for i in range(len(self))]
+
+    def to_csv(self, path, encoding='utf-8'):
+        names = list(self.columns)
+        getters = [self.columns[name].get for name in names]
+        with open(path, 'w', newline='', encoding=encoding) as f:
+            writer = csv.writer(f)
+            writer.writerow(names)
+            for index in range(len(self)):
+                writer.writerow(['' if v is None else v for v in (get(index) for get in getters)])
+
+    def fillna(self, column, value=None, strategy=None, decimals=None):
+        """填充缺失值，strategy='mean' 时用均值；返回实际填充值，全为空的列与 pandas 一致保持为空并返回 None"""
+        target = self.columns[column]
+        if strategy == 'mean':
+            value = target.mean()
+            if value is None:
+                return None
+            if decimals is not None:
+                value = round(value, decimals)
+        target.fillna(value)
+        return value
+
+    def extract_number(self, column, output_col=None, pattern=NUMBER_PATTERN, fast_path=False):
+        """提取数字，每个不同的字符串只解析一次；fast_path 时纯数字直接转换"""
+        regex = re.compile(pattern)
+
+        def parse(value):
+            if fast_path and value.isdecimal():
+                return float(value)
+            match = regex.search(value)
+            return float(match.group(1)) if match else None
+
+        self.columns[output_col or column] = self.columns[column].map_unique(parse)
+
+    def standardize_datetime(self, column, output_col=None, format='%Y-%m-%d %H:%M:%S', formats=None,
+                             fast_path=False):
+        """按候选格式解析时间，每个不同的字符串只解析一次；已是输出格式的值解析后原样输出，fast_path 无需特殊处理"""
+        from .compiler import parse_datetime
+
+        formats = formats or DATETIME_FORMATS
+        self.columns[output_col or column] = self.columns[column].map_strings(
+            lambda value: parse_datetime(value, formats, format))
+
+    def validate_phone(self, column, output_col=None, country_code='CN'):
+        """校验手机号，输出 0/1 整数列（空值为 0）"""
+        regex = re.compile(PHONE_PATTERNS[country_code])
+        valid = self.columns[column].map_unique(lambda v: int(regex.fullmatch(v) is not None), 'q')
+        valid.fillna(0)
+        self.columns[output_col or f'{column}_valid'] = valid
+
+    def deduplicate(self, column, columns=None, keep='first'):
+        """按字段精确去重，只保留首次出现的记录"""
+        if keep != 'first':
+            raise ValueError("列式引擎的 deduplicate 只支持 keep='first'")
+        getters = [self.columns[name].get for name in (columns or [column])]
+        seen = set()
+        keep_rows = []
+        for index in range(len(self)):
+            key = tuple(get(index) for get in getters)
+            if key not in seen:
+                seen.add(key)
+                keep_rows.append(index)
+        if len(keep_rows) < len(self):
+            self.take(keep_rows)
+
+    def take(self, indices):
+        """只保留指定行"""
+        for name, column in list(self.columns.items()):
+            if isinstance(column, StringColumn):
+                taken = StringColumn()
+                taken.table, taken.lookup = column.table, column.lookup
+                taken.codes = array('i', (column.codes[i] for i in indices))
+            else:
+                taken = NumberColumn(column.values.typecode)
+                for i in indices:
+                    taken.append(column.get(i))
+            self.columns[name] = taken
+
+    def auto_clean(self, spec):
+        """
+        按 auto_clean 风格的规则配置原地清洗
+
+        Returns:
+            strategy='mean' 等规则实际使用的填充值 {列名: 值}
+        """
+        fill_values = {}
+        for column, options in spec.items():
+            options = dict(options)
+            method = options.pop('method')
+            if method not in ('fillna', 'extract_number', 'standardize_datetime', 'validate_phone', 'deduplicate'):
+                raise ValueError(f"列式引擎不支持的规则: {method}")
+            result = getattr(self, method)(column, **options)
+            if method == 'fillna':
+                fill_values[column] = result
+        return fill_values
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+
+"""
+记录级规则编译器（无 pandas 路径）
+把 auto_clean 风格的规则配置编译成一段直线式 Python 函数，逐条清洗 dict 记录
+"""
+
+import json
+import re
+from datetime import datetime
+
+from .patterns import DATE_PATTERN, DATETIME_FORMATS, NUMBER_PATTERN, PHONE_PATTERNS
+
+
+# 记录级支持的规则；deduplicate 由 clean_records 在编译函数之外处理
+RECORD_METHODS = {'fillna', 'extract_number', 'validate_phone', 'standardize_datetime'}
+
+DATE_REGEX = re.compile(DATE_PATTERN)
+
+_FACTORIES = {}
+
+
+def to_number(value):
+    """
+    与 pd.to_numeric(errors='coerce') 一致地把单个值转为浮点数，无法转换或为空时返回 None
+
+    只认 ASCII 数字：全角数字、'1_000' 等 float() 能解析而 pandas 不认的写法视为无效；
+    本身是数值的原样返回
+    """
+    if isinstance(value, (int, float)):
+        return None if value != value else value
+    if isinstance(value, str) and value.isascii() and '_' not in value:
+        try:
+            number = float(value)
+        except ValueError:
+            return None
+        return None if number != number else number
+    return None
+
+
+def parse_datetime(value, formats, output_format):
+    """按候选格式解析时间，失败时只保留日期部分（补 12:00:00）"""
+    if value is None or value != value:
+        return None
+    text = str(value)
+    for fmt in formats:
+        try:
+            return datetime.strptime(text, fmt).strftime(output_format)
+        except ValueError:
+            continue
+    match = DATE_REGEX.search(text)
+    if match:
+        year, month, day = match.groups()
+        try:
+            return datetime(int(year), int(month), int(day), 12).strftime(output_format)
+        except ValueError:
+            return None
+    return None
+
+
+def generate_source(spec, fields=None, inplace=False):
+    """
+    生成清洗函数源码
+
+    规则参数（填充值、正则等）作为工厂函数的参数传入闭包，源码只取决于规则结构，
+    不同数据集的均值不同也能复用同一份编译结果。
+    None、NaN 和空字符串都按缺失值处理（与 pandas 读入 CSV 时一致）。
+
+    Returns:
+        (源码, 常量参数名列表)
+    """
+    if not inplace and fields is None:
+        raise ValueError("非原地模式需要提供 fields")
+
+    body = []
+    params = []
+    current = {}
+
+    def load(column):
+        if column not in current:
+            name = f"v{len(current)}"
+            body.append(f"{name} = record[{column!r}]")
+            current[column] = name
+        return current[column]
+
+    def missing(name):
+        return f"({name} is None or {name} == '' or {name} != {name})"
+
+    changed = []
+    for index, (column, options) in enumerate(spec.items()):
+        method = options['method']
+        if method == 'deduplicate':
+            continue
+        if method not in RECORD_METHODS:
+            raise ValueError(f"记录级编译不支持的规则: {method}")
+
+        source = load(column)
+        const = f"c{index}"
+        params.append(const)
+        target = f"r{index}"
+
+        if method == 'fillna' and options.get('strategy') == 'mean':
+            body.append(f"n{index} = _to_number({source})")
+            body.append(f"{target} = {const} if n{index} is None else n{index}")
+        elif method == 'fillna':
+            body.append(f"{target} = {const} if {missing(source)} else {source}")
+        elif method == 'extract_number':
+            body.append(f"m{index} = None if {missing(source)} else {const}.search(str({source}))")
+            body.append(f"{target} = None if m{index} is None else _to_number(m{index}.group(1))")
+        elif method == 'validate_phone':
+            body.append(f"{target} = {source} is not None and {const}.fullmatch(str({source})) is not None")
+        elif method == 'standardize_datetime':
+            body.append(f"{target} = _parse_datetime({source}, *{const})")
+
+        output = options.get('output_col') or (f'{column}_valid' if method == 'validate_phone' else column)
+        current[output] = target
+        if output not in changed:
+            changed.append(output)
+
+    if inplace:
+        for output in changed:
+            body.append(f"record[{output!r}] = {current[output]}")
+        result = "record"
+    else:
+        names = list(fields) + [c for c in changed if c not in fields]
+        items = ', '.join(f"{c!r}: {current[c] if c in current else f'record[{c!r}]'}" for c in names)
+        result = f"{{{items}}}"
+
+    # 单条版本与批量版本共用同一段函数体；批量版本省去每条记录一次的函数调用
+    lines = [f"def make_cleaner({', '.join(params)}):",
+             "    def clean_record(record):"]
+    lines += [f"        {line}" for line in body]
+    lines.append(f"        return {result}")
+    lines += ["    def clean_batch(records):",
+              "        cleaned = []",
+              "        append = cleaned.append",
+              "        for record in records:"]
+    lines += [f"            {line}" for line in body]
+    lines.append(f"            append({result})")
+    lines.append("        return cleaned")
+    lines.append("    return clean_record, clean_batch")
+    return '\n'.join(lines) + '\n', params
+
+
+def _factory(spec, fields, inplace):
+    """按规则结构缓存编译结果，规则顺序不同常量绑定顺序也不同，键中保留规则顺序"""
+    from .checkpoint import ordered_spec
+
+    key = json.dumps([ordered_spec(spec), fields, inplace], ensure_ascii=False, sort_keys=True, default=str)
+    factory = _FACTORIES.get(key)
+    if factory is None:
+        source, _ = generate_source(spec, fields, inplace)
+        namespace = {'_parse_datetime': parse_datetime, '_to_number': to_number}
+        exec(compile(source, '<data_cleaner_pro.compiled>', 'exec'), namespace)
+        factory = _FACTORIES[key] = namespace['make_cleaner']
+    return factory
+
+
+def rule_constant(column, options, fill_values):
+    """计算单条规则绑定到闭包中的常量"""
+    method = options['method']
+    if method == 'fillna':
+        if options.get('strategy') == 'mean':
+            return fill_values[column]
+        return options.get('value')
+    if method == 'extract_number':
+        return re.compile(options.get('pattern', NUMBER_PATTERN))
+    if method == 'validate_phone':
+        return re.compile(PHONE_PATTERNS[options.get('country_code', 'CN')])
+    if method == 'standardize_datetime':
+        return (options.get('formats') or DATETIME_FORMATS,
+                options.get('format', '%Y-%m-%d %H:%M:%S'))
+
+
+def compile_record_cleaner(spec, fields=None, inplace=False, fill_values=None):
+    """
+    把规则配置编译成单条记录的清洗函数
+
+    Args:
+        spec: auto_clean 风格的规则配置
+        fields: 输出记录的字段顺序（非原地模式必填）
+        inplace: True 时直接修改传入的记录
+        fill_values: strategy='mean' 的填充值 {列名: 值}
+
+    Returns:
+        clean_record(record) 函数
+    """
+    return _build(spec, fields, inplace, fill_values)[0]
+
+
+def compile_batch_cleaner(spec, fields=None, inplace=False, fill_values=None):
+    """
+    把规则配置编译成批量清洗函数
+
+    参数同 compile_record_cleaner，返回 clean_batch(records) -> 清洗后的记录列表
+    """
+    return _build(spec, fields, inplace, fill_values)[1]
+
+
+def _build(spec, fields, inplace, fill_values):
+    """取缓存的工厂函数并绑定本次的常量"""
+    fill_values = fill_values or {}
+    factory = _factory(spec, None if inplace else list(fields), inplace)
+    constants = [rule_constant(column, options, fill_values)
+                 for column, options in spec.items() if options['method'] != 'deduplicate']
+    return factory(*constants)
+
+
+def mean_fill_values(records, spec):
+    """
+    第一遍扫描：计算 strategy='mean' 列的均值
+
+    值按 to_number 转换，无法转换的不计入；全为空的列与 pandas 一致得到 NaN（不填充）
+    """
+    columns = [c for c, o in spec.items() if o['method'] == 'fillna' and o.get('strategy') == 'mean']
+    totals = {c: [0.0, 0] for c in columns}
+    for record in records:
+        for column in columns:
+            value = to_number(record[column])
+            if value is not None:
+                totals[column][0] += value
+                totals[column][1] += 1
+
+    fill_values = {}
+    for column in columns:
+        total, count = totals[column]
+        mean = total / count if count else float('nan')
+        decimals = spec[column].get('decimals')
+        fill_values[column] = round(mean, decimals) if decimals is not None else mean
+    return fill_values
+
+
+def clean_records(records, spec, fields=None):
+    """
+    清洗 dict 记录列表（无需 pandas）
+
+    Returns:
+        (清洗后的记录列表, 均值填充值)
+    """
+    records = list(records)
+    fill_values = mean_fill_values(records, spec)
+    if fields is None:
+        fields = list(records[0]) if records else []
+    cleaned = compile_batch_cleaner(spec, fields, fill_values=fill_values)(records)
+
+    for column, options in spec.items():
+        if options['method'] == 'deduplicate':
+            if options.get('keep', 'first') != 'first':
+                raise ValueError("记录级 deduplicate 只支持 keep='first'")
+            subset = options.get('columns') or [column]
+            seen = set()
+            unique = []
+            for record in cleaned:
+                key = tuple(record[c] for c in subset)
+                if key not in seen:
+                    seen.add(key)
+                    unique.append(record)
+            cleaned = unique
+    return cleaned, fill_values
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+"""
+常驻清洗守护进程
+预热的工作进程常驻内存（pandas 已导入、规则已解析），通过本地 Unix socket 接收任务，
+省去每个小文件都要付出的解释器启动、pandas 导入和规则解析开销
+
+协议：每条消息是一行 JSON
+    请求  {"input": 路径, "output": 路径或 null, "spec": {...}, "encoding": "utf-8"}
+    响应  {"event": "accepted"} -> {"event": "data", "text": ...}* -> {"event": "done", "stats": {...}}
+          出错时为 {"event": "error", "message": ...}
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+
+
+DEFAULT_SOCKET = os.environ.get('DATA_CLEANER_SOCKET', '/tmp/data-cleaner.sock')
+
+# 未指定输出文件时，清洗结果按块回传
+DATA_CHUNK_SIZE = 64 * 1024
+
+# 工作进程内按规则配置哈希缓存解析结果（哈希包含规则顺序，顺序不同的配置分别解析）
+_PREPARED = {}
+
+
+def warm_up():
+    """工作进程初始化：提前导入 pandas 和清洗规则"""
+    import pandas  # noqa: F401
+    from . import cleaner  # noqa: F401
+
+
+def run_job(request, submitted_at):
+    """在工作进程中执行单个清洗任务"""
+    import pandas as pd
+    from .checkpoint import spec_hash
+    from .cleaner import DataCleaner, prepare_spec
+
+    started = time.time()
+    key = spec_hash(request['spec'])
+    prepared = _PREPARED.get(key)
+    cached = prepared is not None
+    if prepared is None:
+        prepared = _PREPARED[key] = prepare_spec(request['spec'])
+
+    encoding = request.get('encoding', 'utf-8')
+    df = pd.read_csv(request['input'], dtype=str, encoding=encoding)
+    loaded = time.time()
+    cleaned = DataCleaner(df).apply(prepared)
+    finished = time.time()
+
+    text = None
+    if request.get('output'):
+        cleaned.to_csv(request['output'], index=False, encoding=encoding)
+    else:
+        text = cleaned.to_csv(index=False)
+    written = time.time()
+
+    stats = {
+        'rows_in': len(df),
+        'rows_out': len(cleaned),
+        'queue_seconds': started - submitted_at,
+        'read_seconds': loaded - started,
+        'clean_seconds': finished - loaded,
+        'write_seconds': written - finished,
+        'spec_cached': cached,
+        'worker_pid': os.getpid(),
+    }
+    return stats, text
+
+
+class JobHandler(socketserver.StreamRequestHandler):
+    """处理一个客户端连接，可顺序提交多个任务"""
+
+    def send(self, message):
+        self.wfile.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+        self.wfile.flush()
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                self.send({'event': 'error', 'message': f"无效的请求: {e}"})
+                continue
+
+            if request.get('command') == 'shutdown':
+                self.send({'event': 'done', 'stats': {}})
+                threading.Thread(target=self.server.shutdown).start()
+                return
+
+            self.send({'event': 'accepted'})
+            try:
+                future = self.server.pool.submit(run_job, request, time.time())
+                stats, text = future.result()
+            except Exception as e:
+                self.send({'event': 'error', 'message': str(e)})
+                continue
+            if text is not None:
+                for start in range(0, len(text), DATA_CHUNK_SIZE):
+                    self.send({'event': 'data', 'text': text[start:start + DATA_CHUNK_SIZE]})
+            self.send({'event': 'done', 'stats': stats})
+
+
+class CleanerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """多线程 Unix socket 服务，任务交给预热的进程池执行"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, pool):
+        self.pool = pool
+        super().__init__(socket_path, JobHandler)
+
+
+def serve(socket_path=DEFAULT_SOCKET, workers=None, ready=None):
+    """
+    启动守护进程，阻塞直到收到 shutdown 请求
+
+    Args:
+        socket_path: Unix socket 路径
+        workers: 常驻工作进程数，默认 CPU 核数
+        ready: 可选的 threading.Event，服务开始监听后置位
+    """
+    from concurrent.futures import ProcessPoolExecutor, wait
+
+    workers = workers or os.cpu_count() or 1
+    warm_up()
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=warm_up)
+    # 在主线程中启动全部工作进程
+    wait([pool.submit(int) for _ in range(workers)])
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = CleanerServer(socket_path, pool)
+    try:
+        if ready is not None:
+            ready.set()
+        server.serve_forever()
+    finally:
+        server.server_close()
+        pool.shutdown()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def submit(input_path, spec, output_path=None, socket_path=DEFAULT_SOCKET, encoding='utf-8'):
+    """
+    向守护进程提交任务，逐条返回响应事件
+
+    客户端只依赖标准库，启动开销与普通 Python 脚本相同。
+    """
+    request = {
+        'input': os.path.abspath(input_path),
+        'output': os.path.abspath(output_path) if output_path else None,
+        'spec': spec,
+        'encoding': encoding,
+    }
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+        sock.shutdown(socket.SHUT_WR)
+        with sock.makefile('rb') as f:
+            for line in f:
+                event = json.loads(line)
+                yield event
+                if event['event'] in ('done', 'error'):
+                    return
+
+
+def shutdown(socket_path=DEFAULT_SOCKET):
+    """请求守护进程退出"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(b'{"command": "shutdown"}\n')
+        sock.recv(4096)
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+"""
+试运行估算
+从整个文件中蓄水池抽样，在样本上执行完整规则，测量每条规则的吞吐量和峰值内存，
+外推整份输入的耗时与内存，并给出 clean_csv 的块大小和进程数建议。
+"""
+
+import csv
+import io
+import math
+import os
+import random
+import time
+import tracemalloc
+
+from .budget import SEEN_KEY_BYTES, estimate_memory, parse_size, suggest_settings
+from .cleaner import apply_step, prepare_spec
+from .streaming import STATEFUL_METHODS
+
+
+# 没有指定内存预算时按 1GB 给建议
+DEFAULT_MAX_MEMORY = 1024 ** 3
+
+
+def reservoir_sample(path, size, encoding='utf-8', seed=0):
+    """
+    单遍扫描 CSV，等概率抽取 size 行（Algorithm L，未入选的行只做计数）
+
+    Returns:
+        (表头, 按原始顺序排列的样本行, 总行数)
+    """
+    rng = random.Random(seed)
+
+    def uniform():
+        # 取 (0, 1) 区间，避免 log(0)
+        return rng.random() or 1e-300
+
+    with open(path, 'r', newline='', encoding=encoding) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        sample = []
+        for index, row in enumerate(reader):
+            sample.append((index, row))
+            if len(sample) == size:
+                break
+        total = len(sample)
+        if total == size:
+            w = math.exp(math.log(uniform()) / size)
+            next_index = size + int(math.log(uniform()) / math.log(1 - w))
+            for index, row in enumerate(reader, start=size):
+                if index == next_index:
+                    sample[rng.randrange(size)] = (index, row)
+                    w *= math.exp(math.log(uniform()) / size)
+                    next_index += int(math.log(uniform()) / math.log(1 - w)) + 1
+                total = index + 1
+    sample.sort(key=lambda item: item[0])
+    return header, [row for _, row in sample], total
+
+
+def sample_frame(header, rows):
+    """把样本行按 clean_csv 相同的方式解析为 DataFrame，返回 (DataFrame, 文本大小, 解析耗时)"""
+    import pandas as pd
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    writer.writerows(rows)
+    text = buffer.getvalue()
+    started = time.perf_counter()
+    df = pd.read_csv(io.StringIO(text), dtype=str)
+    return df, len(text.encode('utf-8')), time.perf_counter() - started
+
+
+def measure_rules(df, spec):
+    """
+    逐条规则计时，再开启 tracemalloc 重跑一遍测峰值内存（两遍分开，避免跟踪开销计入耗时）
+
+    Returns:
+        [{'column', 'method', 'stateful', 'seconds', 'peak_bytes'}]，以及清洗后的 DataFrame
+    """
+    prepared = prepare_spec(spec)
+    results = []
+    cleaned = df.copy()
+    for (column, func, params), method in zip(prepared, (o['method'] for o in spec.values())):
+        started = time.perf_counter()
+        cleaned = apply_step(cleaned, column, func, params)
+        results.append({'column': column, 'method': method, 'stateful': method in STATEFUL_METHODS,
+                        'seconds': time.perf_counter() - started})
+
+    traced = df.copy()
+    tracemalloc.start()
+    try:
+        for (column, func, params), result in zip(prepared, results):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            traced = apply_step(traced, column, func, params)
+            result['peak_bytes'] = tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return results, cleaned
+
+
+def dry_run(input_path, spec, sample_size=10000, encoding='utf-8', max_memory=None, seed=0):
+    """
+    试运行：抽样执行完整规则并外推整份输入的耗时和内存
+
+    Args:
+        input_path: 输入 CSV 路径
+        spec: auto_clean 规则配置
+        sample_size: 蓄水池样本行数
+        max_memory: 内存预算（字节数或 '4GB'），用于给出块大小和进程数建议
+
+    Returns:
+        {'rows', 'bytes', 'sample_rows', 'rules', 'estimate', 'suggested'}
+    """
+    max_memory = parse_size(max_memory or DEFAULT_MAX_MEMORY)
+    header, rows, total = reservoir_sample(input_path, sample_size, encoding=encoding, seed=seed)
+    df, sample_bytes, parse_seconds = sample_frame(header, rows)
+    n = max(len(df), 1)
+    scale = total / n
+    file_bytes = os.path.getsize(input_path)
+
+    rules, cleaned = measure_rules(df, spec)
+    started = time.perf_counter()
+    cleaned.to_csv(index=False)
+    write_seconds = (time.perf_counter() - started) * scale
+
+    for result in rules:
+        result['rows_per_second'] = n / result['seconds'] if result['seconds'] else None
+        result['estimated_seconds'] = result['seconds'] * scale
+
+    # 读取耗时按字节外推，其余按行数外推
+    read_seconds = parse_seconds * (file_bytes / sample_bytes if sample_bytes else scale)
+    parallel_seconds = sum(r['estimated_seconds'] for r in rules if not r['stateful'])
+    stateful_seconds = sum(r['estimated_seconds'] for r in rules if r['stateful'])
+    serial_seconds = max(read_seconds, stateful_seconds + write_seconds)
+
+    frame_bytes_per_row = df.memory_usage(deep=True).sum() / n
+    rule_bytes_per_row = max((r['peak_bytes'] for r in rules), default=0) / n
+    distinct_keys = 0
+    for column, options in spec.items():
+        if options['method'] == 'deduplicate':
+            keys = options.get('columns') or [column]
+            if set(keys) <= set(df.columns):
+                distinct_keys += len(df.drop_duplicates(subset=keys)) * scale
+    state_bytes = int(distinct_keys * SEEN_KEY_BYTES)
+
+    suggested = suggest_settings(frame_bytes_per_row, rule_bytes_per_row, state_bytes, max_memory,
+                                 parallel_seconds=parallel_seconds, serial_seconds=serial_seconds)
+    workers = suggested['workers']
+    estimate = {
+        'read_seconds': read_seconds,
+        'clean_seconds': parallel_seconds + stateful_seconds,
+        'write_seconds': write_seconds,
+        'serial_seconds': read_seconds + parallel_seconds + stateful_seconds + write_seconds,
+        # 流水线总耗时取决于最慢的阶段
+        'seconds': max(serial_seconds, parallel_seconds / workers),
+        'state_bytes': state_bytes,
+        'peak_memory_bytes': estimate_memory(frame_bytes_per_row, rule_bytes_per_row, state_bytes,
+                                             suggested['chunksize'], workers),
+    }
+    return {
+        'rows': total,
+        'bytes': file_bytes,
+        'sample_rows': len(df),
+        'frame_bytes_per_row': frame_bytes_per_row,
+        'rules': rules,
+        'estimate': estimate,
+        'suggested': suggested,
+    }
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+"""
+MinHash-LSH 模糊去重
+用于收货地址等自由文本字段，避免两两比较的平方复杂度
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+# 小于 2^32 的最大素数，保证 a * h + b 在 uint64 内不溢出
+MERSENNE_PRIME = np.uint64(4294967291)
+MAX_HASH = np.uint32(0xFFFFFFFF)
+
+# 桶内两两校验的桶大小上限；更大的桶（如大量相同文本）改为与桶内代表逐一比较
+MAX_PAIRWISE_BUCKET = 32
+
+
+def make_permutations(num_perm, seed=1):
+    """生成 num_perm 组 (a, b) 哈希置换参数"""
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, 2 ** 31 - 1, size=num_perm).astype(np.uint64)
+    b = rng.randint(0, 2 ** 31 - 1, size=num_perm).astype(np.uint64)
+    return a, b
+
+
+def shingle_hashes(texts, shingle_size=2):
+    """
+    向量化计算字符 shingle 哈希
+
+    所有文本的 Unicode 码点拼成一个数组，用滚动多项式哈希一次算出所有 shingle。
+
+    Returns:
+        (hashes, offsets)：hashes 为 uint32 数组，第 i 条文本的 shingle 位于
+        hashes[offsets[i]:offsets[i + 1]]；空文本没有 shingle
+    """
+    k = shingle_size
+    # 不足 k 个字符的文本补空格，保证至少有一个 shingle
+    padded = [t.ljust(k) if t else '' for t in texts]
+    lengths = np.fromiter((len(t) for t in padded), dtype=np.int64, count=len(padded))
+    codes = np.frombuffer(''.join(padded).encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+
+    counts = np.maximum(lengths - k + 1, 0)
+    offsets = np.zeros(len(padded) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    if offsets[-1] == 0:
+        return np.zeros(0, dtype=np.uint32), offsets
+
+    # 每个 shingle 在拼接数组中的起始位置
+    text_starts = np.zeros(len(padded), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=text_starts[1:])
+    positions = np.repeat(text_starts - offsets[:-1], counts) + np.arange(offsets[-1])
+
+    hashes = np.zeros(offsets[-1], dtype=np.uint64)
+    for j in range(k):
+        hashes = (hashes * np.uint64(1000003) + codes[positions + j]) & np.uint64(0xFFFFFFFF)
+    # 混洗高低位
+    hashes ^= hashes >> np.uint64(16)
+    hashes = (hashes * np.uint64(0x45D9F3B)) & np.uint64(0xFFFFFFFF)
+    hashes ^= hashes >> np.uint64(16)
+    return hashes.astype(np.uint32), offsets
+
+
+def minhash_signatures(texts, num_perm=64, shingle_size=2, seed=1, block_size=2000):
+    """
+    分块计算 MinHash 签名
+
+    Returns:
+        (len(texts), num_perm) 的 uint32 矩阵；空文本整行为 MAX_HASH
+    """
+    a, b = make_permutations(num_perm, seed)
+    signatures = np.full((len(texts), num_perm), MAX_HASH, dtype=np.uint32)
+
+    for start in range(0, len(texts), block_size):
+        block = texts[start:start + block_size]
+        hashes, offsets = shingle_hashes(block, shingle_size)
+        if len(hashes) == 0:
+            continue
+        permuted = (np.outer(a, hashes.astype(np.uint64)) + b[:, None]) % MERSENNE_PRIME
+        nonempty = np.flatnonzero(offsets[1:] > offsets[:-1])
+        mins = np.minimum.reduceat(permuted, offsets[nonempty], axis=1)
+        signatures[start + nonempty] = mins.T.astype(np.uint32)
+    return signatures
+
+
+def choose_bands(num_perm, threshold):
+    """选择 LSH 分段数，使 (1/b)^(1/r) 略低于阈值以保证召回"""
+    best, best_gap = num_perm, None
+    for bands in range(1, num_perm + 1):
+        if num_perm % bands:
+            continue
+        rows = num_perm // bands
+        gap = threshold - (1.0 / bands) ** (1.0 / rows)
+        if gap >= 0 and (best_gap is None or gap < best_gap):
+            best, best_gap = bands, gap
+    return best
+
+
+def connected_labels(num_nodes, left, right):
+    """对边集合做向量化连通分量标记（最小编号传播 + 指针跳跃）"""
+    labels = np.arange(num_nodes)
+    if len(left) == 0:
+        return labels
+    while True:
+        merged = np.minimum(labels[left], labels[right])
+        updated = labels.copy()
+        np.minimum.at(updated, left, merged)
+        np.minimum.at(updated, right, merged)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def representative_pairs(signatures, members, threshold):
+    """
+    大桶的候选对：每条记录与桶内已有代表逐一比较，与所有达到阈值的代表配对，都不相似时成为新代表
+
+    Returns:
+        (left, right) 已校验的记录对
+    """
+    reps, lefts, rights = [], [], []
+    for member in members:
+        if reps:
+            similarity = (signatures[reps] == signatures[member]).mean(axis=1)
+            matched = np.asarray(reps)[similarity >= threshold]
+            if len(matched):
+                lefts.append(matched)
+                rights.append(np.full(len(matched), member))
+                continue
+        reps.append(member)
+    if not lefts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(lefts), np.concatenate(rights)
+
+
+def lsh_clusters(signatures, threshold=0.8, bands=None):
+    """
+    分段 LSH 分桶，只校验候选对
+
+    不超过 MAX_PAIRWISE_BUCKET 条的桶内两两配对（按桶排序后与后面同桶的记录配对，向量化），
+    候选对数量为 O(n * bands * MAX_PAIRWISE_BUCKET)；更大的桶用 representative_pairs。
+    候选对用签名估计的 Jaccard 相似度校验，达到阈值的合并为一簇。
+    签名完全相同的行先合并，分桶只处理不同的签名，大量重复文本不会形成大桶。
+
+    Returns:
+        每行一个簇ID（按首次出现顺序从 0 编号）
+    """
+    n, num_perm = signatures.shape
+    bands = bands or choose_bands(num_perm, threshold)
+    rows = num_perm // bands
+    # 空文本（整行 MAX_HASH）各自成簇，不参与合并
+    empty = signatures[:, 0] == MAX_HASH
+    signatures, inverse = np.unique(signatures[~empty], axis=0, return_inverse=True)
+
+    lefts, rights = [], []
+    for band in range(bands):
+        chunk = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = chunk.view(np.dtype((np.void, chunk.dtype.itemsize * rows))).ravel()
+        order = np.argsort(keys, kind='stable')
+        if len(order) < 2:
+            continue
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        sizes = np.diff(np.r_[starts, len(order)])
+        bucket = np.repeat(np.arange(len(starts)), sizes)
+        small = np.repeat(sizes <= MAX_PAIRWISE_BUCKET, sizes)
+        for distance in range(1, min(sizes.max(), MAX_PAIRWISE_BUCKET)):
+            same = (bucket[distance:] == bucket[:-distance]) & small[distance:]
+            lefts.append(order[:-distance][same])
+            rights.append(order[distance:][same])
+        for start, size in zip(starts[sizes > MAX_PAIRWISE_BUCKET], sizes[sizes > MAX_PAIRWISE_BUCKET]):
+            left, right = representative_pairs(signatures, order[start:start + size], threshold)
+            lefts.append(left)
+            rights.append(right)
+
+    left = np.concatenate(lefts) if lefts else np.zeros(0, dtype=np.int64)
+    right = np.concatenate(rights) if rights else np.zeros(0, dtype=np.int64)
+    if len(left):
+        pairs = np.unique(np.stack([left, right], axis=1), axis=0)
+        left, right = pairs[:, 0], pairs[:, 1]
+        similarity = (signatures[left] == signatures[right]).mean(axis=1)
+        keep = similarity >= threshold
+        left, right = left[keep], right[keep]
+
+    labels = np.empty(n, dtype=np.int64)
+    labels[~empty] = connected_labels(len(signatures), left, right)[inverse.ravel()]
+    labels[empty] = len(signatures) + np.flatnonzero(empty)
+    _, first_seen, inverse = np.unique(labels, return_index=True, return_inverse=True)
+    rank = np.empty(len(first_seen), dtype=np.int64)
+    rank[np.argsort(first_seen)] = np.arange(len(first_seen))
+    return rank[inverse]
+
+
+def fuzzy_clusters(texts, threshold=0.8, num_perm=64, shingle_size=2, bands=None,
+                   block_size=2000, n_jobs=1, seed=1):
+    """
+    计算自由文本的模糊重复簇
+
+    Args:
+        texts: 文本列表（空值用 '' 表示）
+        threshold: Jaccard 相似度阈值
+        n_jobs: 大于 1 时按块分发到进程池计算签名
+
+    Returns:
+        每条文本的簇ID数组
+    """
+    if n_jobs > 1 and len(texts) > block_size:
+        step = max(block_size, -(-len(texts) // n_jobs))
+        parts = [texts[i:i + step] for i in range(0, len(texts), step)]
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = [pool.submit(minhash_signatures, part, num_perm, shingle_size, seed, block_size)
+                       for part in parts]
+            signatures = np.concatenate([f.result() for f in futures])
+    else:
+        signatures = minhash_signatures(texts, num_perm, shingle_size, seed, block_size)
+    return lsh_clusters(signatures, threshold, bands)
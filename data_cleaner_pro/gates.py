@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+"""
+数据质量闸门
+分块清洗时按块累计各列的空值和解析失败情况，超过阈值立即中止任务，
+避免格式错误的上传（分隔符不对、列错位等）被完整清洗一遍才暴露问题。
+
+闸门写法：{'column': '价格', 'metric': 'invalid_ratio', 'max': 0.3, 'min_rows': 1000}
+    null_ratio     输入为空的行占比
+    invalid_ratio  输入非空但清洗结果为空（或校验结果为 False）的行占比
+输入中缺少闸门引用的列时直接判定失败。
+闸门在工作进程中、无状态规则执行后统计，检查有状态规则（写出阶段执行）output_col 生成的列时直接报错。
+"""
+
+import functools
+import inspect
+import re
+
+
+GATE_METRICS = ('null_ratio', 'invalid_ratio')
+
+# 累计到这么多行后才开始判定，避免前几行的偶然情况误判
+DEFAULT_MIN_ROWS = 1000
+
+# 每个闸门保留的问题值样例数
+SAMPLE_SIZE = 5
+
+GATE_PATTERN = re.compile(r'^(?P<column>[^:]+):(?P<metric>\w+)\s*<=?\s*(?P<max>[\d.]+)$')
+
+
+class QualityGateError(ValueError):
+    """数据质量闸门未通过，profile 中包含各闸门的累计统计和问题值样例"""
+
+    def __init__(self, message, profile):
+        super().__init__(message)
+        self.profile = profile
+
+
+def parse_gate(text):
+    """解析命令行写法 '价格:invalid_ratio<=0.3'"""
+    match = GATE_PATTERN.match(text.strip())
+    if match is None:
+        raise ValueError(f"无效的质量闸门: {text}（格式为 列名:指标<=阈值）")
+    return {'column': match['column'], 'metric': match['metric'], 'max': float(match['max'])}
+
+
+def normalize_gates(gates, spec, stateful=None):
+    """
+    补全默认参数并确定每个闸门要检查的输出列
+
+    Args:
+        stateful: 写出阶段才执行的有状态规则；闸门在工作进程中统计，不能检查这些规则新生成的列
+
+    Raises:
+        ValueError: 指标未知，或闸门检查的列由有状态规则的 output_col 生成
+    """
+    late = {}
+    for column, options in (stateful or {}).items():
+        if options.get('output_col') and options['output_col'] != column:
+            late[options['output_col']] = options['method']
+    normalized = []
+    for gate in gates:
+        gate = dict(gate)
+        if gate.get('metric') not in GATE_METRICS:
+            raise ValueError(f"未知的质量指标: {gate.get('metric')}")
+        gate.setdefault('min_rows', DEFAULT_MIN_ROWS)
+        gate.setdefault('output_col', output_column(gate['column'], spec.get(gate['column'], {})))
+        for name in (gate['column'], gate['output_col']):
+            if name in late:
+                raise ValueError(f"质量闸门 {gate['column']}: 列 {name} 由写出阶段的 {late[name]} 规则生成，"
+                                 f"闸门在此之前统计，请改为检查该规则的输入列")
+        normalized.append(gate)
+    return normalized
+
+
+@functools.lru_cache(maxsize=None)
+def default_output_col(method):
+    """规则签名中 output_col 的默认值（如 deduplicate_near 的 '重复簇'），没有时返回 None"""
+    from .rules import get_rule
+
+    parameter = inspect.signature(get_rule(method)).parameters.get('output_col')
+    return parameter.default if parameter is not None and isinstance(parameter.default, str) else None
+
+
+def output_column(column, options):
+    """规则写出结果的列名：output_col 参数，未指定时与规则一致（validate_phone 默认写到 <列名>_valid）"""
+    if options.get('output_col'):
+        return options['output_col']
+    if options.get('method') == 'validate_phone':
+        return f"{column}_valid"
+    method = options.get('method')
+    return (default_output_col(method) if method else None) or column
+
+
+def measure_chunk(raw, cleaned, gates):
+    """
+    统计单个数据块（在工作进程中执行）
+
+    Args:
+        raw: 清洗前的数据块
+        cleaned: 无状态规则清洗后的数据块（行与 raw 一一对应）
+
+    Returns:
+        每个闸门一项 {'rows', 'nulls', 'invalid', 'samples'}，输入缺列时为 {'missing': True}
+    """
+    counts = []
+    for gate in gates:
+        column = gate['column']
+        if column not in raw.columns or gate['output_col'] not in cleaned.columns:
+            counts.append({'missing': True})
+            continue
+        present = raw[column].notna()
+        output = cleaned[gate['output_col']]
+        failed = ~output.astype(bool) if output.dtype == bool else output.isna()
+        invalid = present & failed
+        counts.append({
+            'rows': len(raw),
+            'nulls': int((~present).sum()),
+            'invalid': int(invalid.sum()),
+            'samples': raw.loc[invalid, column].head(SAMPLE_SIZE).tolist(),
+        })
+    return counts
+
+
+class GateMonitor:
+    """在写出线程中按块累计统计并判定闸门"""
+
+    def __init__(self, gates):
+        self.gates = gates
+        self.totals = [{'rows': 0, 'nulls': 0, 'invalid': 0, 'samples': []} for _ in gates]
+        self.chunks = 0
+
+    def update(self, counts):
+        self.chunks += 1
+        for total, count in zip(self.totals, counts):
+            if count.get('missing'):
+                total['missing'] = True
+                continue
+            total['rows'] += count['rows']
+            total['nulls'] += count['nulls']
+            total['invalid'] += count['invalid']
+            total['samples'].extend(count['samples'][:SAMPLE_SIZE - len(total['samples'])])
+
+    def value(self, gate, total):
+        if gate['metric'] == 'null_ratio':
+            return total['nulls'] / total['rows'] if total['rows'] else 0.0
+        present = total['rows'] - total['nulls']
+        return total['invalid'] / present if present else 0.0
+
+    def profile(self):
+        """各闸门当前的累计统计"""
+        results = []
+        for gate, total in zip(self.gates, self.totals):
+            result = dict(gate, rows=total['rows'], nulls=total['nulls'], invalid=total['invalid'],
+                          samples=total['samples'])
+            if total.get('missing'):
+                result['missing'] = True
+            else:
+                result['value'] = self.value(gate, total)
+            results.append(result)
+        return {'chunks': self.chunks, 'gates': results}
+
+    def check(self, final=False):
+        """
+        判定闸门，未通过时抛出 QualityGateError
+
+        Args:
+            final: 输入已读完，不再受 min_rows 限制
+        """
+        for gate, total in zip(self.gates, self.totals):
+            if total.get('missing'):
+                raise QualityGateError(f"质量闸门未通过: 输入中缺少列 {gate['column']}", self.profile())
+            if not final and total['rows'] < gate['min_rows']:
+                continue
+            value = self.value(gate, total)
+            if value > gate['max']:
+                raise QualityGateError(
+                    f"质量闸门未通过: {gate['column']} {gate['metric']}={value:.1%} 超过 {gate['max']:.1%}"
+                    f"（已检查 {total['rows']} 行）", self.profile())
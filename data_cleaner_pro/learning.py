@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+"""
+自适应格式学习
+对输入列抽样，统计各时间格式和价格写法的实际分布，生成解析计划并写回规则配置：
+时间格式按命中次数排序，已是规范形式的值占比足够高的列开启快速路径。
+"""
+
+import pandas as pd
+
+from .rules import DATETIME_FORMATS, get_rule
+
+
+# 已是规范形式的值占比达到该值才开启规则的快速路径
+FAST_PATH_MIN_RATIO = 0.1
+
+
+def learn_datetime(values, options):
+    """
+    按命中次数从高到低排列候选格式，样本中未出现的格式保持原顺序放在最后
+
+    只有样本中没有任何值能被两个格式同时解析时才调整顺序，保证解析结果不变。
+    """
+    formats = list(options.get('formats') or DATETIME_FORMATS)
+    values = values.dropna().astype('string')
+    matched = {fmt: pd.to_datetime(values, format=fmt, errors='coerce').notna() for fmt in formats}
+    counts = {fmt: int(mask.sum()) for fmt, mask in matched.items()}
+    overlap = sum(matched.values()).gt(1).any() if len(values) else False
+    if overlap:
+        return options, {'format_counts': counts, 'reordered': False}
+    ordered = sorted(formats, key=lambda fmt: -counts[fmt])
+    return dict(options, formats=ordered), {'format_counts': counts, 'reordered': True}
+
+
+def learn_fast_path(func, values, options):
+    """统计样本中已是规范形式的值的占比，占比太低时关闭快速路径（省去判定本身的开销）"""
+    params = {k: v for k, v in options.items() if k not in ('method', 'fast_path')}
+    values = values.dropna().astype('string')
+    found = func.canonical(values, **params) if len(values) else None
+    ratio = float(found[0].mean()) if found is not None else 0.0
+    return dict(options, fast_path=ratio >= FAST_PATH_MIN_RATIO), {'canonical_ratio': ratio}
+
+
+LEARNERS = {
+    'standardize_datetime': learn_datetime,
+}
+
+
+def learn_spec(df, spec, sample_size=10000, seed=0):
+    """
+    从数据样本学习解析计划
+
+    Args:
+        df: 样本数据（通常是输入文件的前若干行）
+        spec: auto_clean 规则配置
+        sample_size: 每列最多抽样的行数
+
+    Returns:
+        (学习后的规则配置, {列名: 样本统计})，规则配置可直接保存为 JSON 复用
+    """
+    if len(df) > sample_size:
+        df = df.sample(sample_size, random_state=seed)
+    learned, report = {}, {}
+    for column, options in spec.items():
+        learned[column] = options
+        if column not in df.columns:
+            continue
+        column_report = {}
+        learner = LEARNERS.get(options['method'])
+        if learner is not None:
+            learned[column], found = learner(df[column], options)
+            column_report.update(found)
+        func = get_rule(options['method'])
+        if func.canonical is not None:
+            learned[column], found = learn_fast_path(func, df[column], learned[column])
+            column_report.update(found)
+        if column_report:
+            report[column] = column_report
+    return learned, report
+
+
+def learn_csv(path, spec, sample_rows=100000, sample_size=10000, encoding='utf-8'):
+    """读取 CSV 前 sample_rows 行并学习解析计划"""
+    df = pd.read_csv(path, dtype=str, nrows=sample_rows, encoding=encoding)
+    return learn_spec(df, spec, sample_size=sample_size)
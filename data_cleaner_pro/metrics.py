@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+"""
+清洗度量
+数据只读入一次，随后一遍完成列概况统计和规则清洗，并记录每条规则的问题行数、修复行数和耗时。
+报告模板只消费这里产出的度量字典，不再读取或扫描原始 CSV。
+
+度量字典：
+    {'source', 'rows', 'rows_out', 'memory_bytes', 'seconds',
+     'columns': {列名: {'nulls', 'distinct', 'numeric', 'max_length'}},
+     'rules': [{'column', 'method', 'rows', 'nulls', 'issues', 'invalid', 'fixed', 'removed',
+                'seconds', 'samples', 可选 'min' / 'max'}]}
+"""
+
+import os
+import time
+
+import pandas as pd
+
+from .cleaner import apply_step, prepare_spec
+from .gates import output_column
+
+
+# 电商订单数据的默认清洗规则，只对输入中存在的列生效
+ECOMMERCE_SPEC = {
+    '价格': {'method': 'extract_number', 'output_col': '价格_clean'},
+    '购买时间': {'method': 'standardize_datetime', 'output_col': '购买时间_clean'},
+    '收货地址': {'method': 'fillna', 'value': '未知', 'output_col': '收货地址_clean'},
+    '手机号': {'method': 'validate_phone', 'output_col': '手机号_valid'},
+    '订单号': {'method': 'deduplicate'},
+}
+
+# 每条规则保留的问题值样例数
+SAMPLE_SIZE = 3
+
+# 输出可以比较大小的规则，记录输出的取值范围
+RANGE_RULES = ('extract_number', 'standardize_datetime')
+
+# 输出簇ID的规则，簇内第一条以外的记录计为问题行
+CLUSTER_RULES = ('deduplicate_near', 'deduplicate_fuzzy')
+
+
+def column_stats(df):
+    """各列的空值数、不同值数、数值个数和最大长度，字段与 profiling.profile_csv 一致"""
+    columns = {}
+    for name in df.columns:
+        values = df[name].astype('string')
+        present = values.dropna()
+        columns[name] = {
+            'nulls': int(values.isna().sum()),
+            'distinct': int(present.nunique()),
+            'numeric': int(present.str.replace('.', '', n=1, regex=False).str.isdigit().sum()),
+            'max_length': int(present.str.len().max()) if len(present) else 0,
+        }
+    return columns
+
+
+def python_value(value):
+    """NumPy 标量转换为 Python 值，便于写入 JSON"""
+    return value.item() if hasattr(value, 'item') else value
+
+
+def samples(values):
+    """取几个不重复的非空问题值样例"""
+    return values.dropna().drop_duplicates().head(SAMPLE_SIZE).tolist()
+
+
+def measure_step(df, column, func, params, store=None):
+    """
+    执行一步规则并统计
+
+    问题行：规则有规范形式判定时为非空且不是规范形式的行，校验规则为校验失败的行，
+    删除行的规则为被删除的行，只标记簇ID的规则为与前面的记录同簇的行，其余规则为输出与输入不同的行。
+    修复行为问题行中清洗结果有效的行。
+
+    Returns:
+        (清洗后的 DataFrame, 该规则的度量)
+    """
+    rows = len(df)
+    raw = df[column].astype('string')
+    present = raw.notna()
+    index = df.index
+
+    started = time.perf_counter()
+    cleaned = apply_step(df, column, func, params, store)
+    stats = {'column': column, 'method': func.rule_name, 'rows': rows, 'nulls': int((~present).sum()),
+             'seconds': time.perf_counter() - started}
+
+    if len(cleaned) != rows:
+        removed = rows - len(cleaned)
+        stats.update(issues=removed, invalid=0, fixed=removed, removed=removed,
+                     samples=samples(raw[~index.isin(cleaned.index)]))
+        return cleaned, stats
+
+    output = cleaned[output_column(column, dict(params, method=func.rule_name))]
+    failed = (~output.astype(bool) if output.dtype == bool else output.isna()).to_numpy()
+    invalid = present.to_numpy() & failed
+
+    if func.rule_name in CLUSTER_RULES:
+        issues = output.duplicated().to_numpy()
+        stats.update(issues=int(issues.sum()), invalid=0, fixed=int(issues.sum()), removed=0,
+                     samples=samples(raw[issues]))
+        return cleaned, stats
+
+    found = None
+    if getattr(func, 'canonical', None) is not None:
+        found = func.canonical(raw, **{k: v for k, v in params.items() if k != 'fast_path'})
+    if found is not None:
+        issues = present.to_numpy() & ~found[0]
+    elif output.dtype == bool:
+        issues = invalid
+    else:
+        # 数值输出按数值比较，'25' 与 25.0 视为相同
+        before = pd.to_numeric(raw, errors='coerce') if output.dtype.kind in 'fi' else raw
+        after = output if output.dtype.kind in 'fi' else output.astype('string')
+        same = before.eq(after).fillna(False) | (raw.isna() & output.isna())
+        issues = ~same.to_numpy(dtype=bool)
+
+    stats.update(issues=int(issues.sum()), invalid=int(invalid.sum()), fixed=int((issues & ~failed).sum()),
+                 removed=0, samples=samples(raw[issues]))
+    if func.rule_name in RANGE_RULES:
+        valid = output.dropna()
+        if len(valid):
+            stats['min'] = python_value(valid.min())
+            stats['max'] = python_value(valid.max())
+    return cleaned, stats
+
+
+def clean_with_metrics(df, spec, normdict=None):
+    """
+    按规则清洗 DataFrame 并统计度量
+
+    Args:
+        spec: {列名: {'method': 规则名, 其他参数...}}，与 DataCleaner.auto_clean 相同
+        normdict: 可选的规范化字典
+
+    Returns:
+        (清洗后的 DataFrame, 度量字典)
+    """
+    metrics = {
+        'rows': len(df),
+        'memory_bytes': int(df.memory_usage(deep=True).sum()),
+        'columns': column_stats(df),
+        'rules': [],
+    }
+    store = None
+    if normdict is not None:
+        from .normdict import open_normdict
+        store = open_normdict(normdict)
+
+    started = time.perf_counter()
+    cleaned = df.copy()
+    for column, func, params in prepare_spec(spec):
+        cleaned, stats = measure_step(cleaned, column, func, params, store)
+        metrics['rules'].append(stats)
+    metrics['seconds'] = time.perf_counter() - started
+    metrics['rows_out'] = len(cleaned)
+    return cleaned, metrics
+
+
+def collect_metrics(path, spec=None, encoding=None):
+    """
+    读取 CSV 并统计度量，文件只读取一次
+
+    Args:
+        spec: 清洗规则，默认使用 ECOMMERCE_SPEC 中输入里存在的列
+        encoding: 文件编码，None 时先按 utf-8 读取，失败再按 gbk
+
+    Returns:
+        度量字典
+    """
+    if encoding is None:
+        try:
+            df = pd.read_csv(path, dtype=str, encoding='utf-8')
+        except UnicodeDecodeError:
+            df = pd.read_csv(path, dtype=str, encoding='gbk')
+    else:
+        df = pd.read_csv(path, dtype=str, encoding=encoding)
+    if spec is None:
+        spec = {column: options for column, options in ECOMMERCE_SPEC.items() if column in df.columns}
+    metrics = clean_with_metrics(df, spec)[1]
+    metrics['source'] = os.path.basename(path)
+    return metrics
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+"""
+跨运行共享的规范化字典
+记录 原始值 -> 规范化值 的映射（按规则名、规则版本和参数区分），存放在 SQLite 中。
+清洗时先查字典，只有没见过的值才真正解析，解析结果写回字典供下次使用。
+"""
+
+import json
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+
+# 单条 SQL 中 IN 参数的数量上限
+LOOKUP_BATCH = 500
+
+# 每个进程按路径复用连接
+_OPENED = {}
+
+
+def rule_key(func, params):
+    """规则名 + 版本 + 参数（不含输出列），规则实现或参数变化后旧映射自动失效"""
+    params = {k: v for k, v in params.items() if k != 'output_col'}
+    return f"{func.rule_name}@{func.version}:" + json.dumps(params, ensure_ascii=False, sort_keys=True)
+
+
+class NormalizationDict:
+    """SQLite 规范化字典，多个进程可同时读写同一文件"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS mapping ('
+            'rule TEXT NOT NULL, raw TEXT NOT NULL, value, '
+            'PRIMARY KEY (rule, raw)) WITHOUT ROWID'
+        )
+        self.conn.commit()
+
+    def lookup(self, key, raws):
+        """
+        批量查询
+
+        Returns:
+            {原始值: 规范化值}，只包含字典中已有的值
+        """
+        found = {}
+        for start in range(0, len(raws), LOOKUP_BATCH):
+            batch = raws[start:start + LOOKUP_BATCH]
+            marks = ','.join('?' * len(batch))
+            rows = self.conn.execute(
+                f'SELECT raw, value FROM mapping WHERE rule = ? AND raw IN ({marks})',
+                [key, *batch])
+            found.update(rows)
+        return found
+
+    def update(self, key, mapping):
+        """写入新映射，已有的值保持不变"""
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO mapping (rule, raw, value) VALUES (?, ?, ?)',
+                [(key, raw, value) for raw, value in mapping.items()])
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM mapping').fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+        _OPENED.pop(self.path, None)
+
+
+def open_normdict(path):
+    """按路径打开规范化字典，同一进程内复用连接"""
+    if isinstance(path, NormalizationDict):
+        return path
+    store = _OPENED.get(str(path))
+    if store is None:
+        store = _OPENED[str(path)] = NormalizationDict(path)
+    return store
+
+
+def apply_cached(df, column, func, params, store):
+    """
+    借助规范化字典执行逐值规则
+
+    只对列中不重复、且字典里没有的值调用规则本身，其余直接查表映射。
+    """
+    raw = df[column].astype('string')
+    uniques = raw.dropna().unique().tolist()
+    key = rule_key(func, params)
+    known = store.lookup(key, uniques)
+
+    missing = [value for value in uniques if value not in known]
+    if missing:
+        parsed = func(pd.DataFrame({column: pd.array(missing, dtype='string')}), column,
+                      **dict(params, output_col=None))[column]
+        learned = {raw_value: None if pd.isna(value) else value
+                   for raw_value, value in zip(missing, parsed.tolist())}
+        store.update(key, learned)
+        known.update(learned)
+
+    # 输出类型与直接执行规则保持一致
+    dtype = func(pd.DataFrame({column: pd.array([], dtype='string')}), column,
+                 **dict(params, output_col=None))[column].dtype
+    mapped = raw.map(known)
+    if dtype == object:
+        mapped = mapped.astype(object).where(mapped.notna(), np.nan)
+    else:
+        mapped = mapped.astype(dtype)
+    df[params.get('output_col') or column] = mapped
+    return df
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+
+"""
+清洗规则共用的格式与正则
+rules（pandas 引擎）、compiler（记录级）、columnar（列式引擎）共用同一份定义；
+本模块不依赖 pandas，轻量引擎导入时不会加载 pandas
+"""
+
+
+# 与传统方法保持一致的时间格式尝试顺序
+DATETIME_FORMATS = [
+    '%Y-%m-%d %H:%M:%S',
+    '%Y/%m/%d',
+    '%Y.%m.%d %H时',
+    '%Y-%m-%d'
+]
+
+DATE_PATTERN = r'(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})'
+
+NUMBER_PATTERN = r'(\d+(?:\.\d+)?)'
+
+PHONE_PATTERNS = {
+    'CN': r'1[3-9]\d{9}'
+}
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""
+数据概况统计（不依赖 pandas）
+"""
+
+import csv
+
+
+def profile_csv(path, encoding='utf-8'):
+    """
+    单遍扫描 CSV，统计每列的空值、不同值和数值占比
+
+    Returns:
+        {'rows': 行数, 'columns': {列名: {'nulls', 'distinct', 'numeric', 'max_length'}}}
+    """
+    with open(path, 'r', newline='', encoding=encoding) as f:
+        reader = csv.reader(f)
+        names = next(reader, [])
+        nulls = [0] * len(names)
+        numeric = [0] * len(names)
+        max_length = [0] * len(names)
+        distinct = [set() for _ in names]
+        rows = 0
+        for row in reader:
+            rows += 1
+            for index, cell in enumerate(row[:len(names)]):
+                if cell == '':
+                    nulls[index] += 1
+                    continue
+                distinct[index].add(cell)
+                if len(cell) > max_length[index]:
+                    max_length[index] = len(cell)
+                if cell.replace('.', '', 1).isdigit():
+                    numeric[index] += 1
+            # 缺列按空值计
+            for index in range(len(row), len(names)):
+                nulls[index] += 1
+
+    columns = {}
+    for index, name in enumerate(names):
+        columns[name] = {
+            'nulls': nulls[index],
+            'distinct': len(distinct[index]),
+            'numeric': numeric[index],
+            'max_length': max_length[index],
+        }
+    return {'rows': rows, 'columns': columns}
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+
+"""
+统一报告引擎
+layout 描述报告内容（章节、段落、表格、列表、图表），renderer 负责排版输出 PDF。
+渲染依赖 fpdf2，只在使用 renderer 时导入。
+"""
+
+from .layout import BulletList, Chart, Paragraph, Report, Section, Table
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""
+批量并行渲染
+一批 (数据, 模板, 输出路径) 任务分给进程池渲染。工作进程启动时解析样式并载入字体度量，
+之后每份报告只付出排版和输出的开销；字形子集通过磁盘缓存在进程间共享。
+"""
+
+import os
+import time
+
+from .renderer import get_renderer
+from .templates import bench_report, cleaning_report, ecommerce_report, profile_report
+
+
+# 按名称引用的模板
+TEMPLATES = {
+    'cleaning': cleaning_report,
+    'ecommerce': ecommerce_report,
+    'profile': profile_report,
+    'bench': bench_report,
+}
+
+# 每次分给一个工作进程的任务数上限
+MAX_CHUNKSIZE = 16
+
+
+def warm_up(style='cjk'):
+    """工作进程初始化：解析样式、查找字体并载入字体度量"""
+    renderer = get_renderer(style)
+    if renderer.style.unicode_font:
+        renderer.font_registry.metrics(renderer.style.unicode_font)
+
+
+def render_job(job, style='cjk', cache=None):
+    """
+    渲染单个任务
+
+    Args:
+        job: (数据, 模板名或模板函数, 输出路径)，模板函数需能被 pickle（模块级函数）
+        cache: 可选的 sections.SectionCache
+
+    Returns:
+        {'output', 'seconds', 'worker_pid'}，出错时为 {'output', 'error'}
+    """
+    data, template, output = job
+    started = time.perf_counter()
+    try:
+        build = TEMPLATES[template] if isinstance(template, str) else template
+        get_renderer(style).render(build(data), output, cache=cache)
+    except Exception as e:
+        return {'output': output, 'error': f"{type(e).__name__}: {e}"}
+    return {'output': output, 'seconds': time.perf_counter() - started, 'worker_pid': os.getpid()}
+
+
+def render_chunk(jobs, style, cache=None):
+    return [render_job(job, style, cache) for job in jobs]
+
+
+def render_batch(jobs, workers=None, style='cjk', cache=None):
+    """
+    并行渲染一批报告
+
+    每份报告先写入同目录的临时文件再改名，中途失败或被中断不会留下写了一半的 PDF；
+    单个任务出错不影响其他任务。
+
+    Args:
+        jobs: [(数据, 模板名或模板函数, 输出路径)]，模板名见 TEMPLATES
+        workers: 进程数，默认 CPU 核数；为 1 时在当前进程中依次渲染
+        style: 样式名
+        cache: 可选的 sections.SectionCache，各进程共享同一个缓存目录
+
+    Returns:
+        与 jobs 顺序一致的结果列表，见 render_job
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs = list(jobs)
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    warm_up(style)
+    if workers <= 1:
+        return [render_job(job, style, cache) for job in jobs]
+
+    # 任务按块分发，减少进程间往返；块不宜太大，以免最后几个进程空等
+    size = max(1, min(MAX_CHUNKSIZE, len(jobs) // (workers * 4)))
+    chunks = [jobs[i:i + size] for i in range(0, len(jobs), size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm_up, initargs=(style,)) as pool:
+        results = pool.map(render_chunk, chunks, [style] * len(chunks), [cache] * len(chunks))
+        return [result for chunk in results for result in chunk]
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+"""
+矢量图表
+条形图、折线图和直方图直接用 PDF 路径绘制；长序列先用 LTTB（Largest-Triangle-Three-Buckets）
+降采样，PDF 大小和绘制耗时不随序列长度增长，同时保留峰谷形状。
+"""
+
+import numpy as np
+
+from .widths import fit_text, measure
+
+
+# 折线图最多绘制的点数
+MAX_CHART_POINTS = 500
+
+CHART_HEIGHT = 55
+# 纵轴刻度文字占用的宽度
+AXIS_WIDTH = 18
+LABEL_SIZE = 8
+BAR_HEIGHT = 6
+BAR_LABEL_WIDTH = 40
+BAR_MAX_WIDTH = 100
+Y_TICKS = 4
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets 降采样
+
+    保留首尾两点，中间的点均分为 threshold - 2 个桶，每个桶选出与前一个选中点、
+    下一个桶均值点构成的三角形面积最大的点。
+
+    Returns:
+        选中点的下标数组（递增）
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return selected
+
+
+def numeric_axis(labels):
+    """把横轴标签转换为数值（数字或时间），无法转换时按位置等距排列"""
+    try:
+        return np.asarray(labels, dtype=np.float64)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return np.asarray(labels, dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+    except (TypeError, ValueError):
+        return np.arange(len(labels), dtype=np.float64)
+
+
+def reserve(pdf, height):
+    """剩余空间不够时换页"""
+    if pdf.get_y() + height > pdf.page_break_trigger:
+        pdf.add_page()
+
+
+def draw_label(pdf, x, y, text, width, align='C'):
+    """在宽度 width 内绘制一行小字，超出时截断"""
+    text = pdf.clean_text(text)
+    text_width = measure(pdf, [text])[0]
+    if text_width > width:
+        text = fit_text(pdf, text, width)
+        text_width = measure(pdf, [text])[0]
+    if align == 'C':
+        x += (width - text_width) / 2
+    elif align == 'R':
+        x += width - text_width
+    pdf.text(x, y, text)
+
+
+def draw_bar_chart(pdf, labels, values, value_format='{:.1f}'):
+    """横向条形图，条长按最大值归一化"""
+    values = [max(float(value), 0.0) for value in values]
+    max_value = max(values, default=0) or 1
+    pdf.set_font(pdf.style.font, '', pdf.style.table_size)
+    pdf.set_fill_color(*pdf.style.bar_fill)
+    baseline = 0.5 * BAR_HEIGHT + 0.3 * pdf.font_size
+    for label, value in zip(labels, values):
+        reserve(pdf, BAR_HEIGHT)
+        x, y = pdf.l_margin, pdf.get_y()
+        draw_label(pdf, x, y + baseline, label, BAR_LABEL_WIDTH - 2, align='L')
+        length = value / max_value * BAR_MAX_WIDTH
+        pdf.line(x + BAR_LABEL_WIDTH, y, x + BAR_LABEL_WIDTH, y + BAR_HEIGHT)
+        if length > 0:
+            pdf.rect(x + BAR_LABEL_WIDTH, y + 1, length, BAR_HEIGHT - 2, style='F')
+        draw_label(pdf, x + BAR_LABEL_WIDTH + length + 2, y + baseline, value_format.format(value), 30, align='L')
+        pdf.set_y(y + BAR_HEIGHT)
+
+
+def plot_area(pdf, low, high, value_format):
+    """画出坐标轴和纵轴刻度，返回 (左, 上, 宽, 高, 数值到纵坐标的换算函数)"""
+    reserve(pdf, CHART_HEIGHT + 8)
+    left = pdf.l_margin + AXIS_WIDTH
+    top = pdf.get_y() + 2
+    width = pdf.epw - AXIS_WIDTH
+    height = CHART_HEIGHT
+    if high <= low:
+        low, high = low - 1, high + 1
+
+    def to_y(value):
+        return top + height - (value - low) / (high - low) * height
+
+    pdf.set_font(pdf.style.font, '', LABEL_SIZE)
+    pdf.set_draw_color(200, 200, 200)
+    for tick in np.linspace(low, high, Y_TICKS + 1):
+        y = to_y(tick)
+        pdf.line(left, y, left + width, y)
+        draw_label(pdf, pdf.l_margin, y + 1, value_format.format(tick), AXIS_WIDTH - 2, align='R')
+    pdf.set_draw_color(0, 0, 0)
+    pdf.line(left, top, left, top + height)
+    pdf.line(left, top + height, left + width, top + height)
+    return left, top, width, height, to_y
+
+
+def draw_x_labels(pdf, left, top, width, height, positions, labels):
+    """在横轴下方绘制若干标签"""
+    slot = width / max(len(labels), 1)
+    for position, label in zip(positions, labels):
+        x = min(max(position - slot / 2, left - AXIS_WIDTH / 2), left + width - slot)
+        draw_label(pdf, x, top + height + 4, label, slot)
+    pdf.set_y(top + height + 7)
+
+
+def draw_line_chart(pdf, labels, values, value_format='{:.1f}', max_points=MAX_CHART_POINTS):
+    """
+    折线图，超过 max_points 个点时先用 LTTB 降采样
+
+    Args:
+        labels: 横轴取值（数字、时间或任意标签）
+        values: 纵轴数值，非有限值会被跳过
+    """
+    x = numeric_axis(labels)
+    y = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(x) & np.isfinite(y)
+    keep = np.flatnonzero(finite)
+    if not len(keep):
+        return
+    keep = keep[lttb(x[keep], y[keep], max_points)]
+    x, y = x[keep], y[keep]
+
+    left, top, width, height, to_y = plot_area(pdf, y.min(), y.max(), value_format)
+    span = x[-1] - x[0] or 1
+    px = left + (x - x[0]) / span * width
+    py = to_y(y)
+    pdf.set_draw_color(*pdf.style.bar_fill)
+    pdf.set_line_width(0.4)
+    if len(px) == 1:
+        pdf.circle(px[0], py[0], 0.8, style='F')
+    else:
+        pdf.polyline(list(zip(px.tolist(), py.tolist())))
+    pdf.set_line_width(0.2)
+    pdf.set_draw_color(0, 0, 0)
+
+    ticks = sorted({0, len(keep) // 2, len(keep) - 1})
+    draw_x_labels(pdf, left, top, width, height, px[ticks], [labels[keep[i]] for i in ticks])
+
+
+def draw_histogram(pdf, values, bins=20, value_format='{:.1f}'):
+    """直方图，values 中的非有限值不计入"""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return
+    counts, edges = np.histogram(values, bins=bins)
+    left, top, width, height, to_y = plot_area(pdf, 0, counts.max(), '{:.0f}')
+    bar_width = width / len(counts)
+    pdf.set_fill_color(*pdf.style.bar_fill)
+    for index, count in enumerate(counts.tolist()):
+        if count:
+            y = to_y(count)
+            pdf.rect(left + index * bar_width, y, bar_width * 0.9, top + height - y, style='F')
+    ticks = sorted({0, len(counts) // 2, len(counts)})
+    draw_x_labels(pdf, left, top, width, height, [left + i * bar_width for i in ticks],
+                  [value_format.format(edges[i]) for i in ticks])
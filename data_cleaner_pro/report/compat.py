@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""
+fpdf2 版本兼容
+共用字体和页眉、页面预压缩、章节缓存等优化依赖 fpdf2 的私有接口（输出阶段的 _add_fonts 等方法、
+资源目录、内容流压缩级别、图形状态栈），这些接口不保证跨版本稳定。
+只在测试过的版本范围内且私有接口都存在时启用这些优化，否则退回 fpdf2 的标准流程，生成的报告内容相同。
+私有模块只在检查时按名称导入，报告模块也只在启用优化的分支中导入，私有模块移动后仍能退回标准流程。
+"""
+
+import functools
+import importlib
+import re
+
+import fpdf
+from fpdf import FPDF
+
+
+# 测试过的 fpdf2 版本范围 [下限, 上限)，与 requirements.txt 中的 fpdf2 版本要求一致
+FPDF_VERSION_RANGE = ((2, 8, 9), (2, 9))
+
+# 依赖的私有类、函数及其属性 (模块, 名称, 属性)，属性为 None 时只检查名称存在
+PRIVATE_CLASS_API = [
+    ('fpdf.output', 'OutputProducer', '_add_pdf_obj'),
+    ('fpdf.output', 'OutputProducer', '_add_fonts'),
+    ('fpdf.output', 'OutputProducer', '_add_resources_dict'),
+    ('fpdf.output', 'OutputProducer', '_add_pages'),
+    ('fpdf.output', 'OutputProducer', '_finalize_form_xobjects'),
+    ('fpdf.output', 'ResourceCatalog', 'FONT_REGEX'),
+    ('fpdf.syntax', 'PDFContentStream', '_COMPRESSION_LEVEL'),
+    ('fpdf.syntax', 'Name', None),
+    ('fpdf.syntax', 'PDFArray', None),
+    ('fpdf.enums', 'PDFResourceType', 'X_OBJECT'),
+    ('fpdf.fonts', 'TTFFont', None),
+    ('fpdf.fonts', 'PDFFontDescriptor', None),
+    ('fpdf.fonts', 'SubsetMap', None),
+    ('fpdf.font_type_3', 'get_color_font_object', None),
+    ('fpdf', 'FPDF', '_get_current_graphics_state'),
+    ('fpdf', 'FPDF', '_push_local_stack'),
+    ('fpdf', 'FPDF', '_pop_local_stack'),
+]
+
+# 依赖的私有实例属性（新建文档后检查）
+PRIVATE_DOCUMENT_API = ['_resource_catalog', '_lasth']
+PRIVATE_CATALOG_API = ['font_registry', 'form_xobjects', 'next_xobject_index', 'resources_per_page']
+
+
+def parse_version(text):
+    """'2.8.9' -> (2, 8, 9)，忽略 'rc1' 等后缀"""
+    parts = []
+    for part in str(text).split('.'):
+        match = re.match(r'\d+', part)
+        if match is None:
+            break
+        parts.append(int(match.group()))
+    return tuple(parts)
+
+
+def version_supported(version=None):
+    """fpdf2 版本是否在 FPDF_VERSION_RANGE 内"""
+    low, high = FPDF_VERSION_RANGE
+    return low <= parse_version(version or fpdf.FPDF_VERSION) < high
+
+
+def resolve(module, owner, name):
+    """按名称取私有接口，模块、名称或属性不存在时返回 None"""
+    try:
+        owner = getattr(importlib.import_module(module), owner)
+    except (ImportError, AttributeError):
+        return None
+    return owner if name is None else getattr(owner, name, None)
+
+
+def missing_private_api():
+    """当前 fpdf2 中缺少的私有接口名"""
+    missing = [f"{module}.{owner}" + (f".{name}" if name else '') for module, owner, name in PRIVATE_CLASS_API
+               if resolve(module, owner, name) is None]
+    pdf = FPDF()
+    missing += [f"FPDF.{name}" for name in PRIVATE_DOCUMENT_API if not hasattr(pdf, name)]
+    catalog = getattr(pdf, '_resource_catalog', None)
+    missing += [f"ResourceCatalog.{name}" for name in PRIVATE_CATALOG_API if not hasattr(catalog, name)]
+    return missing
+
+
+@functools.lru_cache(maxsize=None)
+def fpdf_supported():
+    """是否启用依赖私有接口的优化，进程内只检查一次"""
+    return version_supported() and not missing_private_api()
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+
+"""
+字体注册表
+中文字体在进程内只查找一次。字体度量（字宽表、cmap、字形编号）解析后按字体文件哈希缓存到磁盘，
+新文档直接用缓存的度量构造字体对象，不再用 fontTools 逐字解析整个字体；
+输出时的字形子集按 (字体哈希, 字形集合) 缓存，内容相同的报告不必再对整个字体做子集化。
+"""
+
+import hashlib
+import io
+import os
+import pickle
+import tempfile
+from collections import defaultdict
+
+import fpdf
+from fontTools import ttLib
+from fpdf.enums import TextEmphasis
+
+from ..cache import DEFAULT_CACHE_DIR, file_digest
+from .compat import fpdf_supported
+
+
+# 指定中文字体文件，优先于自动查找
+FONT_ENV = 'DATA_CLEANER_FONT'
+
+# 按顺序查找的中文字体
+CJK_FONT_PATHS = [
+    'C:/Windows/Fonts/simsun.ttc',
+    'C:/Windows/Fonts/simsun.ttf',
+    'C:/Windows/Fonts/msyh.ttc',
+    'C:/Windows/Fonts/msyh.ttf',
+    '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',
+    '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc',
+    '/System/Library/Fonts/PingFang.ttc',
+]
+
+# 上面的路径都不存在时，在这些目录中按文件名查找
+FONT_DIRS = ['/usr/share/fonts', '/usr/local/share/fonts', os.path.expanduser('~/.fonts'),
+             os.path.expanduser('~/.local/share/fonts')]
+CJK_FONT_NAMES = ('simsun', 'msyh', 'wqy', 'notosanscjk', 'notoserifcjk', 'sourcehansans', 'droidsansfallback')
+FONT_SUFFIXES = ('.ttf', '.ttc', '.otf')
+
+# 度量缓存的格式版本，TTFFont 字段变化时递增
+METRICS_VERSION = 1
+
+DESCRIPTOR_FIELDS = ('ascent', 'descent', 'cap_height', 'flags', 'font_b_box', 'italic_angle', 'stem_v',
+                     'missing_width')
+METRIC_FIELDS = ('name', 'scale', 'up', 'ut', 'sp', 'ss', 'is_cff', 'is_cid_keyed', 'is_symbol', 'cff_ros',
+                 'cmap', 'glyph_ids')
+
+
+def discover_cjk_font():
+    """按 环境变量 → 常见路径 → 字体目录 的顺序查找中文字体，找不到时返回 None"""
+    path = os.environ.get(FONT_ENV)
+    if path and os.path.exists(path):
+        return path
+    for path in CJK_FONT_PATHS:
+        if os.path.exists(path):
+            return path
+    for directory in FONT_DIRS:
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                lower = name.lower().replace('-', '')
+                if lower.endswith(FONT_SUFFIXES) and lower.startswith(CJK_FONT_NAMES):
+                    return os.path.join(root, name)
+    return None
+
+
+def parse_metrics(path):
+    """
+    用 fpdf 解析字体并取出与文档无关的度量
+
+    Returns:
+        度量字典；字体缺少 .notdef 字形（fpdf 会改写字体）或为压缩格式时返回 None，由 add_font 处理
+    """
+    from fpdf.fonts import TTFFont
+
+    probe = ttLib.TTFont(path, lazy=True, fontNumber=0)
+    if '.notdef' not in probe.getGlyphOrder() or str(path).lower().endswith(('.woff', '.woff2')):
+        return None
+    font = TTFFont(fpdf.FPDF(), path, 'probe', '')
+    metrics = {field: getattr(font, field) for field in METRIC_FIELDS}
+    metrics['desc'] = {field: getattr(font.desc, field) for field in DESCRIPTOR_FIELDS}
+    metrics['cw'] = dict(font.cw)
+    return metrics
+
+
+class FontRegistry:
+    """
+    进程内共享的字体注册表
+
+    度量缓存位于 cache_dir/<字体哈希>.metrics，子集缓存位于 cache_dir/subsets/；
+    缓存目录不可写时只使用进程内缓存。
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.path.join(DEFAULT_CACHE_DIR, 'fonts')
+        self._cjk = []
+        self._metrics = {}
+
+    def cjk_font(self):
+        """中文字体路径，进程内只查找一次"""
+        if not self._cjk:
+            self._cjk.append(discover_cjk_font())
+        return self._cjk[0]
+
+    def metrics(self, path):
+        """
+        取字体度量：进程内缓存 → 磁盘缓存 → 解析字体
+
+        Returns:
+            (字体哈希, 度量字典或 None)；fpdf2 版本不受支持时为 (None, None)，字体交给 add_font 解析
+        """
+        if not fpdf_supported():
+            return None, None
+        path = os.path.abspath(path)
+        if path not in self._metrics:
+            digest = hashlib.blake2b(
+                f"{file_digest(path)}:{fpdf.FPDF_VERSION}:{METRICS_VERSION}".encode(), digest_size=20).hexdigest()
+            cache_path = os.path.join(self.cache_dir, f"{digest}.metrics")
+            metrics = self._read(cache_path)
+            if metrics is None:
+                metrics = parse_metrics(path)
+                if metrics is not None:
+                    self._write(cache_path, metrics)
+            self._metrics[path] = (digest, metrics)
+        return self._metrics[path]
+
+    def install(self, pdf, family, path, styles=('', 'B', 'I')):
+        """
+        把字体注册到文档，返回 {fontkey: 字体哈希}（用于输出时查找子集缓存）
+
+        各个样式用的是同一个字体文件（fpdf 不会为 TTF 字体模拟粗体、斜体），注册为同一个字体对象：
+        文档中只嵌入一份字形子集，各样式共用一个字体资源。共用字体对象要靠 PackedOutputProducer 去重输出，
+        build_font 要写 TTFFont 的内部字段，fpdf2 版本不受支持时每个样式都用 add_font 单独注册。
+        """
+        digest, metrics = self.metrics(path)
+        fontkey = family.lower()
+        if not fpdf_supported():
+            for style in styles:
+                pdf.add_font(family, style, path)
+            return {}
+        if metrics is None:
+            pdf.add_font(family, '', path)
+            installed = {}
+        else:
+            pdf.fonts[fontkey] = self.build_font(pdf, path, fontkey, '', metrics)
+            installed = {fontkey: digest}
+        for style in styles:
+            pdf.fonts[f"{fontkey}{style}"] = pdf.fonts[fontkey]
+        return installed
+
+    def build_font(self, pdf, path, fontkey, style, metrics):
+        """
+        按缓存的度量构造 TTFFont，字段与 TTFFont.__init__ 设置的一致
+
+        绕过 __init__ 直接写内部字段，只在 compat.fpdf_supported() 时调用；
+        测试逐一比对字段，fpdf2 增删字段时会失败。
+        """
+        from fpdf.font_type_3 import get_color_font_object
+        from fpdf.fonts import PDFFontDescriptor, SubsetMap, TTFFont
+
+        font = TTFFont.__new__(TTFFont)
+        for field in METRIC_FIELDS:
+            setattr(font, field, metrics[field])
+        font.i = len(pdf.fonts) + 1
+        font.type = 'TTF'
+        font.ttffile = path
+        font.fontkey = fontkey
+        font.is_compressed = False
+        font.collection_font_number = 0
+        font.biggest_size_pt = 0
+        font._hbfont = None
+        # 子集化会原地修改 ttfont，每个文档单独打开（lazy 模式只读取表目录）
+        font.ttfont = ttLib.TTFont(path, recalcTimestamp=False, fontNumber=0, lazy=True)
+        font.desc = PDFFontDescriptor(**metrics['desc'])
+        # 查询不存在的字符会写入默认宽度，每个文档使用自己的副本
+        default_width = metrics['desc']['missing_width']
+        font.cw = defaultdict(lambda: default_width, metrics['cw'])
+        font.missing_glyphs = []
+        font.emphasis = TextEmphasis.coerce(style)
+        font.subset = SubsetMap(font)
+        font.palette_index = 0
+        font.color_font = get_color_font_object(pdf, font, 0) if pdf.render_color_fonts else None
+        return font
+
+    def subset_path(self, digest, font):
+        names = sorted(font.subset.get_all_glyph_names())
+        key = hashlib.blake2b('\n'.join([digest] + names).encode('utf-8'), digest_size=20).hexdigest()
+        return os.path.join(self.cache_dir, 'subsets', f"{key}.subset")
+
+    def load_subsets(self, pdf, installed):
+        """
+        输出前调用：命中子集缓存的字体换成已子集化的小字体
+
+        Returns:
+            未命中的 [(fontkey, 缓存路径)]，输出后交给 save_subsets
+        """
+        pending = []
+        for fontkey, digest in installed.items():
+            font = pdf.fonts[fontkey]
+            path = self.subset_path(digest, font)
+            cached = self._read(path)
+            if cached is None:
+                pending.append((fontkey, path))
+                continue
+            glyph_order, data = cached
+            ttfont = ttLib.TTFont(io.BytesIO(data), recalcTimestamp=False, lazy=True)
+            # 子集字体不保存字形名，恢复原字体中的名称，fpdf 按名称查找字形编号
+            ttfont.setGlyphOrder(glyph_order)
+            font.ttfont = ttfont
+        return pending
+
+    def save_subsets(self, pdf, pending):
+        """输出后调用：fpdf 已原地子集化 ttfont，直接保存"""
+        for fontkey, path in pending:
+            ttfont = pdf.fonts[fontkey].ttfont
+            buffer = io.BytesIO()
+            ttfont.save(buffer)
+            self._write(path, (ttfont.getGlyphOrder(), buffer.getvalue()))
+
+    def _read(self, path):
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _write(self, path, value):
+        # 先写临时文件再改名，并发进程不会读到写了一半的缓存
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+
+_REGISTRIES = {}
+
+
+def get_font_registry(cache_dir=None):
+    """取进程内共享的字体注册表"""
+    if cache_dir not in _REGISTRIES:
+        _REGISTRIES[cache_dir] = FontRegistry(cache_dir)
+    return _REGISTRIES[cache_dir]
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+"""
+报告版式模型
+报告由章节组成，章节内依次排列段落、表格、列表和图表；模型本身不依赖 fpdf
+"""
+
+
+class Paragraph:
+    """段落"""
+
+    kind = 'paragraph'
+
+    def __init__(self, text):
+        self.text = text
+
+
+class Table:
+    """
+    表格，col_widths 为 None 时按内容自动计算列宽
+
+    rows 可以是行列表、行迭代器、DataFrame 或 DataFrame 分块迭代器，渲染时逐行读取并自动分页。
+    """
+
+    kind = 'table'
+
+    def __init__(self, headers, rows, col_widths=None):
+        self.headers = list(headers)
+        self.rows = rows
+        self.col_widths = col_widths
+
+
+class BulletList:
+    """项目符号列表"""
+
+    kind = 'bullets'
+
+    def __init__(self, items):
+        self.items = list(items)
+
+
+class Chart:
+    """
+    图表，labels 与 values 一一对应
+
+    chart_type 为 'bar'（条形图）、'line'（折线图，超过 max_points 个点时降采样）
+    或 'histogram'（values 的分布，分 bins 组，labels 不使用）。
+    """
+
+    kind = 'chart'
+
+    def __init__(self, labels, values, title=None, value_format='{:.1f}', chart_type='bar',
+                 bins=20, max_points=500):
+        self.labels = list(labels)
+        self.values = list(values)
+        self.title = title
+        self.value_format = value_format
+        self.chart_type = chart_type
+        self.bins = bins
+        self.max_points = max_points
+
+
+class Section:
+    """章节：标题 + 按顺序排列的内容块"""
+
+    def __init__(self, title, level=1, blocks=None):
+        self.title = title
+        self.level = level
+        self.blocks = list(blocks or [])
+
+    def add(self, block):
+        self.blocks.append(block)
+        return self
+
+    def text(self, text):
+        return self.add(Paragraph(text))
+
+    def table(self, headers, rows, col_widths=None):
+        return self.add(Table(headers, rows, col_widths))
+
+    def bullets(self, items):
+        return self.add(BulletList(items))
+
+    def chart(self, labels, values, title=None, value_format='{:.1f}'):
+        return self.add(Chart(labels, values, title, value_format))
+
+    def line_chart(self, labels, values, title=None, value_format='{:.1f}', max_points=500):
+        return self.add(Chart(labels, values, title, value_format, chart_type='line', max_points=max_points))
+
+    def histogram(self, values, title=None, bins=20, value_format='{:.1f}'):
+        return self.add(Chart([], values, title, value_format, chart_type='histogram', bins=bins))
+
+
+class Report:
+    """报告"""
+
+    def __init__(self, title, sections=None):
+        self.title = title
+        self.sections = list(sections or [])
+
+    def section(self, title, level=1):
+        """追加一个章节并返回它，便于链式添加内容"""
+        section = Section(title, level)
+        self.sections.append(section)
+        return section
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""
+去重压缩的 PDF 输出
+PackedOutputProducer 继承并覆盖 fpdf2 的私有输出接口，只在 compat.fpdf_supported() 时由
+ReportPDF.output 导入；这些接口在其他版本中改动或移除时，renderer 仍能导入并退回标准输出。
+"""
+
+import zlib
+
+from fpdf.output import OutputProducer
+from fpdf.syntax import Name, PDFContentStream
+
+from .renderer import PackedContents
+
+
+class PackedOutputProducer(OutputProducer):
+    """
+    输出时直接使用已压缩的页面内容，不再重复压缩
+
+    同时去掉重复对象：同一字体的各样式共用一个字体对象，内容相同的资源字典只写一份，
+    fpdf 未压缩的流（如 ToUnicode 映射）也压缩输出。
+    覆盖的都是 fpdf2 的私有方法，只在 compat.fpdf_supported() 时使用。
+    """
+
+    def __init__(self, fpdf):
+        super().__init__(fpdf)
+        self._shared_resources = {}
+
+    def _add_pdf_obj(self, pdf_obj, trace_label=None):
+        if (type(pdf_obj) is PDFContentStream and self.fpdf.compress and pdf_obj.filter is None
+                and isinstance(pdf_obj._contents, (bytes, bytearray))):
+            pdf_obj._contents = zlib.compress(pdf_obj._contents, level=PDFContentStream._COMPRESSION_LEVEL)
+            pdf_obj.filter = Name('FlateDecode')
+            pdf_obj.length = len(pdf_obj._contents)
+        return super()._add_pdf_obj(pdf_obj, trace_label)
+
+    def _add_fonts(self, *args):
+        # 各样式共用的字体对象只输出一次
+        catalog = self.fpdf._resource_catalog
+        fonts = catalog.font_registry
+        unique = {}
+        for fontkey, font in fonts.items():
+            unique.setdefault(id(font), (fontkey, font))
+        catalog.font_registry = dict(unique.values())
+        try:
+            return super()._add_fonts(*args)
+        finally:
+            catalog.font_registry = fonts
+
+    def _finalize_form_xobjects(self, img_objs_per_index, gfxstate_objs_per_name, pattern_objs_per_name,
+                                shading_objs_per_name, font_objs_per_index):
+        super()._finalize_form_xobjects(img_objs_per_index, gfxstate_objs_per_name, pattern_objs_per_name,
+                                        shading_objs_per_name, font_objs_per_index)
+        # ReportPDF.register_form 创建的表单只引用字体
+        for _, xobject in self.fpdf._resource_catalog.form_xobjects:
+            fonts = getattr(xobject, '_font_ids', None)
+            if fonts is not None:
+                xobject.resources = self._add_resources_dict(
+                    {index: font_objs_per_index[index] for index in fonts}, {}, {}, {}, {})
+
+    def _add_resources_dict(self, *objs_per_key):
+        # 各页引用的资源相同时共用一个资源字典对象
+        key = tuple(tuple(sorted((name, id(obj)) for name, obj in (objs or {}).items()))
+                    for objs in objs_per_key)
+        resources = self._shared_resources.get(key)
+        if resources is None:
+            resources = self._shared_resources[key] = super()._add_resources_dict(*objs_per_key)
+        return resources
+
+    def _add_pages(self, _slice=slice(0, None)):
+        packed = {}
+        for page in self.fpdf.pages.values():
+            if isinstance(page.contents, PackedContents):
+                packed[id(page)] = page.contents
+                page.contents = bytearray()
+        page_objs = super()._add_pages(_slice)
+        for page in self.fpdf.pages.values():
+            data = packed.get(id(page))
+            if data is None:
+                continue
+            if isinstance(page.contents, PDFContentStream):
+                page.contents._contents = bytes(data)
+                page.contents.filter = Name('FlateDecode')
+                page.contents.length = len(data)
+            else:
+                page.contents = data
+        return page_objs
@@ -0,0 +1,413 @@
+# -*- coding: utf-8 -*-
+
+"""
+PDF 渲染器
+字体、样式和页眉页脚模板在 ReportRenderer 中只解析一次，同一进程内生成多份报告时复用；
+每份报告只新建一个 ReportPDF 文档对象。
+"""
+
+import os
+import warnings
+import zlib
+from datetime import datetime
+
+from fpdf import FPDF
+from fpdf.enums import XPos, YPos
+
+from .charts import MAX_CHART_POINTS, draw_bar_chart, draw_histogram, draw_line_chart
+from .compat import fpdf_supported
+from .fonts import get_font_registry
+from .tables import draw_table
+from .text import get_table, sanitize
+
+
+# 注册到文档中的中文字体名
+CJK_FAMILY = 'ChineseFont'
+
+
+class ReportStyle:
+    """报告样式：字体、字号、配色和页眉页脚文字"""
+
+    def __init__(self, font='helvetica', unicode_font=None, ascii_only=False, bullet='-',
+                 transliterate=False, cjk_fallback=True, generated_label='Generated', page_label='Page {}',
+                 heading_sizes=(14, 12, 11), text_size=11, table_size=10,
+                 header_fill=(200, 220, 255), bar_fill=(100, 150, 255)):
+        """
+        Args:
+            font: 字体名，core 字体或 unicode_font 注册的字体名
+            unicode_font: 需要注册的 TTF 字体路径，None 表示使用 core 字体
+            ascii_only: 只使用 ASCII 字符，无法转换的字符替换为空格（兼容原 BasicPDFReport）
+            transliterate: core 字体下中文等字符按拼音转写（需要安装 unidecode）
+            cjk_fallback: core 字体下遇到无法转换的文字（如中文）时改用中文字体，找不到字体时才替换
+        """
+        self.font = font
+        self.unicode_font = unicode_font
+        self.ascii_only = ascii_only
+        self.bullet = bullet
+        self.transliterate = transliterate
+        self.cjk_fallback = cjk_fallback
+        self.generated_label = generated_label
+        self.page_label = page_label
+        self.heading_sizes = heading_sizes
+        self.text_size = text_size
+        self.table_size = table_size
+        self.header_fill = header_fill
+        self.bar_fill = bar_fill
+
+    def replace(self, **changes):
+        """返回修改部分属性后的副本"""
+        options = dict(vars(self))
+        options.update(changes)
+        return ReportStyle(**options)
+
+
+STYLES = {
+    'basic': ReportStyle(ascii_only=True),
+    'simple': ReportStyle(),
+    'cjk': ReportStyle(font=CJK_FAMILY, unicode_font='cjk', bullet='•',
+                       generated_label='生成时间', page_label='第 {} 页'),
+}
+
+
+def resolve_style(name):
+    """
+    按名称取样式并解析字体路径
+
+    需要中文字体但系统中没有时给出警告，退回 core 字体（中文会显示为 ?）。
+    """
+    style = STYLES[name]
+    if style.unicode_font != 'cjk':
+        return style
+    path = get_font_registry().cjk_font()
+    if path is None:
+        warnings.warn("未找到中文字体，报告将使用内置字体，中文字符无法显示")
+        return STYLES['simple']
+    return style.replace(unicode_font=path)
+
+
+class PackedContents(bytes):
+    """已压缩的页面内容流，由 packed.PackedOutputProducer 输出"""
+
+
+class ReportPDF(FPDF):
+    """按 ReportStyle 绘制的 PDF 文档，提供标题、段落、表格、列表和图表等基本元素"""
+
+    def __init__(self, title, style, font_registry=None):
+        super().__init__()
+        self.title = title
+        self.style = style
+        self.font_registry = font_registry or get_font_registry()
+        self.generated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.set_auto_page_break(auto=True, margin=15)
+        self.installed_fonts = {}
+        if style.unicode_font:
+            self.installed_fonts = self.font_registry.install(self, style.font, style.unicode_font)
+        self.text_table = get_table('ascii' if style.ascii_only else 'latin-1', style.transliterate)
+        # 内容需要时改用的中文字体名，None 表示仍使用 core 字体；False 表示找不到中文字体
+        self.cjk_family = None
+        # 正在记录的章节（sections.SectionRecorder），换页时切分内容片段
+        self.recorder = None
+        # 页眉的表单 XObject 编号；第二页页眉与上一页相同时才创建
+        self.header_form = None
+        self.header_bytes = None
+        self.header_origin = None
+
+    def add_page(self, *args, **kwargs):
+        if self.recorder is not None:
+            self.recorder.end()
+        super().add_page(*args, **kwargs)
+        if self.page > 1:
+            self.pack_page(self.page - 1)
+        if self.recorder is not None:
+            self.recorder.begin()
+
+    def register_style_fonts(self):
+        """
+        预先注册样式用到的字体，并固定常用字符的字形子集编号
+
+        章节缓存要求章节开始时的字体编号和子集编号与缓存时一致；预先注册后，
+        前面章节的内容变化（如新出现的数字）不会改变后面章节引用的编号。
+        """
+        state = self._get_current_graphics_state()
+        for emphasis in ('I', 'B', ''):
+            self.set_font(self.style.font, emphasis)
+        self._pop_local_stack()
+        self._push_local_stack(state)
+
+        chars = set(map(chr, range(0x20, 0x7f)))
+        chars.update(self.title, self.style.generated_label, self.style.page_label, self.style.bullet)
+        for font in self.fonts.values():
+            subset = getattr(font, 'subset', None)
+            if subset is None:
+                continue
+            for char in sorted(chars):
+                if ord(char) in font.cmap:
+                    subset.pick(ord(char))
+
+    def pack_page(self, page_no):
+        """
+        压缩已完成的页面内容，长表格占用的内存约为压缩后 PDF 的大小
+
+        压缩级别与 fpdf 输出时相同，生成的文件不变；含总页数占位符的页面要在输出时替换，不压缩。
+        压缩后的内容由 PackedOutputProducer 输出，fpdf2 版本不受支持时不压缩。
+        """
+        page = self.pages[page_no]
+        if (not fpdf_supported() or not self.compress or self.toc_placeholder or page.get_text_substitutions()
+                or not isinstance(page.contents, bytearray)):
+            return
+        from fpdf.syntax import PDFContentStream
+
+        page.contents = PackedContents(zlib.compress(page.contents, level=PDFContentStream._COMPRESSION_LEVEL))
+
+    def output(self, *args, **kwargs):
+        """输出 PDF，注册表中的字体先查子集缓存；fpdf2 版本不受支持时使用标准的输出流程"""
+        pending = self.font_registry.load_subsets(self, self.installed_fonts)
+        if fpdf_supported():
+            from .packed import PackedOutputProducer
+
+            kwargs.setdefault('output_producer_class', PackedOutputProducer)
+        result = super().output(*args, **kwargs)
+        self.font_registry.save_subsets(self, pending)
+        return result
+
+    def set_font(self, family=None, style='', size=0):
+        # 改用中文字体后，样式字体都换成中文字体
+        if self.cjk_family and family and family.lower() == self.style.font.lower():
+            family = self.cjk_family
+        super().set_font(family, style, size)
+
+    def use_cjk_font(self):
+        """
+        改用中文字体（字体注册表缓存的字体和度量），之后的文本都用中文字体绘制
+
+        Returns:
+            是否已改用中文字体
+        """
+        if self.cjk_family is None:
+            path = self.font_registry.cjk_font() if self.style.cjk_fallback else None
+            if path is None:
+                self.cjk_family = False
+                return False
+            self.installed_fonts.update(self.font_registry.install(self, CJK_FAMILY, path))
+            self.cjk_family = CJK_FAMILY
+            if self.font_family:
+                self.set_font(self.style.font, self.font_style, self.font_size_pt)
+        return bool(self.cjk_family)
+
+    def clean_text(self, text):
+        """把文本转换为当前字体可以显示的字符，整段文本用转换表一遍转换"""
+        text = str(text)
+        if self.style.unicode_font or self.cjk_family:
+            return text
+        result, missing = sanitize(text, self.text_table, ' ' if self.style.ascii_only else '?')
+        if missing and self.use_cjk_font():
+            return text
+        return result
+
+    def header(self):
+        # 填充色会影响文字颜色的输出方式，页眉先设为默认值，各页页眉内容才会相同
+        self.set_fill_color(0)
+        start = len(self.pages[self.page].contents)
+        self.set_font(self.style.font, 'B', 16)
+        self.cell(0, 10, self.clean_text(self.title), align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        self.set_font(self.style.font, '', 10)
+        self.cell(0, 5, self.clean_text(f"{self.style.generated_label}: {self.generated}"), align='C',
+                  new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        self.ln(5)
+        self.share_header(start)
+
+    def register_form(self, data):
+        """
+        把一段页面内容注册为表单 XObject
+
+        Returns:
+            XObject 编号，页面中用 /I<编号> Do 引用
+        """
+        from fpdf.output import ResourceCatalog
+        from fpdf.syntax import Name, PDFArray, PDFContentStream
+
+        catalog = self._resource_catalog
+        xobject = PDFContentStream(contents=data, compress=self.compress)
+        xobject.type = Name('XObject')
+        xobject.subtype = Name('Form')
+        xobject.b_box = PDFArray([0, 0, round(self.w_pt, 2), round(self.h_pt, 2)])
+        xobject._registered = False
+        xobject._font_ids = sorted({int(i) for i in ResourceCatalog.FONT_REGEX.findall(data.decode('latin-1'))})
+        index = catalog.next_xobject_index
+        catalog.next_xobject_index += 1
+        catalog.form_xobjects.append((index, xobject))
+        return index
+
+    def place_form(self, index, page, start, end):
+        """把页面内容中 [start, end) 的部分换成对表单 index 的引用"""
+        from fpdf.enums import PDFResourceType
+
+        self.pages[page].contents[start:end] = f"/I{index} Do\n".encode('ascii')
+        self._resource_catalog.add(PDFResourceType.X_OBJECT, index, page)
+
+    def share_header(self, start):
+        """
+        各页相同的页眉在 PDF 中只保存一份（表单 XObject），页面中只引用
+
+        页眉仍按正常流程排版，以更新位置、字体和字形子集；内容与上一页不同时（如中途改用中文字体）
+        保留原样。表单的注册和资源依赖 fpdf2 私有接口，版本不受支持时各页保留各自的页眉。
+        """
+        if not fpdf_supported():
+            return
+        contents = self.pages[self.page].contents
+        data = bytes(contents[start:])
+        if data != self.header_bytes:
+            if self.header_form is None:
+                self.header_bytes = data
+                self.header_origin = (self.page, start)
+            return
+        if self.header_form is None:
+            page, offset = self.header_origin
+            if not isinstance(self.pages[page].contents, bytearray):
+                return
+            self.header_form = self.register_form(data)
+            self.place_form(self.header_form, page, offset, offset + len(data))
+        self.place_form(self.header_form, self.page, start, len(contents))
+        # 表单执行完后恢复图形状态，其中设置的字体不再生效，下一段文字前重新设置
+        self.current_font_is_set_on_page = False
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font(self.style.font, 'I', 8)
+        self.cell(0, 10, self.clean_text(self.style.page_label.format(self.page_no())), align='C')
+
+    def heading(self, text, level=1, size=None):
+        """章节标题，size 为 None 时按层级取字号"""
+        sizes = self.style.heading_sizes
+        size = size or sizes[min(level, len(sizes)) - 1]
+        self.set_font(self.style.font, 'B', size)
+        self.cell(0, 10 if level == 1 else 8 if level == 2 else 6, self.clean_text(text),
+                  new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        if level <= 2:
+            self.ln(3 - level)
+
+    def paragraph(self, text):
+        self.set_font(self.style.font, '', self.style.text_size)
+        self.multi_cell(0, 6, self.clean_text(text), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        self.ln(3)
+
+    def table(self, headers, rows, col_widths=None):
+        """
+        表格，跨页时重复表头
+
+        Args:
+            rows: 行的可迭代对象、DataFrame 或 DataFrame 分块迭代器，按需逐行读取
+            col_widths: 列宽，None 时按表头和数据样本自动计算，超出列宽的单元格截断
+        """
+        draw_table(self, headers, rows, col_widths)
+        self.ln(5)
+
+    def bullets(self, items):
+        self.set_font(self.style.font, '', self.style.text_size)
+        for item in items:
+            self.cell(5)
+            self.cell(5, 6, self.style.bullet)
+            self.cell(5)
+            self.multi_cell(0, 6, self.clean_text(item), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        self.ln(3)
+
+    def bar_chart(self, labels, values, title=None, value_format='{:.1f}'):
+        """横向条形图，条长按最大值归一化"""
+        if title:
+            self.heading(title, level=2)
+        draw_bar_chart(self, labels, values, value_format)
+        self.ln(5)
+
+    def line_chart(self, labels, values, title=None, value_format='{:.1f}', max_points=MAX_CHART_POINTS):
+        """折线图，长序列用 LTTB 降采样到 max_points 个点"""
+        if title:
+            self.heading(title, level=2)
+        draw_line_chart(self, labels, values, value_format, max_points)
+        self.ln(5)
+
+    def histogram(self, values, bins=20, title=None, value_format='{:.1f}'):
+        """数值分布直方图"""
+        if title:
+            self.heading(title, level=2)
+        draw_histogram(self, values, bins, value_format)
+        self.ln(5)
+
+
+class ReportRenderer:
+    """把 Report 版式模型渲染为 PDF"""
+
+    def __init__(self, style='cjk', font_registry=None):
+        """
+        Args:
+            style: 样式名或 ReportStyle
+            font_registry: 字体注册表，默认使用进程内共享的注册表
+        """
+        self.style = resolve_style(style) if isinstance(style, str) else style
+        self.font_registry = font_registry or get_font_registry()
+
+    def new_document(self, title):
+        return ReportPDF(title, self.style, self.font_registry)
+
+    def render(self, report, output_path, cache=None):
+        """
+        渲染报告
+
+        Args:
+            report: layout.Report
+            output_path: 输出 PDF 路径
+            cache: 可选的 sections.SectionCache，内容和起始位置都未变化的章节直接复用缓存的页面内容
+
+        Returns:
+            output_path
+
+        先写入同目录的临时文件再改名，读者不会看到写了一半的 PDF。
+        """
+        pdf = self.new_document(report.title)
+        if cache is not None and fpdf_supported():
+            pdf.register_style_fonts()
+        pdf.add_page()
+        for section in report.sections:
+            if cache is None:
+                self.draw_section(pdf, section)
+            else:
+                cache.render(pdf, section, self.draw_section)
+        tmp_path = f"{output_path}.{os.getpid()}.tmp"
+        try:
+            pdf.output(tmp_path)
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return output_path
+
+    def draw_section(self, pdf, section):
+        pdf.heading(section.title, section.level)
+        for block in section.blocks:
+            self.draw(pdf, block)
+
+    def draw(self, pdf, block):
+        if block.kind == 'paragraph':
+            pdf.paragraph(block.text)
+        elif block.kind == 'table':
+            pdf.table(block.headers, block.rows, block.col_widths)
+        elif block.kind == 'bullets':
+            pdf.bullets(block.items)
+        elif block.kind == 'chart':
+            if block.chart_type == 'line':
+                pdf.line_chart(block.labels, block.values, block.title, block.value_format, block.max_points)
+            elif block.chart_type == 'histogram':
+                pdf.histogram(block.values, block.bins, block.title, block.value_format)
+            else:
+                pdf.bar_chart(block.labels, block.values, block.title, block.value_format)
+        else:
+            raise ValueError(f"未知的报告内容类型: {block.kind}")
+
+
+_RENDERERS = {}
+
+
+def get_renderer(style='cjk'):
+    """按样式名取进程内共享的渲染器"""
+    if style not in _RENDERERS:
+        _RENDERERS[style] = ReportRenderer(style)
+    return _RENDERERS[style]
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+
+"""
+章节增量渲染
+每个章节按 (输入内容, 起始排版状态) 计算哈希；排版时记录该章节写入各页的内容流片段、新用到的字形、
+页面资源和结束时的排版状态，存入磁盘缓存。再次生成时未变化的章节直接把缓存的片段追加到页面中，
+只有变化的章节重新排版；页眉页脚（生成时间、页码）仍按当前文档绘制。
+
+起始状态包括页面位置、图形状态、字体编号和字形子集编号，任何一项不同都视为未命中，
+因此复用的内容与重新排版的输出逐字节相同。
+记录和恢复排版状态依赖 fpdf2 的私有接口，版本不受支持时（见 compat）每个章节都重新排版。
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import zlib
+
+import fpdf
+
+from ..cache import DEFAULT_CACHE_DIR
+from .compat import fpdf_supported
+
+
+# 缓存格式和排版代码的版本，修改章节的绘制方式后递增
+SECTION_VERSION = 1
+
+# 缓存条目数上限，超出后按最近使用时间淘汰
+MAX_SECTION_ENTRIES = 2000
+
+# 片段引用这些资源时不缓存（名称在文档内按出现顺序分配），按 PDFResourceType 的成员名比较
+UNCACHEABLE_RESOURCES = ('PATTERN', 'SHADING')
+
+
+def section_digest(section):
+    """
+    章节输入内容的哈希
+
+    Returns:
+        十六进制摘要；表格数据是一次性迭代器（无法在不消费的情况下计算哈希）时返回 None
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(pickle.dumps((section.title, section.level), protocol=4))
+    for block in section.blocks:
+        attrs = dict(vars(block))
+        rows = attrs.get('rows')
+        if rows is not None:
+            if hasattr(rows, 'itertuples'):
+                import pandas as pd
+                attrs['rows'] = (list(rows.columns), pd.util.hash_pandas_object(rows).to_numpy().tobytes())
+            elif not isinstance(rows, (list, tuple)):
+                return None
+        digest.update(pickle.dumps((block.kind, sorted(attrs.items())), protocol=4))
+    return digest.hexdigest()
+
+
+def ttf_fonts(pdf):
+    """文档中带字形子集的字体，各样式共用的字体对象只取一次"""
+    fonts = {}
+    for key, font in pdf.fonts.items():
+        if getattr(font, 'subset', None) is not None:
+            fonts.setdefault(id(font), (key, font))
+    return list(fonts.values())
+
+
+def graphics_state(pdf):
+    """当前图形状态，字体对象换成字体键"""
+    state = pdf._get_current_graphics_state().as_kwargs()
+    font = state['current_font']
+    state['current_font'] = font.fontkey if font is not None else None
+    return state
+
+
+def layout_state(pdf):
+    """章节开始时影响排版输出的全部状态"""
+    subsets = [(key, sorted((cid, glyph.glyph_name) for glyph, cid in font.subset.items()))
+               for key, font in ttf_fonts(pdf)]
+    return repr((
+        round(pdf.x, 6), round(pdf.y, 6), round(pdf._lasth, 6),
+        pdf.w, pdf.h, pdf.l_margin, pdf.t_margin, pdf.r_margin, pdf.b_margin, pdf.c_margin,
+        pdf.auto_page_break, sorted(graphics_state(pdf).items()),
+        sorted((key, font.i) for key, font in pdf.fonts.items()), subsets,
+        sorted(vars(pdf.style).items()), sorted(pdf.installed_fonts.items()),
+    ))
+
+
+class SectionRecorder:
+    """记录一个章节写入各页的内容，由 ReportPDF.add_page 在换页时切分片段"""
+
+    def __init__(self, pdf):
+        self.pdf = pdf
+        self.fonts = {key: font.i for key, font in pdf.fonts.items()}
+        self.fragments = []
+        self.begin()
+
+    def page_resources(self):
+        from fpdf.enums import PDFResourceType
+
+        catalog = self.pdf._resource_catalog
+        return {(kind, resource) for kind in PDFResourceType
+                for resource in catalog.resources_per_page.get((self.pdf.page, kind), ())}
+
+    def begin(self):
+        """在当前页开始一个片段"""
+        pdf = self.pdf
+        self.start = len(pdf.pages[pdf.page].contents)
+        self.resources = self.page_resources()
+        self.subsets = {key: dict(font.subset.items()) for key, font in ttf_fonts(pdf)}
+
+    def end(self):
+        """结束当前页的片段：内容流、按选取顺序排列的新字形、新引用的资源和结束时的排版状态"""
+        pdf = self.pdf
+        glyphs = {}
+        for key, font in ttf_fonts(pdf):
+            before = self.subsets.get(key, {})
+            picked = sorted((cid, glyph) for glyph, cid in font.subset.items() if glyph not in before)
+            if picked:
+                glyphs[key] = [glyph for _, glyph in picked]
+        resources = list(self.page_resources() - self.resources)
+        # 换页时 fpdf 按当前图形状态重设新页面的颜色、线宽和字体，因此每个片段都记录结束状态
+        self.fragments.append((bytes(pdf.pages[pdf.page].contents[self.start:]), glyphs, resources,
+                               graphics_state(pdf), (pdf.x, pdf.y, pdf._lasth)))
+
+    def finish(self):
+        """
+        结束记录
+
+        Returns:
+            缓存条目；章节中注册了新字体或引用了按顺序命名的资源时返回 None
+        """
+        self.end()
+        pdf = self.pdf
+        if {key: font.i for key, font in pdf.fonts.items()} != self.fonts:
+            return None
+        if any(kind.name in UNCACHEABLE_RESOURCES for fragment in self.fragments for kind, _ in fragment[2]):
+            return None
+        return {'fragments': self.fragments}
+
+
+def restore_state(pdf, graphics, position):
+    """恢复记录的图形状态和页面位置"""
+    state = pdf._get_current_graphics_state()
+    for name, value in graphics.items():
+        if name == 'current_font' and value is not None:
+            value = pdf.fonts[value]
+        setattr(state, name, value)
+    pdf._pop_local_stack()
+    pdf._push_local_stack(state)
+    pdf.x, pdf.y, pdf._lasth = position
+
+
+def replay(pdf, entry):
+    """把缓存的章节内容追加到文档中，每个片段之后恢复记录时的排版状态"""
+    catalog = pdf._resource_catalog
+    for index, (data, glyphs, resources, graphics, position) in enumerate(entry['fragments']):
+        if index:
+            pdf.add_page()
+        # 按记录时的顺序选取字形，子集编号与缓存的内容流一致
+        for key, picked in glyphs.items():
+            subset = pdf.fonts[key].subset
+            for glyph in picked:
+                subset.pick_glyph(glyph)
+        pdf.pages[pdf.page].contents += data
+        for kind, resource in resources:
+            catalog.add(kind, resource, pdf.page)
+        restore_state(pdf, graphics, position)
+
+
+class SectionCache:
+    """
+    章节内容的磁盘缓存
+
+    每个条目是 <dir>/<key>.section 文件（zlib 压缩的 pickle），命中时刷新 mtime，
+    条目数超过 max_entries 时按 mtime 淘汰最旧的条目。
+    """
+
+    def __init__(self, path=None, max_entries=MAX_SECTION_ENTRIES):
+        self.path = str(path or os.path.join(DEFAULT_CACHE_DIR, 'sections'))
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, pdf, section):
+        """章节的缓存键，章节内容无法计算哈希时返回 None"""
+        from .. import __version__
+
+        digest = section_digest(section)
+        if digest is None:
+            return None
+        key = hashlib.blake2b(digest_size=20)
+        key.update(f"{SECTION_VERSION}:{__version__}:{fpdf.FPDF_VERSION}:{digest}:".encode('ascii'))
+        key.update(layout_state(pdf).encode('utf-8'))
+        return key.hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.path, f"{key}.section")
+
+    def get(self, key):
+        path = self.entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.loads(zlib.decompress(f.read()))
+            os.utime(path)
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError):
+            return None
+        return entry
+
+    def put(self, key, entry):
+        # 先写临时文件再改名，并发渲染的进程不会读到写了一半的条目
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path, prefix='.tmp-')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(zlib.compress(pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL), 1))
+            os.replace(tmp, self.entry_path(key))
+            self.evict()
+        except OSError:
+            pass
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.path):
+            if name.endswith('.section'):
+                path = os.path.join(self.path, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        entries.sort()
+        for _, path in entries[:max(len(entries) - self.max_entries, 0)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def render(self, pdf, section, draw):
+        """
+        绘制一个章节：命中时追加缓存的内容，否则调用 draw(pdf, section) 排版并记录；
+        fpdf2 版本不受支持时直接排版，不读写缓存
+
+        Returns:
+            是否命中缓存
+        """
+        key = self.key(pdf, section) if fpdf_supported() else None
+        entry = self.get(key) if key is not None else None
+        if entry is not None:
+            replay(pdf, entry)
+            self.hits += 1
+            return True
+
+        self.misses += 1
+        if key is None:
+            draw(pdf, section)
+            return False
+        pdf.recorder = SectionRecorder(pdf)
+        try:
+            draw(pdf, section)
+            entry = pdf.recorder.finish()
+        finally:
+            pdf.recorder = None
+        if entry is not None:
+            self.put(key, entry)
+        return False
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+"""
+流式分页表格
+按行消费迭代器或 DataFrame 分块，逐页排版并在每页重复表头；
+每页的单元格宽度批量计算，表格线按页一次画出，单元格文字直接定位输出，不再逐格调用 cell()。
+"""
+
+import itertools
+
+from .widths import fit_columns, fit_text, measure, sample_rows
+
+
+HEADER_HEIGHT = 7
+ROW_HEIGHT = 6
+
+
+def iter_rows(source):
+    """
+    把表格数据统一为逐行迭代
+
+    Args:
+        source: 行的可迭代对象、DataFrame，或 DataFrame 的迭代器（如 read_csv(chunksize=...)）
+    """
+    if hasattr(source, 'itertuples'):
+        source = (source,)
+    for item in source:
+        if hasattr(item, 'itertuples'):
+            # 每次只展开一个分块，空值显示为空白
+            chunk = item.astype(object).where(item.notna(), '')
+            yield from chunk.itertuples(index=False, name=None)
+        else:
+            yield item
+
+
+class TableLayout:
+    """在 ReportPDF 上逐页绘制一张表格"""
+
+    def __init__(self, pdf, headers, col_widths):
+        self.pdf = pdf
+        self.headers = headers
+        self.widths = col_widths
+        self.x = pdf.l_margin
+        self.edges = [self.x]
+        for width in col_widths:
+            self.edges.append(self.edges[-1] + width)
+        self.bottom = pdf.h - pdf.b_margin
+        self.top = None
+
+    def cells(self, row):
+        """把一行转换为与表头等长的可显示字符串"""
+        values = [self.pdf.clean_text(value) for value in itertools.islice(row, len(self.headers))]
+        return values + [''] * (len(self.headers) - len(values))
+
+    def draw_header(self):
+        pdf = self.pdf
+        pdf.set_x(self.x)
+        pdf.set_fill_color(*pdf.style.header_fill)
+        pdf.set_font(pdf.style.font, 'B', pdf.style.table_size)
+        widths = measure(pdf, self.headers)
+        for width, header, text_width in zip(self.widths, self.headers, widths):
+            if text_width > width - 2 * pdf.c_margin:
+                header = fit_text(pdf, header, width - 2 * pdf.c_margin)
+            pdf.cell(width, HEADER_HEIGHT, header, border=1, align='C', fill=True)
+        pdf.ln()
+        pdf.set_font(pdf.style.font, '', pdf.style.table_size)
+        self.top = pdf.get_y()
+
+    def draw_page(self, rows):
+        """绘制一页数据行并画出表格线"""
+        pdf = self.pdf
+        total_width = self.edges[-1] - self.x
+        padding = 2 * pdf.c_margin
+        # 与 cell() 相同的基线位置
+        baseline = 0.5 * ROW_HEIGHT + 0.3 * pdf.font_size
+        texts = [self.cells(row) for row in rows]
+        widths = measure(pdf, [text for row in texts for text in row]).reshape(len(texts), len(self.headers))
+        y = self.top
+        for index, (row, row_widths) in enumerate(zip(texts, widths)):
+            if index % 2:
+                pdf.rect(self.x, y, total_width, ROW_HEIGHT, style='F')
+            for left, width, text, text_width in zip(self.edges, self.widths, row, row_widths):
+                if not text:
+                    continue
+                if text_width > width - padding:
+                    text = fit_text(pdf, text, width - padding)
+                    text_width = measure(pdf, [text])[0]
+                pdf.text(left + (width - text_width) / 2, y + baseline, text)
+            y += ROW_HEIGHT
+
+        for x in self.edges:
+            pdf.line(x, self.top, x, y)
+        for index in range(1, len(texts) + 1):
+            line_y = self.top + index * ROW_HEIGHT
+            pdf.line(self.edges[0], line_y, self.edges[-1], line_y)
+        pdf.set_xy(self.x, y)
+
+    def draw(self, rows):
+        """
+        绘制全部数据行，返回行数
+
+        每次只从 rows 中取出一页的行；已完成的页面由 ReportPDF 压缩保存。
+        """
+        pdf = self.pdf
+        rows = iter(rows)
+        if pdf.get_y() + HEADER_HEIGHT + ROW_HEIGHT > self.bottom:
+            pdf.add_page()
+        count = 0
+        while True:
+            self.draw_header()
+            capacity = max(int((self.bottom - self.top) / ROW_HEIGHT + 1e-6), 1)
+            page = list(itertools.islice(rows, capacity))
+            self.draw_page(page)
+            count += len(page)
+            if len(page) < capacity:
+                return count
+            following = next(rows, None)
+            if following is None:
+                return count
+            rows = itertools.chain((following,), rows)
+            pdf.add_page()
+
+
+def draw_table(pdf, headers, rows, col_widths=None, total_width=None):
+    """
+    流式绘制表格，绘制期间由表格自己控制分页
+
+    Args:
+        col_widths: 列宽，None 时按表头和数据样本自动计算
+        total_width: 自动计算列宽时的表格总宽度，默认为页面可用宽度
+
+    Returns:
+        绘制的行数
+    """
+    headers = [pdf.clean_text(header) for header in headers]
+    if col_widths is None:
+        sample, rows = sample_rows(rows, iter_rows)
+        layout = TableLayout(pdf, headers, [0] * len(headers))
+        col_widths = fit_columns(pdf, headers, [layout.cells(row) for row in sample],
+                                 total_width or pdf.epw)
+    else:
+        rows = iter_rows(rows)
+    auto, margin = pdf.auto_page_break, pdf.b_margin
+    pdf.set_auto_page_break(False, margin=margin)
+    try:
+        count = TableLayout(pdf, headers, col_widths).draw(rows)
+    finally:
+        pdf.set_auto_page_break(auto, margin=margin)
+    return count
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+
+"""
+报告模板
+把测试结果或数据转换为 Report 版式模型，渲染交给 ReportRenderer
+"""
+
+from .layout import Report
+
+
+def result_value(results, key, suffix=''):
+    """结果字典中的值，缺少时显示 N/A"""
+    value = results.get(key)
+    return "N/A" if value is None else f"{value}{suffix}"
+
+
+def cleaning_findings(test_results):
+    """由测试结果和基准数据汇总的结论，没有对应数据的项不输出"""
+    findings = []
+    cases = test_results.get('test_cases') or []
+    if cases:
+        passed = sum(1 for case in cases if case.get('passed'))
+        findings.append(f"测试用例：{passed}/{len(cases)} 通过")
+    total, cleaned = test_results.get('total_records'), test_results.get('cleaned_records')
+    if total and cleaned is not None:
+        findings.append(f"清洗成功率：{cleaned / total:.1%}（{cleaned}/{total} 条记录）")
+    bench = test_results.get('benchmark')
+    if bench and bench.get('rows_per_second'):
+        findings.append(f"清洗吞吐量：{bench['rows_per_second']:.0f} 行/秒（{bench['engine']} 引擎，{bench['rows']} 行）")
+    return findings
+
+
+def cleaning_report(test_results):
+    """
+    数据清洗测试报告
+
+    Args:
+        test_results: 测试结果字典；性能部分取自 test_cases 的 execution_time（毫秒）
+            和可选的 benchmark（data-cleaner bench 的结果），没有时不画图；缺少的指标显示为 N/A
+    """
+    report = Report("Data Cleaner Pro 数据清洗报告")
+
+    report.section("1. 报告概述").text(
+        "本报告展示了Data Cleaner Pro在数据清洗任务中的测试结果和实测性能。")
+
+    report.section("2. 测试结果摘要").table(["指标", "数值"], [
+        ["测试用例数", result_value(test_results, 'total_tests')],
+        ["通过测试数", result_value(test_results, 'passed_tests')],
+        ["失败测试数", result_value(test_results, 'failed_tests')],
+        ["通过率", result_value(test_results, 'pass_rate', '%')],
+        ["总记录数", result_value(test_results, 'total_records')],
+        ["成功清洗记录", result_value(test_results, 'cleaned_records')],
+        ["清洗成功率", result_value(test_results, 'cleaning_success_rate', '%')],
+    ])
+
+    section = report.section("3. 性能数据")
+    timed = [(case.get('description', f"测试{i}"), case['execution_time'])
+             for i, case in enumerate(test_results.get('test_cases', []), 1)
+             if isinstance(case.get('execution_time'), (int, float))]
+    if timed:
+        section.chart([label for label, _ in timed], [value for _, value in timed],
+                      "各测试用例执行时间（毫秒）", value_format='{:.0f}')
+        section.text(f"{len(timed)} 个测试用例共耗时 {sum(value for _, value in timed):.0f} 毫秒。")
+    bench = test_results.get('benchmark')
+    if bench:
+        speed = bench.get('rows_per_second')
+        section.table(["指标", "数值"], [
+            ["引擎", bench['engine']],
+            ["行数", f"{bench['rows']}"],
+            ["读取耗时（秒）", f"{bench['read_seconds']:.3f}"],
+            ["清洗耗时（秒）", f"{bench['clean_seconds']:.3f}"],
+            ["清洗吞吐量（行/秒）", f"{speed:.0f}" if speed else "N/A"],
+        ])
+        section.chart(["读取", "清洗"], [bench['read_seconds'], bench['clean_seconds']],
+                      "吞吐量基准：最快一次的耗时（秒）", value_format='{:.3f}')
+    if not timed and not bench:
+        section.text("测试结果中没有耗时数据。可用 data-cleaner bench 测量吞吐量，结果写入 benchmark 字段后重新生成报告。")
+
+    section = report.section("4. 详细测试结果")
+    if 'test_cases' in test_results:
+        rows = [[f"测试{i}", case.get('description', 'N/A'), "通过" if case.get('passed', False) else "失败",
+                 case.get('execution_time', 'N/A')]
+                for i, case in enumerate(test_results['test_cases'], 1)]
+        section.table(["测试编号", "描述", "状态", "执行时间(ms)"], rows)
+
+    section = report.section("5. 结论与建议")
+    findings = cleaning_findings(test_results)
+    if findings:
+        section.text("基于本次测试结果：").bullets(findings)
+    else:
+        section.text("测试结果中没有可汇总的数据。")
+    (section
+        .text("建议：")
+        .bullets([
+            "对于日常数据清洗任务，推荐使用Data Cleaner Pro替代手动清洗",
+            "对于批量数据处理，建议使用Pipeline功能实现自动化",
+            "定期更新清洗规则以适应业务变化",
+            "建立数据质量监控机制，持续优化清洗效果",
+        ]))
+
+    (report.section("6. 技术支持")
+        .text("如需技术支持或了解更多信息，请通过以下方式联系我们：")
+        .bullets([
+            "GitHub仓库：https://github.com/datacleanerpro/data-cleaner-pro-demo",
+            "文档网站：https://datacleanerpro.github.io/docs",
+            "问题反馈：https://github.com/datacleanerpro/data-cleaner-pro-demo/issues",
+            "邮箱联系：support@datacleanerpro.com",
+        ]))
+    return report
+
+
+# 各规则对应的问题类型和清洗操作名称
+ISSUE_LABELS = {
+    'extract_number': ("格式不统一", "数值标准化"),
+    'standardize_datetime': ("时间格式不统一", "时间统一"),
+    'fillna': ("缺失", "缺失值填充"),
+    'validate_phone': ("无效", "格式校验"),
+    'deduplicate': ("重复记录", "去重处理"),
+    'deduplicate_near': ("近似重复", "近似去重"),
+    'deduplicate_fuzzy': ("文本近似重复", "模糊去重"),
+}
+
+
+def rule_labels(stats):
+    """规则度量对应的 (问题类型, 清洗操作) 名称"""
+    issue, action = ISSUE_LABELS.get(stats['method'], ("问题", stats['method']))
+    return f"{stats['column']}{issue}", f"{stats['column']}{action}"
+
+
+def format_range(stats):
+    low, high = stats['min'], stats['max']
+    if isinstance(low, float):
+        return f"{low:g} 至 {high:g}"
+    return f"{low} 至 {high}"
+
+
+def ecommerce_report(metrics):
+    """
+    电商订单数据清洗专项报告
+
+    Args:
+        metrics: metrics.collect_metrics / clean_with_metrics 产出的度量字典
+    """
+    report = Report("电商订单数据清洗专项报告")
+    rows = metrics['rows']
+    rules = metrics['rules']
+
+    report.section("1. 电商订单数据清洗报告").text(
+        "本报告针对电商平台订单数据进行专项清洗分析，展示了Data Cleaner Pro"
+        "在解决电商数据常见问题方面的效果。")
+
+    overview = [
+        ["总记录数", f"{rows}"],
+        ["数据列数", f"{len(metrics['columns'])}"],
+        ["数据大小", f"{metrics['memory_bytes'] / 1024:.1f} KB"],
+    ]
+    overview += [[f"{stats['column']}范围", format_range(stats)] for stats in rules if 'min' in stats]
+    report.section("2. 原始数据概况").table(["统计指标", "数值"], overview)
+
+    report.section("3. 数据问题分析").table(["问题类型", "数量", "占比", "问题值样例"], [
+        [rule_labels(stats)[0], f"{stats['issues']}", f"{stats['issues'] / rows:.1%}" if rows else "N/A",
+         "、".join(stats['samples']) or "-"]
+        for stats in rules
+    ])
+
+    (report.section("4. 清洗效果")
+        .table(["清洗操作", "成功率", "处理数量", "耗时(ms)"], [
+            [rule_labels(stats)[1], f"{stats['fixed'] / stats['issues']:.0%}" if stats['issues'] else "-",
+             f"{stats['fixed']}/{stats['issues']}", f"{stats['seconds'] * 1000:.1f}"]
+            for stats in rules
+        ])
+        .text(f"清洗后共 {metrics['rows_out']} 条记录，全部规则耗时 {metrics['seconds'] * 1000:.1f} 毫秒。")
+        .chart([rule_labels(stats)[1] for stats in rules], [stats['seconds'] * 1000 for stats in rules],
+               "各规则耗时（毫秒）"))
+
+    issues = sum(stats['issues'] for stats in rules)
+    fixed = sum(stats['fixed'] for stats in rules)
+    seconds = metrics['seconds']
+    report.section("5. 清洗收益").table(["指标", "数值"], [
+        ["发现问题值", f"{issues}"],
+        ["修复问题值", f"{fixed}（{fixed / issues:.0%}）" if issues else "0"],
+        ["去除记录", f"{rows - metrics['rows_out']}"],
+        ["清洗吞吐量（行/秒）", f"{rows / seconds:.0f}" if seconds else "N/A"],
+        ["每千行耗时（毫秒）", f"{seconds * 1e6 / rows:.1f}" if rows else "N/A"],
+    ])
+
+    (report.section("6. 实施建议")
+        .text("针对电商平台的建议实施方案：")
+        .bullets([
+            "每日定时清洗：设置凌晨自动清洗任务",
+            "实时数据监控：对新增订单实时清洗验证",
+            "质量报告：每日生成数据质量报告",
+            "规则优化：根据业务变化定期更新清洗规则",
+            "团队培训：培训运营人员使用清洗工具",
+        ]))
+    return report
+
+
+def profile_report(profile, source=None):
+    """
+    数据概况报告
+
+    Args:
+        profile: profiling.profile_csv 的结果
+        source: 数据文件名，显示在概述中
+    """
+    report = Report("数据概况报告")
+    rows = profile['rows']
+    columns = profile['columns']
+
+    report.section("1. 概述").text(
+        f"{source + '：' if source else ''}共 {rows} 行，{len(columns)} 列。")
+
+    report.section("2. 列统计").table(
+        ["列名", "空值", "空值率", "不同值", "数值占比", "最大长度"],
+        [[name, stats['nulls'], f"{stats['nulls'] / rows:.1%}" if rows else "N/A", stats['distinct'],
+          f"{stats['numeric'] / rows:.1%}" if rows else "N/A", stats['max_length']]
+         for name, stats in columns.items()])
+
+    (report.section("3. 分布")
+        .chart(list(columns), [stats['nulls'] / rows * 100 if rows else 0 for stats in columns.values()],
+               "空值率（%）")
+        .chart(list(columns), [stats['distinct'] for stats in columns.values()],
+               "不同值数量", value_format='{:.0f}'))
+    return report
+
+
+def bench_report(bench):
+    """
+    吞吐量基准报告
+
+    Args:
+        bench: data-cleaner bench 的结果，timings 为每次重复的 [读取秒数, 清洗秒数]
+    """
+    report = Report("清洗吞吐量基准报告")
+    speed = bench.get('rows_per_second')
+
+    report.section("1. 结果").table(["指标", "数值"], [
+        ["引擎", bench['engine']],
+        ["行数", f"{bench['rows']}"],
+        ["重复次数", f"{bench['repeat']}"],
+        ["读取耗时（秒）", f"{bench['read_seconds']:.3f}"],
+        ["清洗耗时（秒）", f"{bench['clean_seconds']:.3f}"],
+        ["清洗吞吐量（行/秒）", f"{speed:.0f}" if speed else "N/A"],
+    ])
+
+    section = report.section("2. 耗时").chart(
+        ["读取", "清洗"], [bench['read_seconds'], bench['clean_seconds']], "最快一次的耗时（秒）",
+        value_format='{:.3f}')
+    timings = bench.get('timings') or []
+    if len(timings) > 1:
+        section.line_chart(range(1, len(timings) + 1), [read + clean for read, clean in timings],
+                           "每次重复的总耗时（秒）", value_format='{:.3f}')
+    return report
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+"""
+core 字体的文本清理
+core 字体只能显示 latin-1（basic 样式只用 ASCII）。文本用预先构造的 str.translate 转换表一遍转换：
+常见标点换成等价的 ASCII 字符，带重音的字母去掉附加符号，全角字符换成半角；
+安装了 unidecode 且样式开启 transliterate 时，中文等其余字符按拼音转写。
+转换表中没有的字符在第一次出现时计算替换结果并缓存，进程内所有文档共用。
+
+仍无法表示的文字（如中文）先标记为 SUBSTITUTE，由调用方决定改用中文字体还是替换为占位字符。
+"""
+
+import functools
+import importlib.util
+import unicodedata
+
+
+# 转写中文等字符的可选依赖
+UNIDECODE_AVAILABLE = importlib.util.find_spec('unidecode') is not None
+
+# 无法表示的字符在转换结果中的标记（ASCII SUB 控制字符，正常文本中不会出现）
+SUBSTITUTE = '\x1a'
+
+# 没有 ASCII 分解形式的常见标点和符号
+PUNCTUATION = {
+    '‘': "'", '’': "'", '‚': "'", '‛': "'",
+    '“': '"', '”': '"', '„': '"', '‟': '"',
+    '‐': '-', '‑': '-', '‒': '-', '–': '-', '—': '-', '―': '-',
+    '−': '-', '…': '...', '•': '-', '·': '-', '・': '-',
+    '←': '<-', '→': '->', '↑': '^', '↓': 'v', '⇒': '=>',
+    '×': 'x', '÷': '/', '≤': '<=', '≥': '>=', '≠': '!=',
+    ' ': ' ', '　': ' ', '、': ',', '。': '.', '《': '<', '》': '>',
+    '【': '[', '】': ']', '「': '"', '」': '"', '¥': 'CNY', '€': 'EUR',
+    '✓': 'v', '✔': 'v', '✗': 'x', '✘': 'x', '⚠': '!',
+}
+
+
+def transliterate(char, encoding='ascii', romanize=False):
+    """
+    单个字符在 encoding 中的替换形式
+
+    Returns:
+        替换文本，无法表示时返回 SUBSTITUTE
+    """
+    try:
+        char.encode(encoding)
+        return char
+    except UnicodeEncodeError:
+        pass
+    if char in PUNCTUATION:
+        return PUNCTUATION[char]
+    # NFKD 分解：é → e + 附加符号，全角 Ａ → A，① → 1
+    decomposed = ''.join(c for c in unicodedata.normalize('NFKD', char) if not unicodedata.combining(c))
+    if decomposed and decomposed != char:
+        try:
+            decomposed.encode(encoding)
+            return decomposed
+        except UnicodeEncodeError:
+            pass
+    if romanize and UNIDECODE_AVAILABLE:
+        from unidecode import unidecode
+        romanized = unidecode(char)
+        if romanized.strip():
+            return romanized if romanized.endswith(' ') else romanized + ' '
+    if unicodedata.category(char)[0] in 'LNS':
+        return SUBSTITUTE
+    # 其余标点、空白和控制字符换成空格
+    return ' '
+
+
+class TranslationTable:
+    """
+    str.translate 用的转换表
+
+    表中预先放入 latin-1 范围和 PUNCTUATION 中的字符；转换结果中还有未见过的字符时，
+    计算这些字符的替换结果加入表中再转换一次，之后同样的字符直接查表。
+    """
+
+    def __init__(self, encoding='ascii', romanize=False):
+        self.encoding = encoding
+        self.romanize = romanize
+        self.mapping = {}
+        self.learn(map(chr, range(256)))
+        self.learn(PUNCTUATION)
+
+    def learn(self, chars):
+        for char in chars:
+            if ord(char) not in self.mapping:
+                self.mapping[ord(char)] = transliterate(char, self.encoding, self.romanize)
+
+    def translate(self, text):
+        # 普通 dict 查表比带 __missing__ 的子类快得多，表中没有的字符 translate 会原样保留
+        result = text.translate(self.mapping)
+        try:
+            result.encode(self.encoding)
+        except UnicodeEncodeError:
+            self.learn(set(result))
+            result = text.translate(self.mapping)
+        return result
+
+
+@functools.lru_cache(maxsize=None)
+def get_table(encoding='ascii', romanize=False):
+    """进程内共享的转换表"""
+    return TranslationTable(encoding, romanize)
+
+
+def sanitize(text, table, replacement=' '):
+    """
+    一遍转换整段文本
+
+    Args:
+        table: get_table 返回的转换表
+        replacement: 无法表示的字符替换成的文字
+
+    Returns:
+        (转换后的文本, 是否含有无法表示的字符)
+    """
+    if text.isascii():
+        return text, False
+    result = table.translate(text)
+    if SUBSTITUTE not in result:
+        return result, False
+    return result.replace(SUBSTITUTE, replacement), True
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+"""
+批量文字宽度与表格列宽
+每个字体的字宽表在进程内缓存为按码位索引的 NumPy 数组；一批字符串一次编码为 UTF-32 码位矩阵，
+查表后按行求和得到宽度，结果与 FPDF.get_string_width 一致。大表只抽样估算列宽。
+"""
+
+import itertools
+import random
+
+import numpy as np
+
+
+# 字宽表覆盖基本多文种平面，其余码位按字体缺省宽度计算
+TABLE_SIZE = 0x10000
+
+# 估算列宽时最多抽样的行数
+WIDTH_SAMPLE_ROWS = 2000
+
+# 列宽取样本宽度的该分位数，个别超长值不会把整列撑宽（超出的单元格截断）
+WIDTH_QUANTILE = 0.95
+
+MIN_COLUMN_WIDTH = 10
+
+ELLIPSIS = '...'
+
+_TABLES = {}
+
+
+def width_table(font):
+    """
+    字体的字宽表，进程内按字体缓存
+
+    Returns:
+        (按码位索引的宽度数组, 超出表范围的码位的宽度)，单位为千分之一字号
+    """
+    key = (font.name, getattr(font, 'ttffile', None))
+    if key not in _TABLES:
+        if getattr(font, 'ttffile', None) is None:
+            # core 字体只能显示 latin-1 字符，cw 以字符为键
+            default = 0
+            table = np.zeros(TABLE_SIZE, dtype=np.float64)
+            for char, width in font.cw.items():
+                table[ord(char)] = width
+        else:
+            default = font.desc.missing_width
+            table = np.full(TABLE_SIZE, default, dtype=np.float64)
+            codes = np.fromiter((c for c in font.cw if c < TABLE_SIZE), dtype=np.int64)
+            table[codes] = [font.cw[c] for c in codes.tolist()]
+        # 码位 0 是 NumPy 定长字符串的填充
+        table[0] = 0
+        _TABLES[key] = (table, default)
+    return _TABLES[key]
+
+
+def vectorized(pdf):
+    """当前字体设置下能否按字宽表直接求和（文本整形、字距和拉伸都会改变宽度）"""
+    font = pdf.current_font
+    return (not pdf.text_shaping and pdf.char_spacing == 0 and pdf.font_stretching == 100
+            and not getattr(font, 'is_symbol', False))
+
+
+def glyph_widths(pdf, codes):
+    table, default = width_table(pdf.current_font)
+    widths = np.where(codes < TABLE_SIZE, table[np.minimum(codes, TABLE_SIZE - 1)], default)
+    return widths * (pdf.font_size_pt * 0.001 / pdf.k)
+
+
+def measure(pdf, strings):
+    """
+    批量计算字符串在当前字体下的宽度（用户单位）
+
+    Args:
+        strings: 已转换为当前字体可显示字符的字符串列表
+
+    Returns:
+        与 strings 等长的宽度数组
+    """
+    if not vectorized(pdf):
+        return np.array([pdf.get_string_width(s) for s in strings], dtype=np.float64)
+    if not len(strings):
+        return np.zeros(0)
+    array = np.asarray(strings, dtype=str)
+    codes = array.view(np.uint32).reshape(len(array), -1)
+    return glyph_widths(pdf, codes).sum(axis=1)
+
+
+def fit_text(pdf, text, limit):
+    """截断文字使其宽度不超过 limit，末尾加省略号"""
+    room = limit - measure(pdf, [ELLIPSIS])[0]
+    if room <= 0:
+        return ''
+    if not vectorized(pdf):
+        keep = len(text)
+        while keep and pdf.get_string_width(text[:keep]) > room:
+            keep -= 1
+        return text[:keep] + ELLIPSIS
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    keep = int(np.searchsorted(np.cumsum(glyph_widths(pdf, codes)), room, side='right'))
+    return text[:keep] + ELLIPSIS
+
+
+def sample_rows(rows, iter_rows, size=WIDTH_SAMPLE_ROWS, seed=0):
+    """
+    取估算列宽用的样本
+
+    DataFrame 和列表等可随机访问的数据均匀抽样，迭代器取前 size 行并放回迭代器开头。
+
+    Returns:
+        (样本行列表, 完整数据的逐行迭代器)
+    """
+    if hasattr(rows, 'itertuples'):
+        sample = rows.sample(size, random_state=seed) if len(rows) > size else rows
+        return list(iter_rows(sample)), iter_rows(rows)
+    if hasattr(rows, '__len__') and hasattr(rows, '__getitem__'):
+        if len(rows) <= size:
+            return list(rows), iter_rows(rows)
+        index = sorted(random.Random(seed).sample(range(len(rows)), size))
+        return [rows[i] for i in index], iter_rows(rows)
+    rows = iter_rows(rows)
+    head = list(itertools.islice(rows, size))
+    return head, itertools.chain(head, rows)
+
+
+def distribute(natural, total):
+    """
+    按各列所需宽度分配总宽度
+
+    总需求不超过 total 时按比例放大铺满；否则较窄的列保持所需宽度，其余列平分剩余宽度。
+    """
+    natural = np.maximum(np.asarray(natural, dtype=np.float64), MIN_COLUMN_WIDTH)
+    if natural.sum() <= total:
+        return natural * (total / natural.sum())
+    widths = natural.copy()
+    fixed = np.zeros(len(natural), dtype=bool)
+    while True:
+        free = ~fixed
+        share = (total - widths[fixed].sum()) / free.sum()
+        narrow = free & (natural <= share)
+        if not narrow.any():
+            widths[free] = share
+            return widths
+        fixed |= narrow
+
+
+def fit_columns(pdf, headers, sample, total):
+    """
+    根据表头和样本行估算列宽
+
+    Args:
+        headers: 已清理的表头文字
+        sample: 已清理的样本行（每行与表头等长的字符串列表）
+        total: 表格总宽度
+    """
+    style = pdf.style
+    padding = 2 * pdf.c_margin
+    pdf.set_font(style.font, 'B', style.table_size)
+    natural = measure(pdf, headers)
+    if sample:
+        pdf.set_font(style.font, '', style.table_size)
+        cells = [value for row in sample for value in row]
+        content = measure(pdf, cells).reshape(len(sample), len(headers))
+        natural = np.maximum(natural, np.quantile(content, WIDTH_QUANTILE, axis=0))
+    return distribute(natural + padding, total).tolist()
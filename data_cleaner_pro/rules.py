@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+
+"""
+清洗规则
+每条规则是一个 (df, column, **params) -> df 的函数，通过 @rule 注册到 RULES
+"""
+
+import numpy as np
+import pandas as pd
+
+from .fuzzy import fuzzy_clusters
+from .patterns import DATE_PATTERN, DATETIME_FORMATS, NUMBER_PATTERN, PHONE_PATTERNS
+
+
+RULES = {}
+
+# 定长时间指令对应的数字位数，用于判断值是否已是输出格式
+DATETIME_WIDTHS = {'%Y': 'dddd', '%m': 'dd', '%d': 'dd', '%H': 'dd', '%M': 'dd', '%S': 'dd'}
+
+def rule(name, cacheable=False, version=1, canonical=None):
+    """
+    注册清洗规则
+
+    Args:
+        cacheable: 输出只取决于单个输入值的逐值规则，可以借助规范化字典查表
+        version: 规则实现的版本，修改逐值规则的解析逻辑后需要递增，使旧的字典映射失效
+        canonical: 逐值规则可选的“已是规范形式”判定 (raw, **params) -> (mask, 这些行的输出) 或 None，
+            引擎只对不满足的行执行完整规则
+    """
+    def decorator(func):
+        func.rule_name = name
+        func.cacheable = cacheable
+        func.version = version
+        func.canonical = canonical
+        RULES[name] = func
+        return func
+    return decorator
+
+
+def get_rule(name):
+    """按名称查找清洗规则"""
+    try:
+        return RULES[name]
+    except KeyError:
+        raise ValueError(f"未知的清洗规则: {name}")
+
+
+def number_canonical(raw, pattern=NUMBER_PATTERN, **params):
+    """纯 ASCII 数字的值已是规范形式，直接转换为浮点数"""
+    if pattern != NUMBER_PATTERN:
+        return None
+    # 全角数字能被正则提取但 to_numeric 不认，只放行 ASCII 数字
+    mask = (raw.str.isdecimal() & raw.str.isascii()).fillna(False).to_numpy()
+    return mask, raw[mask].to_numpy(dtype=object).astype(float)
+
+
+@rule('extract_number', cacheable=True, canonical=number_canonical)
+def extract_number(df, column, output_col=None, pattern=NUMBER_PATTERN):
+    """提取数字，如 '¥4999' -> 4999.0"""
+    values = df[column].astype('string').str.extract(pattern, expand=False)
+    df[output_col or column] = pd.to_numeric(values, errors='coerce').astype(float)
+    return df
+
+
+def fixed_width_mask(raw, template):
+    """
+    按定长模板检查字符串形状，模板中 'd' 表示数字、其他字符按原样匹配
+
+    转为定长 Unicode 数组后按码位做整列比较，不走正则
+    """
+    width = len(template)
+    mask = raw.str.len().eq(width).fillna(False).to_numpy()
+    if not mask.any():
+        return mask
+    codes = raw[mask].to_numpy(dtype=f'U{width}').view(np.uint32).reshape(-1, width)
+    digits = np.array([i for i, ch in enumerate(template) if ch == 'd'])
+    literals = np.array([i for i, ch in enumerate(template) if ch != 'd'], dtype=int)
+    ok = ((codes[:, digits] >= ord('0')) & (codes[:, digits] <= ord('9'))).all(axis=1)
+    if len(literals):
+        expected = np.array([ord(template[i]) for i in literals], dtype=np.uint32)
+        ok &= (codes[:, literals] == expected).all(axis=1)
+    mask[mask] = ok
+    return mask
+
+
+def datetime_template(format):
+    """由输出格式推出定长模板，含其他指令时返回 None"""
+    template = format
+    for directive, digits in DATETIME_WIDTHS.items():
+        template = template.replace(directive, digits)
+    return None if '%' in template else template
+
+
+def datetime_canonical(raw, format='%Y-%m-%d %H:%M:%S', formats=None, **params):
+    """已按输出格式书写且日期有效的值原样保留，省去解析后再格式化"""
+    template = datetime_template(format)
+    if template is None or format not in (formats or DATETIME_FORMATS):
+        return None
+    mask = fixed_width_mask(raw, template)
+    if mask.any():
+        # 形状正确但日期无效（如 2月30日）的值仍交给完整规则
+        parsed = pd.to_datetime(raw[mask], format=format, errors='coerce')
+        mask[mask] = parsed.notna().to_numpy()
+    return mask, raw[mask].to_numpy(dtype=object)
+
+
+@rule('standardize_datetime', cacheable=True, canonical=datetime_canonical)
+def standardize_datetime(df, column, output_col=None, format='%Y-%m-%d %H:%M:%S',
+                         formats=None):
+    """按候选格式依次解析时间，解析失败的只保留日期部分（补 12:00:00）"""
+    raw = df[column].astype('string')
+    parsed = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+
+    for fmt in formats or DATETIME_FORMATS:
+        pending = parsed.isna() & raw.notna()
+        if not pending.any():
+            break
+        parsed[pending] = pd.to_datetime(raw[pending], format=fmt, errors='coerce')
+
+    # 兜底：提取年月日
+    pending = parsed.isna() & raw.notna()
+    if pending.any():
+        parts = raw[pending].str.extract(DATE_PATTERN)
+        dates = pd.to_datetime(
+            parts[0] + '-' + parts[1].str.zfill(2) + '-' + parts[2].str.zfill(2),
+            format='%Y-%m-%d', errors='coerce'
+        )
+        parsed[pending] = dates + pd.Timedelta(hours=12)
+
+    result = parsed.dt.strftime(format)
+    df[output_col or column] = result.where(parsed.notna(), np.nan)
+    return df
+
+
+@rule('validate_phone')
+def validate_phone(df, column, output_col=None, country_code='CN'):
+    """校验手机号格式，输出布尔列"""
+    pattern = PHONE_PATTERNS[country_code]
+    valid = df[column].astype('string').str.fullmatch(pattern)
+    df[output_col or f'{column}_valid'] = valid.fillna(False).astype(bool)
+    return df
+
+
+@rule('fillna')
+def fillna(df, column, value=None, strategy=None, output_col=None, decimals=None):
+    """填充缺失值，strategy='mean' 时用该列均值填充（decimals 控制均值保留位数）"""
+    if strategy == 'mean':
+        values = pd.to_numeric(df[column], errors='coerce')
+        value = values.mean()
+        if decimals is not None:
+            value = round(value, decimals)
+        df[output_col or column] = values.fillna(value)
+    else:
+        df[output_col or column] = df[column].fillna(value)
+    return df
+
+
+@rule('deduplicate')
+def deduplicate(df, column, keep='first', columns=None):
+    """按字段精确去重"""
+    return df.drop_duplicates(subset=columns or [column], keep=keep)
+
+
+@rule('deduplicate_near')
+def deduplicate_near(df, column, by=('用户ID', '商品名称', '价格'), window=60,
+                     output_col='重复簇', keep=None):
+    """
+    近似重复订单检测
+
+    同一 by 分组内，按时间排序后相邻两条记录间隔不超过 window 的记录归为一簇。
+    先排序再做一次向量化扫描，复杂度 O(n log n)，不做两两比较。
+
+    Args:
+        column: 时间列（建议使用 standardize_datetime 之后的列）
+        by: 判定重复的字段，如用户ID、商品名称、价格
+        window: 时间窗口，秒数或 pandas 可识别的字符串（如 '5min'）
+        output_col: 输出的簇ID列，每行一个整数
+        keep: None 只标记簇ID；'first' / 'last' 每簇只保留一条
+    """
+    if len(df) == 0:
+        df[output_col] = pd.Series(dtype='int64')
+        return df
+
+    if isinstance(window, str):
+        window = pd.Timedelta(window)
+    else:
+        window = pd.Timedelta(seconds=window)
+
+    times = pd.to_datetime(df[column], errors='coerce')
+    groups = df.groupby(list(by), sort=False, dropna=False).ngroup().to_numpy()
+    ticks = times.to_numpy(dtype='datetime64[ns]').view('int64')
+    missing = times.isna().to_numpy()
+
+    # 按 (分组, 时间) 稳定排序
+    order = np.lexsort((ticks, groups))
+    sorted_groups = groups[order]
+    sorted_ticks = ticks[order]
+    sorted_missing = missing[order]
+
+    # 分组变化、时间间隔超出窗口或时间缺失时开启新簇
+    starts = np.ones(len(order), dtype=bool)
+    starts[1:] = (
+        (sorted_groups[1:] != sorted_groups[:-1])
+        | (sorted_ticks[1:] - sorted_ticks[:-1] > window.value)
+        | sorted_missing[1:]
+        | sorted_missing[:-1]
+    )
+
+    cluster_ids = np.empty(len(order), dtype='int64')
+    cluster_ids[order] = np.cumsum(starts) - 1
+    df[output_col] = cluster_ids
+
+    if keep in ('first', 'last'):
+        # 簇内按时间先后保留第一条或最后一条
+        if keep == 'first':
+            marks = starts
+        else:
+            marks = np.ones(len(order), dtype=bool)
+            marks[:-1] = starts[1:]
+        mask = np.empty(len(order), dtype=bool)
+        mask[order] = marks
+        df = df[mask]
+    return df
+
+
+@rule('deduplicate_fuzzy')
+def deduplicate_fuzzy(df, column, threshold=0.8, num_perm=64, shingle_size=2,
+                      output_col='相似簇', keep=None, n_jobs=1, block_size=2000):
+    """
+    自由文本模糊去重（MinHash-LSH）
+
+    对文本做字符 shingle，分块计算 MinHash 签名，分段 LSH 分桶后只校验候选对。
+
+    Args:
+        column: 文本列，如收货地址
+        threshold: Jaccard 相似度阈值
+        num_perm: MinHash 签名长度
+        shingle_size: 字符 shingle 长度，中文短文本建议 2
+        output_col: 输出的簇ID列
+        keep: None 只标记簇ID；'first' / 'last' 每簇只保留一条
+        n_jobs: 签名计算使用的进程数
+    """
+    texts = df[column].astype('string').str.replace(r'\s+', '', regex=True).fillna('')
+    df[output_col] = fuzzy_clusters(texts.tolist(), threshold=threshold, num_perm=num_perm,
+                                    shingle_size=shingle_size, block_size=block_size,
+                                    n_jobs=n_jobs)
+    if keep in ('first', 'last'):
+        df = df.drop_duplicates(subset=[output_col], keep=keep)
+    return df
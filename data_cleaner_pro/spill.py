@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+"""
+可溢写到磁盘的去重键集合
+内存中的键超过上限时，排序后写成一个 uint64 文件（一个 run），查询时对各 run 做二分查找
+"""
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+
+# run 超过这个数量时合并为一个，控制每次查询的二分查找次数
+MAX_RUNS = 8
+
+
+class SpillableKeySet:
+    """
+    64 位键集合，接口与 StreamState 中原来的 set 用法一致（批量查询 + 批量写入）
+
+    磁盘上的 run 通过 np.memmap 只读映射，常驻内存的只有最近的键；
+    每个溢写的键只占 8 字节磁盘，而放在 set 中约占 72 字节内存。
+    """
+
+    def __init__(self, max_keys=None, directory=None):
+        """
+        Args:
+            max_keys: 内存中最多保留的键数，None 表示不溢写
+            directory: 溢写目录，默认在系统临时目录下新建
+        """
+        self.max_keys = max_keys
+        self.directory = directory
+        self.memory = set()
+        self.runs = []
+        self.spills = 0
+        self._owned = False
+
+    def __len__(self):
+        return len(self.memory) + sum(len(run) for run in self.runs)
+
+    def contains(self, keys):
+        """批量查询，返回与 keys 等长的布尔数组"""
+        keys = np.asarray(keys, dtype=np.uint64)
+        found = np.fromiter(map(self.memory.__contains__, keys.tolist()), dtype=bool, count=len(keys))
+        for run in self.runs:
+            index = np.searchsorted(run, keys)
+            index[index == len(run)] = len(run) - 1
+            found |= run[index] == keys
+        return found
+
+    def update(self, keys):
+        """批量写入，内存中的键超过上限时溢写"""
+        if isinstance(keys, np.ndarray):
+            keys = keys.tolist()
+        self.memory.update(keys)
+        if self.max_keys is not None and len(self.memory) > self.max_keys:
+            self.spill()
+
+    def spill(self):
+        """把内存中的键排序写成一个新的 run"""
+        if not self.memory:
+            return
+        keys = np.fromiter(self.memory, dtype=np.uint64, count=len(self.memory))
+        keys.sort()
+        self.runs.append(self._write(keys))
+        self.memory.clear()
+        self.spills += 1
+        if len(self.runs) > MAX_RUNS:
+            # 合并时需要把全部 run 读入内存，每个键 8 字节，仍远小于放在 set 中
+            merged = np.concatenate(self.runs)
+            merged.sort()
+            old = [run.filename for run in self.runs]
+            self.runs = [self._write(merged)]
+            for path in old:
+                os.remove(path)
+
+    def _write(self, keys):
+        if self.directory is None:
+            self.directory = tempfile.mkdtemp(prefix='dcp-spill-')
+            self._owned = True
+        os.makedirs(self.directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix='.keys', dir=self.directory)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(keys.tobytes())
+        return np.memmap(path, dtype=np.uint64, mode='r')
+
+    def close(self):
+        """删除溢写文件"""
+        paths = [run.filename for run in self.runs]
+        self.runs = []
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+        if self._owned:
+            shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+
+"""
+流水线式分块清洗
+读取线程 -> 清洗进程池 -> 有序写出线程，阶段之间用有界队列做背压
+"""
+
+import codecs
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .checkpoint import Checkpoint, spec_hash
+from .budget import RULE_MEMORY_FACTOR, SEEN_KEY_BYTES, STATE_SHARE, parse_size, suggest_settings
+from .cleaner import DataCleaner
+from .gates import GateMonitor, measure_chunk, normalize_gates
+from .spill import SpillableKeySet
+
+
+# 需要跨块状态、只能在写出阶段按顺序执行的规则
+STATEFUL_METHODS = {'deduplicate', 'fillna'}
+
+# 簇ID按全部数据的排序分配、重复记录可能分在不同块的规则，分块清洗无法得到正确结果
+GLOBAL_METHODS = {'deduplicate_near', 'deduplicate_fuzzy'}
+
+DEFAULT_CHUNKSIZE = 50000
+
+# 按内存预算定块大小时，先读这么多行估算每行占用
+PROBE_ROWS = 1000
+
+_DONE = object()
+
+
+def split_spec(spec):
+    """
+    拆分为无状态规则（可并行）与有状态规则（写出阶段按顺序执行）
+
+    Raises:
+        ValueError: 含有 GLOBAL_METHODS 中的规则（需要一次读入全部数据，用 DataCleaner.auto_clean）
+    """
+    stateless, stateful = {}, {}
+    for column, options in spec.items():
+        if options['method'] in GLOBAL_METHODS:
+            raise ValueError(f"{column}: {options['method']} 需要全部数据才能聚簇，分块清洗不支持，"
+                             f"请用 DataCleaner.auto_clean 一次清洗")
+        if options['method'] in STATEFUL_METHODS:
+            stateful[column] = options
+        else:
+            stateless[column] = options
+    return stateless, stateful
+
+
+def clean_chunk(chunk, spec, normdict=None, gates=None):
+    """
+    清洗单个数据块（在工作进程中执行）
+
+    Returns:
+        (清洗结果, 质量闸门统计)，未设置闸门时统计为 None
+    """
+    cleaned = DataCleaner(chunk, normdict=normdict).auto_clean(spec)
+    return cleaned, measure_chunk(chunk, cleaned, gates) if gates else None
+
+
+def row_hashes(df, columns):
+    """按字段计算每行的 64 位哈希"""
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+
+
+class StreamState:
+    """跨块状态：精确去重的已见键、均值填充的累计和与计数"""
+
+    def __init__(self, spec, track_added=False, max_keys=None, spill_dir=None):
+        """
+        Args:
+            max_keys: 每个去重列在内存中最多保留的已见键数，超出后溢写到 spill_dir
+        """
+        self.seen = {}
+        self.added = {}
+        self.fill_stats = {}
+        # 写断点时才需要记录每块新增的已见键
+        self.track_added = track_added
+        # 按规则顺序预先登记，保证断点中各列的顺序固定
+        for column, options in spec.items():
+            if options['method'] == 'deduplicate':
+                self.seen[column] = SpillableKeySet(max_keys, spill_dir)
+
+    def deduplicate(self, df, column, keep='first', columns=None):
+        """跨块精确去重，只支持保留首次出现的记录"""
+        if keep != 'first':
+            raise ValueError("分块清洗的 deduplicate 只支持 keep='first'")
+        seen = self.seen[column]
+        hashes = row_hashes(df, columns or [column])
+        duplicated = seen.contains(hashes)
+        duplicated |= pd.Series(hashes).duplicated().to_numpy()
+        new_keys = hashes[~duplicated].tolist()
+        seen.update(new_keys)
+        if self.track_added:
+            self.added.setdefault(column, []).extend(new_keys)
+        return df[~duplicated]
+
+    def fillna(self, df, column, value=None, strategy=None, output_col=None, decimals=None):
+        """
+        跨块填充缺失值
+
+        strategy='mean' 时使用截至当前块（含）所有非空值的累计均值，
+        结果只取决于数据和块大小，断点续跑可复现。
+        """
+        if strategy != 'mean':
+            df[output_col or column] = df[column].fillna(value)
+            return df
+        values = pd.to_numeric(df[column], errors='coerce')
+        stats = self.fill_stats.setdefault(column, [0.0, 0])
+        stats[0] += float(values.sum())
+        stats[1] += int(values.count())
+        mean = stats[0] / stats[1] if stats[1] else np.nan
+        if decimals is not None:
+            mean = round(mean, decimals)
+        df[output_col or column] = values.fillna(mean)
+        return df
+
+    def close(self):
+        """删除去重状态的溢写文件"""
+        for seen in self.seen.values():
+            seen.close()
+
+    def apply(self, df, spec):
+        """按顺序执行有状态规则"""
+        for column, options in spec.items():
+            options = dict(options)
+            method = options.pop('method')
+            df = getattr(self, method)(df, column, **options)
+        return df
+
+
+def next_chunk(reader, rows):
+    """从 pandas 的 TextFileReader 读取下一块，读完时返回 None"""
+    try:
+        return reader.get_chunk(rows)
+    except StopIteration:
+        return None
+
+
+def clean_csv(input_path, output_path, spec, chunksize=None, workers=None,
+              queue_size=None, encoding='utf-8', checkpoint=None, resume=False, normdict=None, gates=None,
+              max_memory=None):
+    """
+    流水线式清洗 CSV 文件
+
+    读取线程解析数据块并提交给清洗进程池，写出线程按输入顺序取回结果、
+    执行有状态规则并写出。队列有界，任何一个阶段变慢都会反压上游，
+    总耗时趋近于最慢阶段而不是各阶段之和。
+
+    Args:
+        input_path: 输入 CSV 路径
+        output_path: 输出 CSV 路径
+        spec: auto_clean 规则配置
+        chunksize: 每块行数，默认 50000；设置了 max_memory 时按预算自动确定
+        workers: 清洗进程数，默认 CPU 核数；小于等于 1 时使用单个线程
+        queue_size: 在途数据块上限，默认 workers * 2
+        encoding: 输入输出编码
+        checkpoint: 断点文件路径；设置后每写完一块提交一次断点
+        resume: 为 True 且断点存在时，从最后一次提交处继续，输出与一次跑完逐字节一致
+        normdict: 规范化字典路径，各工作进程共享同一个 SQLite 文件
+        gates: 质量闸门列表（见 gates 模块），每写完一块判定一次，未通过时停止读取并抛出 QualityGateError
+        max_memory: 内存预算（字节数或 '4GB'）。先读一小块估算每行占用，据此确定未指定的块大小和进程数；
+            预算的一部分留给去重状态，已见键超出后溢写到磁盘
+
+    Returns:
+        运行统计（块数、行数、各阶段耗时、实际块大小和进程数）
+    """
+    stateless, stateful = split_spec(spec)
+    max_memory = parse_size(max_memory) if max_memory else None
+    max_keys = None
+    chunk_memory = max_memory
+    dedupe_columns = sum(1 for options in stateful.values() if options['method'] == 'deduplicate')
+    if max_memory and dedupe_columns:
+        chunk_memory = max_memory * (1 - STATE_SHARE)
+        max_keys = int(max_memory * STATE_SHARE / SEEN_KEY_BYTES / dedupe_columns)
+    state = StreamState(stateful, track_added=checkpoint is not None, max_keys=max_keys)
+    gates = normalize_gates(gates, spec, stateful) if gates else None
+    monitor = GateMonitor(gates) if gates else None
+
+    # 断点：输入行偏移、输出字节偏移、是否已写表头
+    progress = {'spec_hash': spec_hash(spec), 'chunksize': chunksize,
+                'input_offset': 0, 'output_offset': 0, 'header_written': False}
+    store = Checkpoint(checkpoint) if checkpoint else None
+    record = None
+    if store is not None:
+        record = store.load() if resume else None
+        if record is None:
+            store.clear()
+        else:
+            if record['spec_hash'] != progress['spec_hash']:
+                raise ValueError("断点与当前规则配置不一致，无法续跑")
+            # 累计均值依赖块边界，续跑必须沿用断点中的块大小
+            chunksize = record['chunksize']
+            for key in progress:
+                progress[key] = record[key]
+            store.restore(record, state)
+
+    resume_options = {}
+    if progress['input_offset']:
+        # 续跑：单独读出表头，再按整数行数跳过已处理的数据，不为每个跳过的行号建集合
+        columns = pd.read_csv(input_path, nrows=0, encoding=encoding).columns
+        resume_options = {'header': None, 'names': list(columns), 'skiprows': progress['input_offset'] + 1}
+    chunks = pd.read_csv(input_path, iterator=True, dtype=str, encoding=encoding, **resume_options)
+    probe = None
+    if max_memory and record is None:
+        probe = next_chunk(chunks, PROBE_ROWS)
+        if probe is not None and len(probe):
+            frame_bytes = probe.memory_usage(deep=True).sum() / len(probe)
+            settings = suggest_settings(frame_bytes, frame_bytes * RULE_MEMORY_FACTOR, 0, chunk_memory,
+                                        max_workers=workers)
+            chunksize = chunksize or settings['chunksize']
+            workers = workers or settings['workers']
+    chunksize = progress['chunksize'] = chunksize or DEFAULT_CHUNKSIZE
+    workers = workers or os.cpu_count() or 1
+    queue_size = queue_size or workers * 2
+
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        # 在主线程中预先启动工作进程，避免在读写线程运行时 fork
+        executor.submit(int).result()
+    else:
+        executor = ThreadPoolExecutor(max_workers=1)
+
+    pending = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors = []
+    stats = {'chunks': 0, 'rows_in': 0, 'rows_out': 0,
+             'read_seconds': 0.0, 'write_seconds': 0.0}
+
+    def reader():
+        nonlocal probe
+        try:
+            while not stop.is_set():
+                started = time.perf_counter()
+                if probe is not None:
+                    chunk, probe = probe, None
+                else:
+                    chunk = next_chunk(chunks, chunksize)
+                stats['read_seconds'] += time.perf_counter() - started
+                if chunk is None:
+                    break
+                stats['chunks'] += 1
+                stats['rows_in'] += len(chunk)
+                pending.put((executor.submit(clean_chunk, chunk, stateless, normdict, gates), len(chunk)))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            pending.put(_DONE)
+
+    def writer():
+        # 增量编码器保证 utf-8-sig 的 BOM 只写一次
+        encoder = codecs.getincrementalencoder(encoding)()
+        mode = 'r+b' if progress['output_offset'] else 'wb'
+        with open(output_path, mode) as f:
+            if progress['output_offset']:
+                f.truncate(progress['output_offset'])
+                f.seek(progress['output_offset'])
+                encoder.encode('')
+            while True:
+                item = pending.get()
+                if item is _DONE:
+                    break
+                future, rows = item
+                if stop.is_set():
+                    future.cancel()
+                    continue
+                try:
+                    chunk, counts = future.result()
+                    if monitor is not None:
+                        monitor.update(counts)
+                        monitor.check()
+                    chunk = state.apply(chunk, stateful)
+                    started = time.perf_counter()
+                    text = chunk.to_csv(header=not progress['header_written'], index=False)
+                    f.write(encoder.encode(text))
+                    stats['write_seconds'] += time.perf_counter() - started
+                    stats['rows_out'] += len(chunk)
+                    progress['header_written'] = True
+                    progress['input_offset'] += rows
+                    if store is not None:
+                        f.flush()
+                        os.fsync(f.fileno())
+                        progress['output_offset'] = f.tell()
+                        store.commit(progress, state)
+                except Exception as e:
+                    errors.append(e)
+                    stop.set()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=reader, name='dcp-reader'),
+               threading.Thread(target=writer, name='dcp-writer')]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        executor.shutdown(cancel_futures=True)
+        chunks.close()
+        spills = sum(seen.spills for seen in state.seen.values())
+        state.close()
+
+    if not errors and monitor is not None:
+        try:
+            monitor.check(final=True)
+        except Exception as e:
+            errors.append(e)
+    if errors:
+        raise errors[0]
+    if store is not None:
+        store.clear()
+    if monitor is not None:
+        stats['gates'] = monitor.profile()['gates']
+    stats['elapsed_seconds'] = time.perf_counter() - started
+    stats['chunksize'] = chunksize
+    stats['workers'] = workers
+    stats['spills'] = spills
+    return stats
@@ -7,16 +7,17 @@ Data Cleaner Pro 增强版测试脚本
 import json
 from datetime import datetime
 import csv
+import math
 import os
 import sys
+from importlib.util import find_spec
 
-# 导入PDF生成器
-try:
-    from basic_pdf_generator import BasicPDFReport
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
-    print("警告: basic_pdf_generator.py 未找到，PDF报告功能不可用")
+from data_cleaner_pro.compiler import compile_batch_cleaner, mean_fill_values
+
+# PDF生成器（依赖fpdf）只在生成报告时导入
+PDF_AVAILABLE = find_spec("fpdf") is not None and find_spec("basic_pdf_generator") is not None
+if not PDF_AVAILABLE:
+    print("警告: fpdf 或 basic_pdf_generator.py 未找到，PDF报告功能不可用")
 
 
 def generate_test_data():
@@ -35,52 +36,34 @@ def generate_test_data():
     ]
 
 
+# 缺失值填充规则，编译为直线式的记录级清洗函数
+CLEANING_SPEC = {
+    "name": {"method": "fillna", "value": "未知"},
+    "age": {"method": "fillna", "strategy": "mean", "decimals": 1},
+    "score": {"method": "fillna", "strategy": "mean", "decimals": 1},
+    "department": {"method": "fillna", "value": "未分配"}
+}
+
+
 def clean_data(test_data):
     """清理数据"""
     print("执行数据清理...")
     
-    cleaned_data = []
-    stats = {
-        "total_age": 0,
-        "age_count": 0,
-        "total_score": 0,
-        "score_count": 0,
-        "departments": {}
-    }
-    
-    # 第一遍：计算统计信息
+    # 部门分布
+    departments = {}
     for item in test_data:
-        if item["age"] is not None:
-            stats["total_age"] += item["age"]
-            stats["age_count"] += 1
-        
-        if item["score"] is not None:
-            stats["total_score"] += item["score"]
-            stats["score_count"] += 1
-        
         dept = item["department"]
         if dept:
-            stats["departments"][dept] = stats["departments"].get(dept, 0) + 1
+            departments[dept] = departments.get(dept, 0) + 1
     
-    # 计算平均值
-    avg_age = stats["total_age"] / stats["age_count"] if stats["age_count"] > 0 else 0
-    avg_score = stats["total_score"] / stats["score_count"] if stats["score_count"] > 0 else 0
-    
-    # 第二遍：清理数据
-    for item in test_data:
-        cleaned_item = item.copy()
-        
-        # 填充缺失值
-        if cleaned_item["name"] is None:
-            cleaned_item["name"] = "未知"
-        if cleaned_item["age"] is None:
-            cleaned_item["age"] = round(avg_age, 1)
-        if cleaned_item["score"] is None:
-            cleaned_item["score"] = round(avg_score, 1)
-        if cleaned_item["department"] is None:
-            cleaned_item["department"] = "未分配"
-            
-        cleaned_data.append(cleaned_item)
+    # 计算均值并逐条填充缺失值；整列为空时均值按 0 计（pandas 规则得到 NaN）
+    fill_values = mean_fill_values(test_data, CLEANING_SPEC)
+    fill_values = {column: 0 if math.isnan(value) else value for column, value in fill_values.items()}
+    cleaner = compile_batch_cleaner(CLEANING_SPEC, ["id", "name", "age", "score", "department"],
+                                    fill_values=fill_values)
+    cleaned_data = cleaner(test_data)
+    avg_age = fill_values["age"]
+    avg_score = fill_values["score"]
     
     # 计算最终统计
     cleaned_count = 0
@@ -99,7 +82,7 @@ def clean_data(test_data):
         "average_score": round(avg_score, 1),
         "max_score": max(item["score"] for item in cleaned_data),
         "min_score": min(item["score"] for item in cleaned_data),
-        "department_distribution": stats["departments"]
+        "department_distribution": departments
     }
     
     return cleaned_data, final_stats
@@ -147,6 +130,8 @@ def generate_pdf_report(test_result, output_file="data_cleaner_pro_report.pdf"):
         return None
     
     try:
+        from basic_pdf_generator import BasicPDFReport
+        
         pdf = BasicPDFReport("Data Cleaner Pro Test Report")
         pdf.add_page()
         
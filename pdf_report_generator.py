@@ -7,370 +7,74 @@ Data Cleaner Pro PDF Report Generator
 支持中文显示和自定义模板
 """
 
-from fpdf import FPDF
 import json
-import pandas as pd
-from datetime import datetime
 import os
 
+from data_cleaner_pro.report.batch import render_batch
+from data_cleaner_pro.report.renderer import ReportPDF, get_renderer
+from data_cleaner_pro.report.templates import cleaning_report, ecommerce_report
+
+
+class DataCleanerPDFReport(ReportPDF):
+    """Data Cleaner Pro PDF报告生成器（统一报告引擎的 cjk 样式，中文字体在进程内只查找一次）"""
 
-class DataCleanerPDFReport(FPDF):
-    """Data Cleaner Pro PDF报告生成器"""
-    
     def __init__(self, title="Data Cleaner Pro 清洗报告"):
-        super().__init__()
-        self.title = title
-        self.set_auto_page_break(auto=True, margin=15)
-        
-        # 尝试添加中文字体，如果失败则使用默认字体
-        try:
-            # 尝试常见的中文字体路径
-            font_paths = [
-                'C:/Windows/Fonts/simsun.ttc',
-                'C:/Windows/Fonts/simsun.ttf',
-                'C:/Windows/Fonts/msyh.ttc',
-                'C:/Windows/Fonts/msyh.ttf',
-                '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc'  # Linux
-            ]
-            
-            font_added = False
-            for font_path in font_paths:
-                try:
-                    self.add_font('ChineseFont', '', font_path, uni=True)
-                    self.add_font('ChineseFont', 'B', font_path, uni=True)
-                    font_added = True
-                    print(f"使用字体: {font_path}")
-                    break
-                except:
-                    continue
-            
-            if not font_added:
-                # 使用默认字体
-                self.add_font('Arial', '', '', uni=True)
-                self.add_font('Arial', 'B', '', uni=True)
-                print("使用默认Arial字体")
-                
-        except Exception as e:
-            print(f"字体设置警告: {e}")
-            # 使用默认字体
-            self.add_font('Arial', '', '', uni=True)
-            self.add_font('Arial', 'B', '', uni=True)
-        
-    def header(self):
-        """页眉"""
-        try:
-            self.set_font('ChineseFont', 'B', 16)
-        except:
-            self.set_font('Arial', 'B', 16)
-        self.cell(0, 10, self.title, 0, 1, 'C')
-        
-        try:
-            self.set_font('ChineseFont', '', 10)
-        except:
-            self.set_font('Arial', '', 10)
-        self.cell(0, 5, f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", 0, 1, 'C')
-        self.ln(5)
-    
-    def footer(self):
-        """页脚"""
-        self.set_y(-15)
-        self.set_font('SimSun', 'I', 8)
-        self.cell(0, 10, f'第 {self.page_no()} 页', 0, 0, 'C')
-    
+        super().__init__(title, get_renderer('cjk').style)
+
     def add_title_section(self, title, level=1):
         """添加标题部分"""
-        if level == 1:
-            self.set_font('SimSun', 'B', 14)
-            self.cell(0, 10, title, 0, 1)
-            self.ln(2)
-        elif level == 2:
-            self.set_font('SimSun', 'B', 12)
-            self.cell(0, 8, title, 0, 1)
-            self.ln(1)
-        else:
-            self.set_font('SimSun', 'B', 11)
-            self.cell(0, 6, title, 0, 1)
-    
+        self.heading(title, level)
+
     def add_text_section(self, text):
         """添加文本部分"""
-        self.set_font('SimSun', '', 11)
-        self.multi_cell(0, 6, text)
-        self.ln(3)
-    
+        self.paragraph(text)
+
     def add_table(self, headers, data, col_widths=None):
         """添加表格"""
-        if col_widths is None:
-            col_widths = [190 / len(headers)] * len(headers)
-        
-        # 表头
-        self.set_fill_color(200, 220, 255)
-        self.set_font('SimSun', 'B', 10)
-        for i, header in enumerate(headers):
-            self.cell(col_widths[i], 7, str(header), border=1, align='C', fill=True)
-        self.ln()
-        
-        # 表格内容
-        self.set_font('SimSun', '', 10)
-        fill = False
-        for row in data:
-            for i, cell in enumerate(row):
-                self.cell(col_widths[i], 6, str(cell), border=1, align='C', fill=fill)
-            self.ln()
-            fill = not fill
-        self.ln(5)
-    
+        self.table(headers, data, col_widths)
+
     def add_bullet_list(self, items):
         """添加项目符号列表"""
-        self.set_font('SimSun', '', 11)
-        for item in items:
-            self.cell(5)
-            self.cell(5, 6, '•')
-            self.cell(5)
-            self.multi_cell(0, 6, item)
-        self.ln(3)
-    
-    def add_performance_chart(self, labels, values, title="性能对比"):
-        """添加简单的性能图表（文本形式）"""
-        self.add_title_section(title, level=2)
-        
-        max_value = max(values)
-        bar_width = 100  # 最大条形宽度
-        
-        for label, value in zip(labels, values):
-            self.set_font('SimSun', '', 10)
-            self.cell(40, 6, label)
-            
-            # 绘制条形
-            bar_length = (value / max_value) * bar_width
-            self.set_fill_color(100, 150, 255)
-            self.cell(bar_length, 6, '', fill=True)
-            
-            # 显示数值
-            self.cell(10)
-            self.cell(20, 6, f"{value:.1f}x", align='R')
-            self.ln()
-        
-        self.ln(5)
+        self.bullets(items)
+
+    def add_performance_chart(self, labels, values, title="性能对比", value_format='{:.1f}x'):
+        """添加性能条形图（矢量绘制），values 为实测数值，如各测试用例耗时或基准结果"""
+        self.bar_chart(labels, values, title, value_format=value_format)
 
 
-def generate_cleaning_report(test_results_path, output_pdf_path):
+def generate_cleaning_report(test_results_path, output_pdf_path, cache=None):
     """
     生成数据清洗报告PDF
     
     Args:
         test_results_path: 测试结果JSON文件路径
         output_pdf_path: 输出PDF文件路径
+        cache: 可选的章节缓存（data_cleaner_pro.report.sections.SectionCache），未变化的章节直接复用
     """
-    
-    # 加载测试结果
     with open(test_results_path, 'r', encoding='utf-8') as f:
         test_results = json.load(f)
-    
-    # 创建PDF报告
-    pdf = DataCleanerPDFReport("Data Cleaner Pro 数据清洗报告")
-    pdf.add_page()
-    
-    # 1. 报告概述
-    pdf.add_title_section("1. 报告概述", level=1)
-    pdf.add_text_section("本报告展示了Data Cleaner Pro在数据清洗任务中的性能和效果。"
-                        "通过对比传统方法和Data Cleaner Pro，展示了在效率、准确率和代码复杂度方面的显著提升。")
-    
-    # 2. 测试结果摘要
-    pdf.add_title_section("2. 测试结果摘要", level=1)
-    
-    summary_data = [
-        ["测试用例数", f"{test_results.get('total_tests', 5)}"],
-        ["通过测试数", f"{test_results.get('passed_tests', 5)}"],
-        ["失败测试数", f"{test_results.get('failed_tests', 0)}"],
-        ["通过率", f"{test_results.get('pass_rate', 100)}%"],
-        ["总记录数", f"{test_results.get('total_records', 5)}"],
-        ["成功清洗记录", f"{test_results.get('cleaned_records', 5)}"],
-        ["清洗成功率", f"{test_results.get('cleaning_success_rate', 100)}%"]
-    ]
-    
-    pdf.add_table(["指标", "数值"], summary_data, [80, 110])
-    
-    # 3. 性能对比
-    pdf.add_title_section("3. 性能对比", level=1)
-    
-    # 性能数据
-    performance_labels = ["处理速度", "代码复杂度", "准确率", "可维护性"]
-    performance_values = [15.4, 4.0, 1.08, 3.0]  # 加速倍数
-    
-    pdf.add_performance_chart(performance_labels, performance_values, "Data Cleaner Pro vs 传统方法")
-    
-    pdf.add_text_section("性能提升说明：")
-    performance_items = [
-        "处理速度：提升15.4倍，从338秒减少到22秒",
-        "代码复杂度：减少4倍，从120+行减少到<30行",
-        "准确率：提升8%，从92%提升到99.5%",
-        "可维护性：显著改善，统一的API接口"
-    ]
-    pdf.add_bullet_list(performance_items)
-    
-    # 4. 详细测试结果
-    pdf.add_title_section("4. 详细测试结果", level=1)
-    
-    if 'test_cases' in test_results:
-        test_cases = test_results['test_cases']
-        test_table_data = []
-        
-        for i, test_case in enumerate(test_cases, 1):
-            test_table_data.append([
-                f"测试{i}",
-                test_case.get('description', 'N/A'),
-                "✅" if test_case.get('passed', False) else "❌",
-                test_case.get('execution_time', 'N/A')
-            ])
-        
-        pdf.add_table(["测试编号", "描述", "状态", "执行时间(ms)"], test_table_data, [25, 100, 20, 45])
-    
-    # 5. 数据质量指标
-    pdf.add_title_section("5. 数据质量指标", level=1)
-    
-    quality_metrics = [
-        ["数据完整性", "94.3% → 99.8%", "提升5.5%"],
-        ["格式一致性", "87.5% → 100%", "提升12.5%"],
-        ["重复数据率", "3.2% → 0.1%", "减少3.1%"],
-        ["异常值比例", "0.9% → 0.05%", "减少0.85%"]
-    ]
-    
-    pdf.add_table(["指标", "改善情况", "提升幅度"], quality_metrics, [60, 60, 70])
-    
-    # 6. 结论与建议
-    pdf.add_title_section("6. 结论与建议", level=1)
-    pdf.add_text_section("基于测试结果，Data Cleaner Pro在数据清洗任务中表现出色：")
-    
-    conclusion_items = [
-        "效率显著提升：处理时间减少90%以上",
-        "代码大幅简化：代码行数减少75%",
-        "准确率提高：清洗准确率达到99.5%以上",
-        "易于维护：统一的API接口和清晰的文档",
-        "多场景适用：支持电商、金融、医疗等多种数据类型"
-    ]
-    pdf.add_bullet_list(conclusion_items)
-    
-    pdf.add_text_section("建议：")
-    recommendation_items = [
-        "对于日常数据清洗任务，推荐使用Data Cleaner Pro替代手动清洗",
-        "对于批量数据处理，建议使用Pipeline功能实现自动化",
-        "定期更新清洗规则以适应业务变化",
-        "建立数据质量监控机制，持续优化清洗效果"
-    ]
-    pdf.add_bullet_list(recommendation_items)
-    
-    # 7. 技术支持信息
-    pdf.add_title_section("7. 技术支持", level=1)
-    pdf.add_text_section("如需技术支持或了解更多信息，请通过以下方式联系我们：")
-    
-    contact_info = [
-        "GitHub仓库：https://github.com/datacleanerpro/data-cleaner-pro-demo",
-        "文档网站：https://datacleanerpro.github.io/docs",
-        "问题反馈：https://github.com/datacleanerpro/data-cleaner-pro-demo/issues",
-        "邮箱联系：support@datacleanerpro.com"
-    ]
-    pdf.add_bullet_list(contact_info)
-    
-    # 保存PDF
-    pdf.output(output_pdf_path)
+
+    get_renderer('cjk').render(cleaning_report(test_results), output_pdf_path, cache=cache)
     print(f"PDF报告已生成: {output_pdf_path}")
-    
     return output_pdf_path
 
 
-def generate_ecommerce_report(data_path, output_pdf_path):
+def generate_ecommerce_report(data_path, output_pdf_path, metrics=None, cache=None):
     """
     生成电商订单数据清洗专项报告
     
     Args:
         data_path: 电商数据CSV文件路径
         output_pdf_path: 输出PDF文件路径
+        metrics: 已统计好的清洗度量（data_cleaner_pro.metrics），提供时不再读取 data_path
+        cache: 可选的章节缓存，见 generate_cleaning_report
     """
-    
-    # 加载电商数据
-    try:
-        df = pd.read_csv(data_path, encoding='utf-8')
-    except:
-        df = pd.read_csv(data_path, encoding='gbk')
-    
-    # 创建PDF报告
-    pdf = DataCleanerPDFReport("电商订单数据清洗专项报告")
-    pdf.add_page()
-    
-    # 1. 报告概述
-    pdf.add_title_section("1. 电商订单数据清洗报告", level=1)
-    pdf.add_text_section("本报告针对电商平台订单数据进行专项清洗分析，展示了Data Cleaner Pro"
-                        "在解决电商数据常见问题方面的效果。")
-    
-    # 2. 原始数据概况
-    pdf.add_title_section("2. 原始数据概况", level=1)
-    
-    original_stats = [
-        ["总记录数", f"{len(df)}"],
-        ["数据列数", f"{len(df.columns)}"],
-        ["数据大小", f"{df.memory_usage(deep=True).sum() / 1024:.1f} KB"],
-        ["时间范围", f"{df['购买时间'].min()} 至 {df['购买时间'].max()}" if '购买时间' in df.columns else "N/A"],
-        ["价格范围", f"{df['价格'].min()} 至 {df['价格'].max()}" if '价格' in df.columns else "N/A"]
-    ]
-    
-    pdf.add_table(["统计指标", "数值"], original_stats, [80, 110])
-    
-    # 3. 数据问题分析
-    pdf.add_title_section("3. 数据问题分析", level=1)
-    
-    # 模拟问题检测结果
-    issues_data = [
-        ["价格格式问题", "450", "45.0%", "¥符号不一致、包含文字"],
-        ["时间格式混乱", "592", "59.2%", "缺少时分秒、格式不统一"],
-        ["地址信息缺失", "51", "5.1%", "省市区信息不全"],
-        ["手机号无效", "84", "8.4%", "格式错误、位数不对"],
-        ["重复订单记录", "32", "3.2%", "同一订单多次出现"]
-    ]
-    
-    pdf.add_table(["问题类型", "数量", "占比", "具体描述"], issues_data, [50, 30, 30, 80])
-    
-    # 4. 清洗效果
-    pdf.add_title_section("4. 清洗效果", level=1)
-    
-    cleaning_results = [
-        ["价格标准化", "100%", "450/450", "去除¥符号，转为数值"],
-        ["时间统一", "100%", "592/592", "补充默认时间，统一格式"],
-        ["地址补全", "95%", "48/51", "智能补全省市区信息"],
-        ["手机号验证", "98%", "82/84", "验证格式，标记无效"],
-        ["去重处理", "100%", "32/32", "保留最新记录"]
-    ]
-    
-    pdf.add_table(["清洗操作", "成功率", "处理数量", "处理方式"], cleaning_results, [50, 30, 40, 70])
-    
-    # 5. 业务价值
-    pdf.add_title_section("5. 业务价值分析", level=1)
-    
-    business_value = [
-        ["分析效率", "3.5小时 → 15分钟", "节省3.25小时/天"],
-        ["决策质量", "基于准确数据", "减少错误决策风险"],
-        ["客户体验", "准确配送信息", "提升客户满意度"],
-        ["运营成本", "自动化清洗", "减少人工成本"]
-    ]
-    
-    pdf.add_table(["维度", "改善情况", "价值体现"], business_value, [60, 70, 60])
-    
-    # 6. 实施建议
-    pdf.add_title_section("6. 实施建议", level=1)
-    pdf.add_text_section("针对电商平台的建议实施方案：")
-    
-    implementation_items = [
-        "每日定时清洗：设置凌晨自动清洗任务",
-        "实时数据监控：对新增订单实时清洗验证",
-        "质量报告：每日生成数据质量报告",
-        "规则优化：根据业务变化定期更新清洗规则",
-        "团队培训：培训运营人员使用清洗工具"
-    ]
-    pdf.add_bullet_list(implementation_items)
-    
-    # 保存PDF
-    pdf.output(output_pdf_path)
+    if metrics is None:
+        from data_cleaner_pro.metrics import collect_metrics
+        metrics = collect_metrics(data_path)
+
+    get_renderer('cjk').render(ecommerce_report(metrics), output_pdf_path, cache=cache)
     print(f"电商专项报告已生成: {output_pdf_path}")
-    
     return output_pdf_path
 
 
@@ -380,24 +84,28 @@ def main():
     print("Data Cleaner Pro PDF报告生成器")
     print("=" * 60)
     
-    # 生成测试结果报告
+    # 收集要生成的报告，交给进程池并行渲染
+    jobs = []
     test_results_file = "test_results_final.json"
     if os.path.exists(test_results_file):
-        output_file = "data_cleaner_pro_report.pdf"
-        generate_cleaning_report(test_results_file, output_file)
-        print(f"✓ 测试报告生成完成: {output_file}")
+        with open(test_results_file, 'r', encoding='utf-8') as f:
+            jobs.append((json.load(f), 'cleaning', "data_cleaner_pro_report.pdf"))
     else:
         print(f"⚠ 未找到测试结果文件: {test_results_file}")
     
-    # 生成电商专项报告
     ecommerce_data_file = "原始电商订单数据.csv"
     if os.path.exists(ecommerce_data_file):
-        output_file = "ecommerce_cleaning_report.pdf"
-        generate_ecommerce_report(ecommerce_data_file, output_file)
-        print(f"✓ 电商专项报告生成完成: {output_file}")
+        from data_cleaner_pro.metrics import collect_metrics
+        jobs.append((collect_metrics(ecommerce_data_file), 'ecommerce', "ecommerce_cleaning_report.pdf"))
     else:
         print(f"⚠ 未找到电商数据文件: {ecommerce_data_file}")
     
+    for result in render_batch(jobs):
+        if 'error' in result:
+            print(f"✗ 报告生成失败: {result['output']} ({result['error']})")
+        else:
+            print(f"✓ 报告生成完成: {result['output']} ({result['seconds']:.2f}s)")
+    
     print("=" * 60)
     print("PDF报告生成完成！")
     print("=" * 60)
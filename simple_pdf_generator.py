@@ -6,86 +6,33 @@
 避免字体兼容性问题
 """
 
-from fpdf import FPDF
 import json
-import pandas as pd
-from datetime import datetime
 import os
 
+from data_cleaner_pro.report.renderer import ReportPDF, resolve_style
+
+
+class SimpleDataCleanerPDF(ReportPDF):
+    """简化的PDF报告生成器，避免字体问题（统一报告引擎的 simple 样式）"""
 
-class SimpleDataCleanerPDF(FPDF):
-    """简化的PDF报告生成器，避免字体问题"""
-    
     def __init__(self, title="Data Cleaner Pro Report"):
-        super().__init__()
-        self.title = title
-        self.set_auto_page_break(auto=True, margin=15)
-        
-    def header(self):
-        """页眉"""
-        self.set_font('Arial', 'B', 16)
-        self.cell(0, 10, self.title, 0, 1, 'C')
-        self.set_font('Arial', '', 10)
-        self.cell(0, 5, f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", 0, 1, 'C')
-        self.ln(5)
-    
-    def footer(self):
-        """页脚"""
-        self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
-        self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
-    
+        super().__init__(title, resolve_style('simple'))
+
     def add_section_title(self, title, level=1):
         """添加章节标题"""
-        if level == 1:
-            self.set_font('Arial', 'B', 14)
-            self.cell(0, 10, title, 0, 1)
-            self.ln(2)
-        elif level == 2:
-            self.set_font('Arial', 'B', 12)
-            self.cell(0, 8, title, 0, 1)
-            self.ln(1)
-        else:
-            self.set_font('Arial', 'B', 11)
-            self.cell(0, 6, title, 0, 1)
-    
+        self.heading(title, level)
+
     def add_text(self, text):
         """添加文本"""
-        self.set_font('Arial', '', 11)
-        self.multi_cell(0, 6, text)
-        self.ln(3)
-    
+        self.paragraph(text)
+
     def add_table(self, headers, data, col_widths=None):
         """添加表格"""
-        if col_widths is None:
-            col_widths = [190 / len(headers)] * len(headers)
-        
-        # 表头
-        self.set_fill_color(200, 220, 255)
-        self.set_font('Arial', 'B', 10)
-        for i, header in enumerate(headers):
-            self.cell(col_widths[i], 7, str(header), border=1, align='C', fill=True)
-        self.ln()
-        
-        # 表格内容
-        self.set_font('Arial', '', 10)
-        fill = False
-        for row in data:
-            for i, cell in enumerate(row):
-                self.cell(col_widths[i], 6, str(cell), border=1, align='C', fill=fill)
-            self.ln()
-            fill = not fill
-        self.ln(5)
-    
+        self.table(headers, data, col_widths)
+
     def add_bullet_list(self, items):
         """添加项目符号列表"""
-        self.set_font('Arial', '', 11)
-        for item in items:
-            self.cell(5)
-            self.cell(5, 6, '•')
-            self.cell(5)
-            self.multi_cell(0, 6, item)
-        self.ln(3)
+        self.bullets(items)
 
 
 def generate_simple_report(test_results_path, output_pdf_path):
@@ -209,24 +156,54 @@ def generate_simple_report(test_results_path, output_pdf_path):
     return output_pdf_path
 
 
-def generate_ecommerce_analysis(data_path, output_pdf_path):
+# 报告使用 core 字体，中文列名和规则名换成英文显示
+COLUMN_NAMES = {
+    '订单号': 'Order ID',
+    '用户ID': 'User ID',
+    '商品名称': 'Product',
+    '价格': 'Price',
+    '购买时间': 'Purchase Time',
+    '收货地址': 'Address',
+    '手机号': 'Phone',
+    '订单状态': 'Status',
+}
+
+RULE_NAMES = {
+    'extract_number': ("Format Issues", "Standardization"),
+    'standardize_datetime': ("Format Problems", "Format Unification"),
+    'fillna': ("Missing", "Completion"),
+    'validate_phone': ("Invalid", "Validation"),
+    'deduplicate': ("Duplicates", "Deduplication"),
+}
+
+
+def rule_names(stats):
+    """规则度量对应的英文 (问题类型, 清洗操作) 名称"""
+    column = COLUMN_NAMES.get(stats['column'], stats['column'])
+    issue, action = RULE_NAMES.get(stats['method'], ("Issues", stats['method']))
+    return f"{column} {issue}", f"{column} {action}"
+
+
+def generate_ecommerce_analysis(data_path, output_pdf_path, metrics=None):
     """
     生成电商数据分析报告
     
     Args:
         data_path: 电商数据CSV文件路径
         output_pdf_path: 输出PDF文件路径
+        metrics: 已统计好的清洗度量（data_cleaner_pro.metrics），提供时不再读取 data_path
     """
     
-    # 加载电商数据
-    try:
-        df = pd.read_csv(data_path, encoding='utf-8')
-    except:
+    # 读取一次数据并统计清洗度量，报告只使用度量结果
+    if metrics is None:
+        from data_cleaner_pro.metrics import collect_metrics
         try:
-            df = pd.read_csv(data_path, encoding='gbk')
-        except:
+            metrics = collect_metrics(data_path)
+        except (OSError, UnicodeDecodeError):
             print(f"Cannot read data file: {data_path}")
             return None
+    rows = metrics['rows']
+    rules = metrics['rules']
     
     # 创建PDF报告
     pdf = SimpleDataCleanerPDF("E-commerce Data Analysis Report")
@@ -241,41 +218,40 @@ def generate_ecommerce_analysis(data_path, output_pdf_path):
     pdf.add_section_title("2. Data Overview", level=1)
     
     overview_data = [
-        ["Total Records", f"{len(df)}"],
-        ["Number of Columns", f"{len(df.columns)}"],
-        ["Data Size", f"{df.memory_usage(deep=True).sum() / 1024:.1f} KB"],
-        ["Date Range", f"{df.iloc[0, 0]} to {df.iloc[-1, 0]}" if len(df) > 0 else "N/A"]
+        ["Total Records", f"{rows}"],
+        ["Number of Columns", f"{len(metrics['columns'])}"],
+        ["Data Size", f"{metrics['memory_bytes'] / 1024:.1f} KB"]
     ]
+    for stats in rules:
+        if 'min' in stats:
+            column = COLUMN_NAMES.get(stats['column'], stats['column'])
+            overview_data.append([f"{column} Range", f"{stats['min']} to {stats['max']}"])
     
-    pdf.add_table(["Statistic", "Value"], overview_data, [100, 90])
+    pdf.add_table(["Statistic", "Value"], overview_data)
     
     # 3. Data Issues Analysis
     pdf.add_section_title("3. Data Issues Analysis", level=1)
     
     issues_data = [
-        ["Price Format Issues", "450", "45.0%", "Inconsistent currency symbols"],
-        ["Time Format Problems", "592", "59.2%", "Missing time components"],
-        ["Address Missing", "51", "5.1%", "Incomplete address information"],
-        ["Invalid Phone Numbers", "84", "8.4%", "Wrong format or length"],
-        ["Duplicate Orders", "32", "3.2%", "Same order appears multiple times"]
+        [rule_names(stats)[0], f"{stats['issues']}", f"{stats['issues'] / rows:.1%}" if rows else "N/A",
+         ", ".join(stats['samples']) or "-"]
+        for stats in rules
     ]
     
-    pdf.add_table(["Issue Type", "Count", "Percentage", "Description"], 
-                 issues_data, [60, 30, 30, 70])
+    pdf.add_table(["Issue Type", "Count", "Percentage", "Examples"], issues_data)
     
     # 4. Cleaning Results
     pdf.add_section_title("4. Cleaning Results", level=1)
     
     cleaning_results = [
-        ["Price Standardization", "100%", "450/450", "Remove symbols, convert to numbers"],
-        ["Time Format Unification", "100%", "592/592", "Add default time, unify format"],
-        ["Address Completion", "95%", "48/51", "Intelligently complete address info"],
-        ["Phone Validation", "98%", "82/84", "Validate format, mark invalid"],
-        ["Deduplication", "100%", "32/32", "Keep latest record"]
+        [rule_names(stats)[1], f"{stats['fixed'] / stats['issues']:.0%}" if stats['issues'] else "-",
+         f"{stats['fixed']}/{stats['issues']}", f"{stats['seconds'] * 1000:.1f}"]
+        for stats in rules
     ]
     
-    pdf.add_table(["Cleaning Operation", "Success Rate", "Processed", "Method"], 
-                 cleaning_results, [60, 30, 40, 60])
+    pdf.add_table(["Cleaning Operation", "Success Rate", "Processed", "Time (ms)"], cleaning_results)
+    pdf.bar_chart([rule_names(stats)[1] for stats in rules], [stats['seconds'] * 1000 for stats in rules],
+                  "Time per Rule (ms)")
     
     # 5. Business Value
     pdf.add_section_title("5. Business Value Analysis", level=1)
@@ -7,7 +7,9 @@
 
 import json
 import os
-from pdf_report_generator import generate_cleaning_report, generate_ecommerce_report
+
+from data_cleaner_pro.metrics import collect_metrics
+from data_cleaner_pro.report.batch import render_batch
 
 
 def create_test_results():
@@ -69,40 +71,27 @@ def test_pdf_generation():
     # 1. 创建测试数据
     test_results = create_test_results()
     
-    # 2. 生成测试报告
-    try:
-        output_file = "test_cleaning_report.pdf"
-        generate_cleaning_report('test_results_for_pdf.json', output_file)
-        
-        if os.path.exists(output_file):
+    # 2. 生成测试报告和电商报告（如果有数据文件），交给进程池并行渲染
+    jobs = [(test_results, 'cleaning', "test_cleaning_report.pdf")]
+    ecommerce_file = "原始电商订单数据.csv"
+    if os.path.exists(ecommerce_file):
+        jobs.append((collect_metrics(ecommerce_file), 'ecommerce', "test_ecommerce_report.pdf"))
+    
+    success = True
+    for result in render_batch(jobs):
+        output_file = result['output']
+        if 'error' in result:
+            print(f"✗ PDF生成失败: {output_file} ({result['error']})")
+            success = False
+        elif os.path.exists(output_file):
             file_size = os.path.getsize(output_file) / 1024
             print(f"✓ PDF报告生成成功: {output_file}")
             print(f"✓ 文件大小: {file_size:.1f} KB")
         else:
-            print("✗ PDF文件未生成")
-            
-    except Exception as e:
-        print(f"✗ PDF生成失败: {e}")
-        return False
-    
-    # 3. 测试电商报告生成（如果有数据文件）
-    ecommerce_file = "原始电商订单数据.csv"
-    if os.path.exists(ecommerce_file):
-        try:
-            output_file = "test_ecommerce_report.pdf"
-            generate_ecommerce_report(ecommerce_file, output_file)
-            
-            if os.path.exists(output_file):
-                file_size = os.path.getsize(output_file) / 1024
-                print(f"✓ 电商报告生成成功: {output_file}")
-                print(f"✓ 文件大小: {file_size:.1f} KB")
-            else:
-                print("✗ 电商PDF文件未生成")
-                
-        except Exception as e:
-            print(f"✗ 电商报告生成失败: {e}")
+            print(f"✗ PDF文件未生成: {output_file}")
+            success = False
     
-    return True
+    return success
 
 
 def create_sample_ecommerce_data():
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+"""
+结果缓存测试
+"""
+
+import json
+import os
+import time
+
+from data_cleaner_pro.cache import ResultCache, cached_clean, cache_key
+from data_cleaner_pro.cli import main
+
+
+CSV_TEXT = """订单号,价格
+ODR001,¥4999
+ODR002,699元
+ODR001,¥4999
+"""
+
+SPEC = {
+    "价格": {"method": "extract_number", "output_col": "价格_clean"},
+    "订单号": {"method": "deduplicate"},
+}
+
+
+def test_cached_clean_hits_and_misses(tmp_path):
+    source = tmp_path / "orders.csv"
+    source.write_text(CSV_TEXT, encoding="utf-8")
+    cache = ResultCache(tmp_path / "cache")
+    calls = []
+
+    def clean(input_path, output_path, spec, **options):
+        calls.append(spec)
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(f"rows={len(spec)}\n")
+        return {"rows_out": len(spec)}
+
+    first = cached_clean(str(source), str(tmp_path / "a.csv"), SPEC, cache=cache, clean=clean)
+    # 规则参数的键顺序不影响缓存键
+    shuffled = {column: dict(reversed(list(options.items()))) for column, options in SPEC.items()}
+    second = cached_clean(str(source), str(tmp_path / "b.csv"), shuffled, cache=cache, clean=clean)
+    assert not first["cache_hit"] and second["cache_hit"]
+    assert len(calls) == 1
+    assert (tmp_path / "b.csv").read_text(encoding="utf-8") == "rows=2\n"
+
+    # 规则按顺序执行，顺序不同视为不同的配置
+    reordered = dict(reversed(list(SPEC.items())))
+    assert not cached_clean(str(source), str(tmp_path / "r.csv"), reordered, cache=cache, clean=clean)["cache_hit"]
+    assert len(calls) == 2
+
+    # 输入内容或规则变化都会失效
+    source.write_text(CSV_TEXT + "ODR003,1元\n", encoding="utf-8")
+    assert not cached_clean(str(source), str(tmp_path / "c.csv"), SPEC, cache=cache, clean=clean)["cache_hit"]
+    assert not cached_clean(str(source), str(tmp_path / "d.csv"), {"订单号": {"method": "deduplicate"}},
+                            cache=cache, clean=clean)["cache_hit"]
+    assert len(calls) == 4
+
+
+def test_lru_eviction(tmp_path):
+    cache = ResultCache(tmp_path / "cache", max_bytes=250)
+    payload = tmp_path / "payload"
+    payload.write_bytes(b"x" * 100)
+    cache.put("aa01", {"output": str(payload)})
+    cache.put("aa02", {"output": str(payload)})
+    old = time.time() - 100
+    os.utime(cache.entry_path("aa01"), (old, old))
+    os.utime(cache.entry_path("aa02"), (old + 1, old + 1))
+    # 访问 aa01 使其变为最近使用
+    assert cache.get("aa01") is not None
+    cache.put("aa03", {"output": str(payload)})
+    assert cache.get("aa02") is None
+    assert cache.get("aa01") is not None and cache.get("aa03") is not None
+
+
+def test_cli_cache(tmp_path, capsys):
+    source = tmp_path / "orders.csv"
+    source.write_text(CSV_TEXT, encoding="utf-8")
+    spec = tmp_path / "spec.json"
+    spec.write_text(json.dumps(SPEC, ensure_ascii=False), encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+    outputs = []
+    for name in ("first.csv", "second.csv"):
+        output = tmp_path / name
+        assert main(["clean", str(source), "-o", str(output), "--spec", str(spec),
+                     "--engine", "columnar", "--cache", str(cache_dir)]) == 0
+        outputs.append(json.loads(capsys.readouterr().out))
+    assert [s["cache_hit"] for s in outputs] == [False, True]
+    assert (tmp_path / "first.csv").read_bytes() == (tmp_path / "second.csv").read_bytes()
+
+    assert main(["profile", str(source), "--cache", str(cache_dir)]) == 0
+    assert main(["profile", str(source), "--cache", str(cache_dir)]) == 0
+    profiles = capsys.readouterr().out
+    assert profiles.count('"rows": 3') == 2
+    assert cache_key(str(source), "profile") != cache_key(str(source), "clean")
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+"""
+命令行入口测试
+"""
+
+import json
+import subprocess
+import sys
+
+from data_cleaner_pro.cli import main
+
+
+CSV_TEXT = """订单号,价格,手机号,年龄
+ODR001,¥4999,13812345678,25
+ODR002,699元,123456,
+ODR001,¥4999,13812345678,25
+"""
+
+SPEC = {
+    "价格": {"method": "extract_number", "output_col": "价格_clean"},
+    "年龄": {"method": "fillna", "strategy": "mean"},
+    "订单号": {"method": "deduplicate"},
+}
+
+
+def write_inputs(tmp_path):
+    source = tmp_path / "orders.csv"
+    source.write_text(CSV_TEXT, encoding="utf-8")
+    spec = tmp_path / "spec.json"
+    spec.write_text(json.dumps(SPEC, ensure_ascii=False), encoding="utf-8")
+    return source, spec
+
+
+def test_clean_engines_agree(tmp_path, capsys):
+    source, spec = write_inputs(tmp_path)
+    for engine in ("pandas", "columnar"):
+        output = tmp_path / f"{engine}.csv"
+        assert main(["clean", str(source), "-o", str(output), "--spec", str(spec),
+                     "--engine", engine, "--workers", "1"]) == 0
+        stats = json.loads(capsys.readouterr().out)
+        assert stats["rows_out"] == 2
+
+    import pandas as pd
+    left = pd.read_csv(tmp_path / "pandas.csv")
+    right = pd.read_csv(tmp_path / "columnar.csv")
+    assert left["价格_clean"].tolist() == right["价格_clean"].tolist() == [4999.0, 699.0]
+    assert left["年龄"].tolist() == right["年龄"].tolist() == [25.0, 25.0]
+
+
+def test_default_spec_and_bench_on_columnar_engine(tmp_path, capsys):
+    source = tmp_path / "orders.csv"
+    source.write_text("订单号,价格,购买时间,手机号\n"
+                      "ODR001,¥4999,2024-03-01 10:00:00,13812345678\n"
+                      "ODR002,699元,2024/3/2,123456\n"
+                      "ODR003,12,2024.03.03 15时,\n"
+                      "ODR004,8,无效时间,13812345678\n", encoding="utf-8")
+    for engine in ("pandas", "columnar"):
+        output = tmp_path / f"{engine}.csv"
+        assert main(["clean", str(source), "-o", str(output), "--engine", engine, "--workers", "1"]) == 0
+        capsys.readouterr()
+
+    import pandas as pd
+    left = pd.read_csv(tmp_path / "pandas.csv", dtype=str)
+    right = pd.read_csv(tmp_path / "columnar.csv", dtype=str)
+    assert left["购买时间_clean"].tolist() == right["购买时间_clean"].tolist()
+    assert right["购买时间_clean"].tolist()[:3] == ["2024-03-01 10:00:00", "2024-03-02 00:00:00",
+                                                "2024-03-03 15:00:00"]
+
+    # bench 与 clean 一样按数值读入均值填充列
+    source, spec = write_inputs(tmp_path)
+    assert main(["bench", str(source), "--spec", str(spec), "--engine", "columnar", "--repeat", "1"]) == 0
+    assert json.loads(capsys.readouterr().out)["engine"] == "columnar"
+
+
+def test_profile(tmp_path, capsys):
+    source, _ = write_inputs(tmp_path)
+    assert main(["profile", str(source)]) == 0
+    profile = json.loads(capsys.readouterr().out)
+    assert profile["rows"] == 3
+    assert profile["columns"]["年龄"]["nulls"] == 1
+    assert profile["columns"]["订单号"]["distinct"] == 2
+
+
+def test_missing_input_returns_error(tmp_path, capsys):
+    assert main(["profile", str(tmp_path / "missing.csv")]) == 1
+    assert "错误" in capsys.readouterr().err
+
+
+def test_cli_startup_does_not_import_heavy_modules(tmp_path):
+    source, _ = write_inputs(tmp_path)
+    code = ("import sys; from data_cleaner_pro.cli import main; main(['profile', sys.argv[1]]); "
+            "sys.stderr.write(str(sorted(m for m in ('pandas', 'numpy', 'fpdf') if m in sys.modules)))")
+    result = subprocess.run([sys.executable, "-c", code, str(source)], capture_output=True, text=True)
+    assert result.returncode == 0
+    assert result.stderr == "[]"
+
+
+def test_profile_metrics_feed_report(tmp_path, capsys):
+    source, spec = write_inputs(tmp_path)
+    metrics_path = tmp_path / "metrics.json"
+    assert main(["profile", str(source), "--spec", str(spec), "-o", str(metrics_path)]) == 0
+    metrics = json.loads(metrics_path.read_text(encoding="utf-8"))
+    price, age, order = metrics["rules"]
+    assert metrics["rows"] == 3 and metrics["rows_out"] == 2
+    assert (price["issues"], price["fixed"], price["min"], price["max"]) == (3, 3, 699.0, 4999.0)
+    assert price["samples"] == ["¥4999", "699元"]
+    assert (age["nulls"], age["issues"]) == (1, 1)
+    assert (order["removed"], order["samples"]) == (1, ["ODR001"])
+
+    # 报告只使用度量，不再读取原始 CSV
+    source.unlink()
+    output = tmp_path / "ecommerce.pdf"
+    assert main(["report", str(metrics_path), "--kind", "ecommerce", "-o", str(output)]) == 0
+    assert output.read_bytes().startswith(b"%PDF")
+
+
+def test_report_runs_outside_the_repo(tmp_path):
+    import os
+    import shutil
+
+    import data_cleaner_pro
+
+    results = tmp_path / "results.json"
+    results.write_text(json.dumps({"total_tests": 1, "test_cases": [{"description": "a", "passed": True,
+                                                                    "execution_time": 5}]}), encoding="utf-8")
+    # 像安装后一样只复制包本身，仓库根目录的脚本不可导入
+    site = tmp_path / "site"
+    shutil.copytree(os.path.dirname(data_cleaner_pro.__file__), site / "data_cleaner_pro",
+                    ignore=shutil.ignore_patterns("__pycache__"))
+    work = tmp_path / "work"
+    work.mkdir()
+    env = dict(os.environ, PYTHONPATH=str(site))
+    result = subprocess.run([sys.executable, "-m", "data_cleaner_pro", "report", str(results), "-o", "out.pdf"],
+                            cwd=work, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert (work / "out.pdf").read_bytes().startswith(b"%PDF")
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+"""
+轻量列式引擎测试
+"""
+
+import subprocess
+import sys
+
+from data_cleaner_pro.columnar import ColumnTable
+
+
+RECORDS = [
+    {"id": 1, "name": "张三", "age": 25, "price": "¥4999", "phone": "13812345678"},
+    {"id": 2, "name": None, "age": None, "price": "699元", "phone": "123456"},
+    {"id": 3, "name": "王五", "age": 40, "price": "¥4999", "phone": None},
+    {"id": 1, "name": "张三", "age": 25, "price": "¥4999", "phone": "13812345678"},
+]
+
+
+def test_auto_clean():
+    table = ColumnTable.from_records(RECORDS)
+    assert table.columns["age"].values.typecode == "q"
+    assert table.columns["price"].table == ["¥4999", "699元"]
+
+    fill_values = table.auto_clean({
+        "name": {"method": "fillna", "value": "未知"},
+        "age": {"method": "fillna", "strategy": "mean", "decimals": 1},
+        "price": {"method": "extract_number", "output_col": "price_clean"},
+        "phone": {"method": "validate_phone", "output_col": "phone_valid"},
+        "id": {"method": "deduplicate"},
+    })
+
+    assert fill_values == {"name": "未知", "age": 30.0}
+    assert len(table) == 3
+    assert table.row(1).to_dict() == {"id": 2, "name": "未知", "age": 30.0, "price": "699元",
+                                      "phone": "123456", "price_clean": 699.0, "phone_valid": 0}
+    assert [row["price_clean"] for row in table.rows()] == [4999.0, 699.0, 4999.0]
+
+
+def test_csv_roundtrip(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("id,name,score\n1,张三,85.5\n2,,\n3,王五,78.5\n", encoding="utf-8")
+    table = ColumnTable.from_csv(path, numeric=("id", "score"))
+    table.fillna("score", strategy="mean")
+    table.fillna("name", value="未知")
+    table.to_csv(tmp_path / "out.csv")
+    assert (tmp_path / "out.csv").read_text(encoding="utf-8").splitlines() == [
+        "id,name,score", "1.0,张三,85.5", "2.0,未知,82.0", "3.0,王五,78.5"]
+
+
+def test_import_does_not_load_pandas():
+    code = ("import sys, data_cleaner_pro.columnar, data_cleaner_pro; "
+            "print('pandas' in sys.modules, 'numpy' in sys.modules)")
+    output = subprocess.check_output([sys.executable, "-c", code], text=True)
+    assert output.split() == ["False", "False"]
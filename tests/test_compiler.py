@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+"""
+记录级规则编译器测试
+"""
+
+from data_cleaner_pro.compiler import clean_records, compile_record_cleaner, generate_source
+
+
+RECORDS = [
+    {"id": 1, "name": "张三", "age": 25, "price": "¥4999", "phone": "13812345678"},
+    {"id": 2, "name": None, "age": None, "price": "699元", "phone": "123456"},
+    {"id": 3, "name": "王五", "age": 40, "price": None, "phone": None},
+    {"id": 1, "name": "张三", "age": 25, "price": "¥4999", "phone": "13812345678"},
+]
+
+SPEC = {
+    "name": {"method": "fillna", "value": "未知"},
+    "age": {"method": "fillna", "strategy": "mean", "decimals": 1},
+    "price": {"method": "extract_number", "output_col": "price_clean"},
+    "phone": {"method": "validate_phone", "output_col": "phone_valid"},
+    "id": {"method": "deduplicate"},
+}
+
+
+def test_clean_records():
+    cleaned, fill_values = clean_records(RECORDS, SPEC)
+
+    assert fill_values == {"age": 30.0}
+    assert len(cleaned) == 3
+    assert cleaned[1] == {"id": 2, "name": "未知", "age": 30.0, "price": "699元", "phone": "123456",
+                          "price_clean": 699.0, "phone_valid": False}
+    assert cleaned[2]["price_clean"] is None
+    # 原始记录不被修改
+    assert RECORDS[1]["name"] is None
+
+
+def test_generated_code_is_straight_line_and_cached():
+    source, params = generate_source(SPEC, fields=list(RECORDS[0]))
+    record_source = source.split("def clean_batch")[0]
+    assert "for " not in record_source and "get(" not in record_source
+    assert params == ["c0", "c1", "c2", "c3"]
+
+    first = compile_record_cleaner(SPEC, list(RECORDS[0]), fill_values={"age": 1})
+    second = compile_record_cleaner(SPEC, list(RECORDS[0]), fill_values={"age": 2})
+    assert first.__code__ is second.__code__
+    assert second(dict(RECORDS[1]))["age"] == 2
+
+
+def test_inplace_and_datetime():
+    spec = {"t": {"method": "standardize_datetime"}}
+    cleaner = compile_record_cleaner(spec, inplace=True)
+    record = {"t": "2024.3.1 12时"}
+    assert cleaner(record) is record
+    assert record["t"] == "2024-03-01 12:00:00"
+
+
+def test_mean_fill_of_all_null_column_matches_pandas(tmp_path):
+    import math
+
+    import pandas as pd
+    from data_cleaner_pro import DataCleaner
+    from data_cleaner_pro.columnar import ColumnTable
+
+    records = [{"id": 1, "age": None}, {"id": 2, "age": None}]
+    spec = {"age": {"method": "fillna", "strategy": "mean"}}
+    cleaned, fill_values = clean_records(records, spec)
+    assert math.isnan(fill_values["age"])
+    assert all(math.isnan(record["age"]) for record in cleaned)
+    assert DataCleaner(pd.DataFrame(records)).auto_clean(spec)["age"].isna().all()
+
+    path = tmp_path / "data.csv"
+    path.write_text("id,age\n1,\n2,\n", encoding="utf-8")
+    table = ColumnTable.from_csv(path, numeric=("age",))
+    assert table.auto_clean(spec) == {"age": None}
+    assert [row["age"] for row in table.rows()] == [None, None]
+
+
+def test_rule_order_compiles_separately():
+    records = [{"价格": "¥12", "p": None}, {"价格": None, "p": None}]
+    forward = {"价格": {"method": "extract_number", "output_col": "p"}, "p": {"method": "fillna", "value": 0}}
+    backward = dict(reversed(list(forward.items())))
+
+    cleaned, _ = clean_records(records, forward)
+    assert [record["p"] for record in cleaned] == [12.0, 0]
+    # 顺序相反时先填充 p，再由价格覆盖 p
+    cleaned, _ = clean_records(records, backward)
+    assert [record["p"] for record in cleaned] == [12.0, None]
+
+
+def test_string_records_match_pandas(tmp_path):
+    import csv
+    import math
+
+    import pandas as pd
+    from data_cleaner_pro import DataCleaner
+
+    path = tmp_path / "data.csv"
+    path.write_text("id,name,age,price,phone,t\n"
+                    "1,张三,25,¥4999,13812345678,2024/3/1\n"
+                    "2,,,699元,123456,\n"
+                    "3,王五,四十,０９,,2024.3.1 12时\n"
+                    "4,李四, 31 ,,13912345678,无效\n", encoding="utf-8")
+    spec = {
+        "name": {"method": "fillna", "value": "未知"},
+        "age": {"method": "fillna", "strategy": "mean", "decimals": 1},
+        "price": {"method": "extract_number", "output_col": "price_clean"},
+        "phone": {"method": "validate_phone", "output_col": "phone_valid"},
+        "t": {"method": "standardize_datetime"},
+    }
+    with open(path, encoding="utf-8", newline="") as f:
+        cleaned, fill_values = clean_records(csv.DictReader(f), spec)
+    expected = DataCleaner(pd.read_csv(path, dtype=str)).auto_clean(spec)
+
+    assert fill_values == {"age": 28.0}
+    assert [list(record) for record in cleaned][0] == list(expected.columns)
+    for record, row in zip(cleaned, expected.to_dict("records")):
+        for column, value in row.items():
+            if column == "id":
+                continue
+            if isinstance(value, float) and math.isnan(value):
+                # 未经规则处理的原列保留 DictReader 的空字符串
+                assert record[column] in (None, "") or math.isnan(record[column]), column
+            else:
+                assert record[column] == value, column
+
+
+def test_report_script_defaults_all_null_mean_to_zero():
+    from data_cleaner_pro_with_pdf import clean_data, generate_test_data
+
+    data = [dict(item, age=None) for item in generate_test_data()]
+    cleaned, stats = clean_data(data)
+    assert stats["average_age"] == 0
+    assert [item["age"] for item in cleaned] == [0] * len(data)
+    assert stats["cleaned_records"] == len(data)
+
+    cleaned, stats = clean_data(generate_test_data())
+    assert stats["average_age"] == 33.1
+    assert cleaned[0]["age"] == 25 and cleaned[2]["age"] == 33.1
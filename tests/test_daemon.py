@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+"""
+常驻守护进程测试
+"""
+
+import threading
+
+import pandas as pd
+
+from data_cleaner_pro.daemon import serve, shutdown, submit
+
+
+SPEC = {
+    "价格": {"method": "extract_number", "output_col": "价格_clean"},
+    "订单号": {"method": "deduplicate"},
+}
+
+
+def test_submit_jobs_to_warm_workers(tmp_path):
+    source = tmp_path / "shop.csv"
+    source.write_text("订单号,价格\nODR001,¥4999\nODR002,699元\nODR001,¥4999\n", encoding="utf-8")
+    socket_path = str(tmp_path / "dc.sock")
+
+    ready = threading.Event()
+    server = threading.Thread(target=serve, args=(socket_path,), kwargs={"workers": 1, "ready": ready})
+    server.start()
+    try:
+        assert ready.wait(30)
+
+        events = list(submit(source, SPEC, socket_path=socket_path))
+        assert [e["event"] for e in events] == ["accepted", "data", "done"]
+        assert events[1]["text"].splitlines()[1] == "ODR001,¥4999,4999.0"
+        assert events[-1]["stats"]["rows_out"] == 2
+        assert events[-1]["stats"]["spec_cached"] is False
+
+        output = tmp_path / "cleaned.csv"
+        events = list(submit(source, SPEC, output, socket_path=socket_path))
+        assert events[-1]["stats"]["spec_cached"] is True
+        assert pd.read_csv(output)["价格_clean"].tolist() == [4999.0, 699.0]
+
+        # 规则顺序不同视为不同的配置
+        events = list(submit(source, dict(reversed(list(SPEC.items()))), socket_path=socket_path))
+        assert events[-1]["stats"]["spec_cached"] is False
+
+        events = list(submit(tmp_path / "missing.csv", SPEC, socket_path=socket_path))
+        assert events[-1]["event"] == "error"
+    finally:
+        shutdown(socket_path)
+        server.join(30)
+    assert not server.is_alive()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+"""
+试运行估算测试
+"""
+
+import pandas as pd
+
+from data_cleaner_pro.budget import suggest_settings
+from data_cleaner_pro.dryrun import dry_run, reservoir_sample
+
+
+SPEC = {
+    '价格': {'method': 'extract_number', 'output_col': '价格_clean'},
+    '订单号': {'method': 'deduplicate', 'keep': 'first'},
+}
+
+
+def write_orders(path, num_records):
+    pd.DataFrame({
+        '订单号': [f'ODR{i % 300:06d}' for i in range(num_records)],
+        '价格': [f'¥{i}' if i % 2 else str(i) for i in range(num_records)],
+    }).to_csv(path, index=False, encoding='utf-8')
+
+
+def test_reservoir_sample_covers_whole_file(tmp_path):
+    source = tmp_path / 'orders.csv'
+    write_orders(source, 5000)
+    header, rows, total = reservoir_sample(source, 200)
+    assert header == ['订单号', '价格']
+    assert total == 5000 and len(rows) == 200
+    # 样本按原始顺序排列，且来自整个文件而不只是开头
+    indexes = [int(price.lstrip('¥')) for _, price in rows]
+    assert indexes == sorted(indexes)
+    assert max(indexes) > 2500
+
+    _, small, total = reservoir_sample(source, 10000)
+    assert total == len(small) == 5000
+
+
+def test_dry_run_extrapolates(tmp_path):
+    source = tmp_path / 'orders.csv'
+    write_orders(source, 3000)
+    report = dry_run(source, SPEC, sample_size=300)
+    assert report['rows'] == 3000 and report['sample_rows'] == 300
+    assert [r['method'] for r in report['rules']] == ['extract_number', 'deduplicate']
+    assert all(r['estimated_seconds'] >= r['seconds'] for r in report['rules'])
+    assert report['estimate']['peak_memory_bytes'] > report['estimate']['state_bytes'] > 0
+    assert report['suggested']['workers'] >= 1
+
+
+def test_suggest_settings_respects_budget():
+    # 可并行部分只是串行部分的 2 倍时，多开进程没有收益
+    settings = suggest_settings(1000, 1000, 0, 10 ** 9, max_workers=8,
+                                parallel_seconds=2, serial_seconds=1)
+    assert settings == {'chunksize': 125000, 'workers': 2}
+    # 预算放不下最小块时减少进程数
+    settings = suggest_settings(1000, 1000, 0, 20 * 1000 ** 2, max_workers=8,
+                                parallel_seconds=8, serial_seconds=1)
+    assert settings == {'chunksize': 1000, 'workers': 5}
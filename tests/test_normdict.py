@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+"""
+规范化字典测试
+"""
+
+import pandas as pd
+
+from data_cleaner_pro import DataCleaner
+from data_cleaner_pro.normdict import NormalizationDict, rule_key
+from data_cleaner_pro.rules import get_rule
+
+
+SPEC = {
+    "价格": {"method": "extract_number", "output_col": "价格_clean"},
+    "购买时间": {"method": "standardize_datetime", "output_col": "购买时间_clean"},
+}
+
+
+def make_df():
+    return pd.DataFrame({
+        "价格": ["¥4999", "699元", "¥4999", None, "免费"],
+        "购买时间": ["2024-03-01 10:00:00", "2024/3/2", None, "2024.3.3 12时", "2024-03-01 10:00:00"],
+    }, dtype=str)
+
+
+def test_normdict_matches_direct_rules(tmp_path):
+    path = tmp_path / "norm.sqlite"
+    expected = DataCleaner(make_df()).auto_clean(SPEC)
+    first = DataCleaner(make_df(), normdict=path).auto_clean(SPEC)
+    second = DataCleaner(make_df(), normdict=path).auto_clean(SPEC)
+    pd.testing.assert_frame_equal(first, expected)
+    pd.testing.assert_frame_equal(second, expected)
+    # 只记录不重复、且不是规范形式的原始值
+    assert len(NormalizationDict(path)) == 3 + 2
+
+
+def test_normdict_lookup_skips_parsing(tmp_path):
+    path = tmp_path / "norm.sqlite"
+    store = NormalizationDict(path)
+    func = get_rule("extract_number")
+    store.update(rule_key(func, {"output_col": "价格_clean"}), {"¥4999": 1.0})
+    cleaned = DataCleaner(make_df(), normdict=store).auto_clean({"价格": SPEC["价格"]})
+    assert cleaned["价格_clean"].tolist()[:3] == [1.0, 699.0, 1.0]
+    # 参数不同的规则不共享映射
+    other = rule_key(func, {"pattern": r"(\d+)"})
+    assert store.lookup(other, ["¥4999"]) == {}
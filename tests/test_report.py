@@ -0,0 +1,493 @@
+# -*- coding: utf-8 -*-
+
+"""
+统一报告引擎测试
+"""
+
+import warnings
+
+from data_cleaner_pro.report import Report
+from data_cleaner_pro.report.renderer import ReportRenderer, get_renderer, resolve_style
+from data_cleaner_pro.report.templates import cleaning_report
+
+
+def build_report():
+    report = Report("Cleaning Report")
+    (report.section("1. Summary")
+        .text("Price and time columns were normalized.")
+        .table(["Metric", "Value"], [["Rows", "1000"], ["Cleaned", "995"]], [80, 110])
+        .bullets(["Fast", "Accurate"])
+        .chart(["speed", "accuracy"], [15.4, 1.08], "Speedup", value_format='{:.1f}x'))
+    report.section("1.1 Details", level=2).text("No issues.")
+    return report
+
+
+def test_render_layout(tmp_path):
+    output = tmp_path / "report.pdf"
+    ReportRenderer('simple').render(build_report(), str(output))
+    assert output.read_bytes().startswith(b"%PDF")
+
+
+def test_renderer_shared_and_cjk_fallback(tmp_path):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        renderer = get_renderer('cjk')
+        assert get_renderer('cjk') is renderer
+        # 没有中文字体时退回 core 字体，中文字符不再导致渲染失败
+        if resolve_style('cjk').unicode_font is None:
+            assert renderer.style.unicode_font is None
+
+    results = {"total_tests": 2, "test_cases": [{"description": "价格格式清洗测试", "passed": True,
+                                                  "execution_time": 45}]}
+    for name in ("a.pdf", "b.pdf"):
+        renderer.render(cleaning_report(results), str(tmp_path / name))
+        assert (tmp_path / name).stat().st_size > 0
+
+
+def test_cleaning_report_charts_measured_values():
+    def charts(report):
+        return [(block.labels, block.values) for section in report.sections for block in section.blocks
+                if block.kind == 'chart']
+
+    results = {"test_cases": [{"description": "缺失值", "execution_time": 45},
+                              {"description": "手机号", "execution_time": 32}],
+               "benchmark": {"engine": "pandas", "rows": 1000, "read_seconds": 0.5, "clean_seconds": 0.25,
+                             "rows_per_second": 4000.0}}
+    assert charts(cleaning_report(results)) == [(["缺失值", "手机号"], [45, 32]), (["读取", "清洗"], [0.5, 0.25])]
+    # 没有耗时数据时不画图，也不输出固定的性能数字
+    report = cleaning_report({})
+    assert charts(report) == []
+    assert "15.4" not in repr([vars(block) for section in report.sections for block in section.blocks])
+
+
+def test_cleaning_report_prints_only_given_figures():
+    def blocks(report):
+        return repr([vars(block) for section in report.sections for block in section.blocks])
+
+    # 缺少的指标显示 N/A，不再输出固定的质量指标和结论数字
+    text = blocks(cleaning_report({}))
+    assert "N/A" in text and "'5'" not in text and "100%" not in text
+    assert "94.3%" not in text and "90%" not in text and "99.5%" not in text
+
+    results = {"total_records": 1000, "cleaned_records": 995,
+               "test_cases": [{"description": "a", "passed": True}, {"description": "b", "passed": False}],
+               "benchmark": {"engine": "columnar", "rows": 1000, "read_seconds": 0.5, "clean_seconds": 0.25,
+                             "rows_per_second": 4000.0}}
+    section = [s for s in cleaning_report(results).sections if s.title == "5. 结论与建议"][0]
+    assert section.blocks[1].items == ["测试用例：1/2 通过", "清洗成功率：99.5%（995/1000 条记录）",
+                                       "清洗吞吐量：4000 行/秒（columnar 引擎，1000 行）"]
+
+
+def test_ecommerce_report_derives_value_section_from_metrics():
+    from data_cleaner_pro.report.templates import ecommerce_report
+
+    metrics = {"rows": 200, "rows_out": 190, "seconds": 0.05, "memory_bytes": 4096, "columns": {},
+               "rules": [{"column": "价格", "method": "extract_number", "issues": 20, "fixed": 15,
+                          "seconds": 0.03, "samples": ["¥699"]},
+                         {"column": "订单号", "method": "deduplicate", "issues": 10, "fixed": 10,
+                          "seconds": 0.02, "samples": []}]}
+    section = ecommerce_report(metrics).sections[4]
+    assert section.title == "5. 清洗收益"
+    assert section.blocks[0].rows == [["发现问题值", "30"], ["修复问题值", "25（83%）"], ["去除记录", "10"],
+                                      ["清洗吞吐量（行/秒）", "4000"], ["每千行耗时（毫秒）", "250.0"]]
+
+
+def build_font(path):
+    """生成一个只含几个方块字形的小字体（覆盖 ASCII 和几个中文字符）"""
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+    chars = "ABC 报告中文•:-0123456789第页生成时间"
+    names = [".notdef"] + [f"uni{ord(c):04X}" for c in chars]
+    glyphs = {}
+    for name in names:
+        pen = TTGlyphPen(None)
+        if name != "uni0020":
+            pen.moveTo((50, 0))
+            pen.lineTo((450, 0))
+            pen.lineTo((450, 700))
+            pen.lineTo((50, 700))
+            pen.closePath()
+        glyphs[name] = pen.glyph()
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(names)
+    builder.setupCharacterMap({ord(c): f"uni{ord(c):04X}" for c in chars})
+    builder.setupGlyf(glyphs)
+    builder.setupHorizontalMetrics({name: (500, 50) for name in names})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({"familyName": "Test", "styleName": "Regular"})
+    builder.setupOS2()
+    builder.setupPost()
+    builder.save(str(path))
+
+
+def test_font_registry_caches_metrics_and_subsets(tmp_path, monkeypatch):
+    from datetime import datetime, timezone
+
+    from data_cleaner_pro.report.fonts import FontRegistry
+    from data_cleaner_pro.report.renderer import STYLES, ReportPDF
+
+    font = tmp_path / "cjk.ttf"
+    build_font(font)
+    monkeypatch.setenv("DATA_CLEANER_FONT", str(font))
+    assert FontRegistry(str(tmp_path / "fonts")).cjk_font() == str(font)
+    style = STYLES["cjk"].replace(unicode_font=str(font))
+
+    class PlainRegistry(FontRegistry):
+        def metrics(self, path):
+            return None, None
+
+    def render(registry, name):
+        pdf = ReportPDF("报告", style, registry)
+        pdf.generated = "2024-01-01 00:00:00"
+        pdf.set_creation_date(datetime(2024, 1, 1, tzinfo=timezone.utc))
+        pdf.add_page()
+        pdf.paragraph("中文 ABC 123")
+        pdf.output(str(tmp_path / name))
+        return (tmp_path / name).read_bytes()
+
+    expected = render(PlainRegistry(str(tmp_path / "plain")), "plain.pdf")
+    # 第一次解析并写入缓存，第二次用新的注册表从磁盘读取度量和子集
+    assert render(FontRegistry(str(tmp_path / "fonts")), "a.pdf") == expected
+    assert len(list((tmp_path / "fonts").glob("*.metrics"))) == 1
+    assert list((tmp_path / "fonts" / "subsets").glob("*.subset"))
+    assert render(FontRegistry(str(tmp_path / "fonts")), "b.pdf") == expected
+
+
+def test_build_font_matches_ttffont_fields(tmp_path):
+    import fpdf
+    from fpdf.fonts import TTFFont
+
+    from data_cleaner_pro.report.fonts import DESCRIPTOR_FIELDS, FontRegistry
+
+    font = tmp_path / "cjk.ttf"
+    build_font(font)
+    registry = FontRegistry(str(tmp_path / "fonts"))
+    _, metrics = registry.metrics(str(font))
+    built = registry.build_font(fpdf.FPDF(), str(font), "test", "", metrics)
+    pdf = fpdf.FPDF()
+    pdf.add_font("test", "", str(font))
+    parsed = pdf.fonts["test"]
+    # build_font 绕过 __init__ 写内部字段；fpdf2 增删或改动 TTFFont 字段时这里失败
+    fields = [name for cls in TTFFont.__mro__ for name in getattr(cls, "__slots__", ())]
+
+    def state(font):
+        objects = {"ttfont", "subset", "desc", "color_font", "_hbfont"}
+        values = {name: (name in objects) or getattr(font, name) for name in fields if hasattr(font, name)}
+        values["ttffile"] = str(values["ttffile"])
+        return values
+
+    assert state(built) == state(parsed)
+    assert [getattr(built.desc, f) for f in DESCRIPTOR_FIELDS] == [getattr(parsed.desc, f) for f in DESCRIPTOR_FIELDS]
+
+
+def page_streams(data):
+    """解压 PDF 中的全部内容流"""
+    import re
+    import zlib
+
+    streams = []
+    for match in re.finditer(rb"stream\r?\n(.*?)\r?\nendstream", data, re.S):
+        try:
+            streams.append(zlib.decompress(match.group(1)))
+        except zlib.error:
+            pass
+    return streams
+
+
+def test_streaming_table_repeats_headers(tmp_path):
+    import pandas as pd
+
+    from data_cleaner_pro.report.renderer import PackedContents, ReportPDF, resolve_style
+
+    def chunks():
+        for start in range(0, 300, 100):
+            yield pd.DataFrame({"order": [f"ODR{i:05d}" for i in range(start, start + 100)],
+                                "price": [None if i % 7 == 0 else i * 1.5 for i in range(start, start + 100)]})
+
+    pdf = ReportPDF("Rejected orders", resolve_style("simple"))
+    pdf.add_page()
+    pdf.table(["Order ID", "Price"], chunks())
+    assert pdf.page > 5
+    # 已完成的页面以压缩形式保存
+    assert all(isinstance(pdf.pages[n].contents, PackedContents) for n in range(1, pdf.page))
+    pdf.output(str(tmp_path / "rejected.pdf"))
+
+    streams = [s for s in page_streams((tmp_path / "rejected.pdf").read_bytes()) if b"Order ID" in s]
+    assert len(streams) == pdf.page
+    assert any(b"ODR00299" in s for s in streams)
+
+
+def test_vectorized_widths_match_fpdf(tmp_path):
+    import numpy as np
+
+    from data_cleaner_pro.report.renderer import ReportPDF, STYLES, resolve_style
+    from data_cleaner_pro.report.widths import distribute, fit_text, measure
+
+    font = tmp_path / "cjk.ttf"
+    build_font(font)
+    texts = ["", "ABC", "报告 123", "中文•ABC:0", "生成时间 é\U0001F600"]
+    for style in (resolve_style("simple"), STYLES["cjk"].replace(unicode_font=str(font))):
+        pdf = ReportPDF("t", style)
+        pdf.set_font(style.font, "B", 10)
+        cleaned = [pdf.clean_text(t) for t in texts]
+        expected = [pdf.get_string_width(t) for t in cleaned]
+        assert np.allclose(measure(pdf, cleaned), expected)
+        clipped = fit_text(pdf, "ABC" * 50, 30)
+        assert clipped.endswith("...") and pdf.get_string_width(clipped) <= 30
+
+    # 窄列保持所需宽度，宽列平分剩余宽度；总需求不足时按比例铺满
+    assert distribute([20, 150, 300], 190).tolist() == [20, 85, 85]
+    assert distribute([20, 30, 45], 190).tolist() == [40, 60, 90]
+
+
+def test_auto_width_table(tmp_path):
+    from data_cleaner_pro.report.renderer import ReportPDF, resolve_style
+
+    pdf = ReportPDF("t", resolve_style("simple"))
+    pdf.add_page()
+    captured = []
+    original = pdf.cell
+
+    def cell(width, *args, **kwargs):
+        captured.append(width)
+        return original(width, *args, **kwargs)
+
+    pdf.cell = cell
+    rows = [[f"{i}", "Remove symbols, convert to numbers and keep the original value " * 2] for i in range(50)]
+    pdf.table(["ID", "Method"], iter(rows))
+    id_width, method_width = captured[-2:]
+    assert id_width < 20 and abs(id_width + method_width - pdf.epw) < 1e-6
+    pdf.output(str(tmp_path / "auto.pdf"))
+
+
+def test_lttb_keeps_shape():
+    import numpy as np
+
+    from data_cleaner_pro.report.charts import lttb
+
+    x = np.arange(10000)
+    y = np.sin(x / 500)
+    y[4321] = 50
+    index = lttb(x, y, 200)
+    assert len(index) == 200 and index[0] == 0 and index[-1] == 9999
+    assert (np.diff(index) > 0).all() and 4321 in index
+    assert lttb(x[:50], y[:50], 200).tolist() == list(range(50))
+
+
+def test_charts_render_vector_paths(tmp_path):
+    import numpy as np
+    import pandas as pd
+
+    from data_cleaner_pro.report.templates import bench_report, profile_report
+
+    hours = pd.date_range("2024-01-01", periods=8760, freq="h")
+    load = np.random.default_rng(0).normal(100, 10, len(hours))
+    report = Report("Charts")
+    (report.section("1. Charts")
+        .line_chart(list(hours), load, "Hourly load", max_points=300)
+        .histogram(load, "Distribution", bins=15))
+    renderer = ReportRenderer('simple')
+    renderer.render(report, str(tmp_path / "charts.pdf"))
+    streams = page_streams((tmp_path / "charts.pdf").read_bytes())
+    # 折线只保留降采样后的点，每个点一个 l 操作
+    assert sum(s.count(b" l\n") for s in streams) < 400
+    assert any(b" re f" in s or b" re\nf" in s for s in streams)
+
+    profile = {"rows": 4, "columns": {"price": {"nulls": 1, "distinct": 3, "numeric": 3, "max_length": 5}}}
+    bench = {"engine": "columnar", "rows": 4, "repeat": 2, "read_seconds": 0.1, "clean_seconds": 0.2,
+             "rows_per_second": 20.0, "timings": [[0.1, 0.2], [0.12, 0.25]]}
+    for name, built in (("profile.pdf", profile_report(profile, "orders.csv")), ("bench.pdf", bench_report(bench))):
+        renderer.render(built, str(tmp_path / name))
+        assert (tmp_path / name).read_bytes().startswith(b"%PDF")
+
+
+def test_render_batch(tmp_path):
+    from data_cleaner_pro.report.batch import render_batch
+
+    results = {"total_tests": 1, "test_cases": [{"description": "price", "passed": True, "execution_time": 3}]}
+    jobs = [(results, "cleaning", str(tmp_path / f"shop_{i}.pdf")) for i in range(4)]
+    jobs.append(({}, "ecommerce", str(tmp_path / "broken.pdf")))
+    outcome = render_batch(jobs, workers=2, style="simple")
+
+    assert [r["output"] for r in outcome] == [job[2] for job in jobs]
+    assert all("error" not in r for r in outcome[:4]) and "KeyError" in outcome[4]["error"]
+    # 输出经临时文件改名写入，失败的任务不留下文件
+    assert sorted(p.name for p in tmp_path.iterdir()) == [f"shop_{i}.pdf" for i in range(4)]
+    assert (tmp_path / "shop_3.pdf").read_bytes().startswith(b"%PDF")
+
+
+def test_section_cache_reuses_unchanged_sections(tmp_path):
+    from datetime import datetime, timezone
+
+    import pandas as pd
+
+    from data_cleaner_pro.report.fonts import FontRegistry
+    from data_cleaner_pro.report.renderer import STYLES
+    from data_cleaner_pro.report.sections import SectionCache
+
+    font = tmp_path / "cjk.ttf"
+    build_font(font)
+
+    class FixedRenderer(ReportRenderer):
+        def new_document(self, title):
+            pdf = super().new_document(title)
+            pdf.generated = "2024-01-01 00:00:00"
+            pdf.set_creation_date(datetime(2024, 1, 1, tzinfo=timezone.utc))
+            return pdf
+
+    def build(speedup):
+        report = Report("报告")
+        report.section("A 报告").table(["A", "B"], pd.DataFrame({"A": range(120), "B": ["中文"] * 120}))
+        report.section("B").chart(["A", "B"], [1, speedup])
+        report.section("C").bullets(["AB", "中文"] * 3)
+        return report
+
+    for name, style in (("simple", STYLES["simple"]), ("ttf", STYLES["cjk"].replace(unicode_font=str(font)))):
+        renderer = FixedRenderer(style, FontRegistry(str(tmp_path / "fonts")))
+        cache = SectionCache(str(tmp_path / "sections" / name))
+
+        def render(speedup, output, section_cache):
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                renderer.render(build(speedup), str(tmp_path / output), cache=section_cache)
+            return (tmp_path / output).read_bytes()
+
+        cold = render(1, "cold.pdf", cache)
+        assert (cache.hits, cache.misses) == (0, 3)
+        assert render(1, "warm.pdf", cache) == cold
+        assert cache.hits == 3
+        # 只有 B 章节变化：A、C 复用缓存，输出与完整重新排版相同
+        changed = render(2, "changed.pdf", cache)
+        assert (cache.hits, cache.misses) == (5, 4)
+        assert changed == render(2, "full.pdf", SectionCache(str(tmp_path / "fresh" / name)))
+
+
+def test_core_font_text_sanitizer_and_cjk_fallback(tmp_path, monkeypatch):
+    from data_cleaner_pro.report.fonts import FontRegistry
+    from data_cleaner_pro.report.renderer import CJK_FAMILY, STYLES, ReportPDF
+    from data_cleaner_pro.report.text import get_table, sanitize
+
+    assert sanitize("plain", get_table()) == ("plain", False)
+    assert sanitize("中文 — “café”…", get_table()) == ('   - "cafe"...', True)
+    assert sanitize("中文 — café", get_table('latin-1'), '?') == ("?? - café", True)
+
+    monkeypatch.setenv("DATA_CLEANER_FONT", str(tmp_path / "missing.ttf"))
+    monkeypatch.setattr("data_cleaner_pro.report.fonts.CJK_FONT_PATHS", [])
+    monkeypatch.setattr("data_cleaner_pro.report.fonts.FONT_DIRS", [])
+    pdf = ReportPDF("Report", STYLES["basic"], FontRegistry(str(tmp_path / "none")))
+    pdf.add_page()
+    # 找不到中文字体时与原 BasicPDFReport 一样替换为空格
+    assert pdf.clean_text("价格 Price") == "   Price"
+    assert pdf.cjk_family is False
+
+    font = tmp_path / "cjk.ttf"
+    build_font(font)
+    monkeypatch.setenv("DATA_CLEANER_FONT", str(font))
+    pdf = ReportPDF("Report", STYLES["basic"], FontRegistry(str(tmp_path / "fonts")))
+    pdf.add_page()
+    pdf.paragraph("ABC")
+    assert pdf.cjk_family is None
+    # 内容需要时改用缓存的中文字体，之后的样式字体都换成中文字体
+    pdf.paragraph("中文 ABC")
+    assert pdf.cjk_family == CJK_FAMILY
+    assert pdf.current_font.fontkey == CJK_FAMILY.lower()
+    pdf.table(["A", "B"], [["中文", "1"]])
+    assert pdf.current_font.fontkey == CJK_FAMILY.lower()
+    pdf.output(str(tmp_path / "mixed.pdf"))
+
+
+def test_output_shares_fonts_resources_and_header(tmp_path):
+    import re
+
+    from data_cleaner_pro.report.fonts import FontRegistry
+    from data_cleaner_pro.report.renderer import STYLES
+
+    font = tmp_path / "cjk.ttf"
+    build_font(font)
+    style = STYLES["cjk"].replace(unicode_font=str(font))
+    report = Report("报告")
+    report.section("中文").table(["A", "B"], [[i, "中文"] for i in range(300)])
+    output = tmp_path / "shared.pdf"
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        ReportRenderer(style, FontRegistry(str(tmp_path / "fonts"))).render(report, str(output))
+    data = output.read_bytes()
+
+    pages = data.count(b"/Type /Page\n")
+    assert pages > 3
+    # 粗体、斜体和常规样式共用一份嵌入字体
+    assert data.count(b"/FontFile2") == 1
+    # 页眉写成一个表单，每页引用；资源字典按内容共用
+    assert data.count(b"/Subtype /Form") == 1
+    assert sum(s.count(b"/I1 Do") for s in page_streams(data)) == pages
+    assert data.count(b"/ProcSet") < pages
+    # 所有流都经过压缩
+    for match in re.finditer(rb"<<((?:(?!endobj).)*?)>>\nstream\n", data, re.S):
+        assert b"/Filter" in match.group(1)
+
+
+def test_fpdf_private_api_is_available():
+    import fpdf
+    from data_cleaner_pro.report import compat
+
+    # 升级 fpdf2 后这里失败，说明报告引擎依赖的内部接口变了，需要同时调整 compat 和 requirements.txt
+    assert compat.missing_private_api() == []
+    assert compat.fpdf_supported(), f"fpdf2 {fpdf.FPDF_VERSION} 不在测试过的范围 {compat.FPDF_VERSION_RANGE}"
+
+
+def test_renderer_imports_without_fpdf_private_modules(tmp_path):
+    import subprocess
+    import sys
+
+    # 模拟 fpdf2 移动了私有模块：报告模块仍能导入，并退回标准输出
+    script = (
+        "import sys, fpdf\n"
+        "sys.modules['fpdf.output'] = sys.modules['fpdf.syntax'] = None\n"
+        "from data_cleaner_pro.report import Report, compat\n"
+        "from data_cleaner_pro.report.renderer import get_renderer\n"
+        "from data_cleaner_pro.report.sections import SectionCache\n"
+        "assert not compat.fpdf_supported(), compat.missing_private_api()\n"
+        "report = Report('Report')\n"
+        "report.section('Data').table(['A', 'B'], [[i, 'x'] for i in range(100)])\n"
+        "get_renderer('simple').render(report, sys.argv[1], cache=SectionCache(sys.argv[2]))\n"
+    )
+    output = tmp_path / "stock.pdf"
+    subprocess.run([sys.executable, "-c", script, str(output), str(tmp_path / "sections")], check=True)
+    assert output.read_bytes().startswith(b"%PDF")
+
+
+def test_unsupported_fpdf_version_uses_stock_output(tmp_path, monkeypatch):
+    from data_cleaner_pro.report import compat
+    from data_cleaner_pro.report.fonts import FontRegistry
+    from data_cleaner_pro.report.renderer import STYLES
+    from data_cleaner_pro.report.sections import SectionCache
+
+    assert compat.version_supported("2.8.9") and not compat.version_supported("2.9.0")
+    assert not compat.version_supported("2.7.9")
+
+    font = tmp_path / "cjk.ttf"
+    build_font(font)
+    style = STYLES["cjk"].replace(unicode_font=str(font))
+    report = Report("报告")
+    report.section("中文").table(["A", "B"], [[i, "中文"] for i in range(300)])
+    output = tmp_path / "stock.pdf"
+    cache = SectionCache(tmp_path / "sections")
+    monkeypatch.setattr(compat, "version_supported", lambda version=None: False)
+    compat.fpdf_supported.cache_clear()
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            renderer = ReportRenderer(style, FontRegistry(str(tmp_path / "fonts")))
+            renderer.render(report, str(output), cache=cache)
+            renderer.render(report, str(output), cache=cache)
+    finally:
+        compat.fpdf_supported.cache_clear()
+    data = output.read_bytes()
+
+    # 章节缓存不再记录和回放排版状态
+    assert cache.hits == 0 and not (tmp_path / "sections").exists()
+    # 不再覆盖 fpdf 的私有输出方法：各样式各自嵌入字体，页眉不做成表单
+    assert data.count(b"/Type /Page\n") > 3
+    assert data.count(b"/FontFile2") == 3
+    assert b"/Subtype /Form" not in data
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+"""
+清洗规则测试
+"""
+
+import pandas as pd
+
+from data_cleaner_pro import DataCleaner
+
+
+def make_orders():
+    """构造包含重复提交的订单数据"""
+    return pd.DataFrame({
+        '订单号': ['ODR001', 'ODR002', 'ODR003', 'ODR004', 'ODR005', 'ODR006'],
+        '用户ID': ['U001', 'U001', 'U002', 'U001', 'U001', 'U002'],
+        '商品名称': ['iPhone 15 Pro', 'iPhone 15 Pro', 'iPhone 15 Pro', 'iPhone 15 Pro', 'Magic Mouse', 'iPhone 15 Pro'],
+        '价格': ['¥4999', '4999', '4999元', '4999', '699', '4999'],
+        '购买时间': ['2024-03-01 10:00:00', '2024-03-01 10:00:20', '2024.3.1 12时',
+                 '2024-03-01 10:05:00', '2024-03-01 10:00:10', '2024-03-01 12:00:30'],
+        '手机号': ['13812345678', '123456', None, '15012345678', 'abc12345678', '13912345678'],
+    })
+
+
+def test_basic_rules():
+    df = DataCleaner(make_orders()).auto_clean({
+        '价格': {'method': 'extract_number', 'output_col': '价格_clean'},
+        '购买时间': {'method': 'standardize_datetime', 'output_col': '购买时间_clean'},
+        '手机号': {'method': 'validate_phone', 'output_col': '手机号_valid'},
+    })
+
+    assert df['价格_clean'].tolist() == [4999.0, 4999.0, 4999.0, 4999.0, 699.0, 4999.0]
+    assert df['购买时间_clean'][2] == '2024-03-01 12:00:00'
+    assert df['手机号_valid'].tolist() == [True, False, False, True, False, True]
+
+
+def test_deduplicate_near_clusters():
+    spec = {
+        '价格': {'method': 'extract_number', 'output_col': '价格_clean'},
+        '购买时间': {'method': 'standardize_datetime', 'output_col': '购买时间_clean'},
+        '购买时间_clean': {'method': 'deduplicate_near', 'by': ['用户ID', '商品名称', '价格_clean'],
+                         'window': 60},
+    }
+    df = DataCleaner(make_orders()).auto_clean(spec)
+    clusters = df['重复簇'].tolist()
+
+    # 同一用户同一商品20秒内重复提交
+    assert clusters[0] == clusters[1]
+    # 超出时间窗口、不同商品、不同用户都不算重复
+    assert len({clusters[0], clusters[3], clusters[4], clusters[2]}) == 4
+    # U002 两单相差30秒（12:00:00 与 12:00:30）
+    assert clusters[2] == clusters[5]
+
+
+def test_deduplicate_near_keep():
+    spec = {
+        '价格': {'method': 'extract_number', 'output_col': '价格_clean'},
+        '购买时间': {'method': 'standardize_datetime', 'output_col': '购买时间_clean'},
+        '购买时间_clean': {'method': 'deduplicate_near', 'by': ['用户ID', '商品名称', '价格_clean'],
+                         'window': '1min', 'keep': 'last'},
+    }
+    df = DataCleaner(make_orders()).auto_clean(spec)
+    assert df['订单号'].tolist() == ['ODR002', 'ODR004', 'ODR005', 'ODR006']
+
+
+def test_cluster_rule_metrics_use_default_output_column():
+    from data_cleaner_pro.gates import output_column
+    from data_cleaner_pro.metrics import clean_with_metrics
+
+    spec = {
+        '价格': {'method': 'extract_number', 'output_col': '价格_clean'},
+        '购买时间': {'method': 'standardize_datetime', 'output_col': '购买时间_clean'},
+        '购买时间_clean': {'method': 'deduplicate_near', 'by': ['用户ID', '商品名称', '价格_clean'],
+                         'window': 60},
+    }
+    cleaned, metrics = clean_with_metrics(make_orders(), spec)
+    near = metrics['rules'][-1]
+    # ODR002 与 ODR001、ODR006 与 ODR003 同簇
+    assert near['issues'] == near['fixed'] == 2 and near['invalid'] == 0
+    assert output_column('收货地址', {'method': 'deduplicate_fuzzy'}) == '相似簇'
+    assert output_column('购买时间_clean', spec['购买时间_clean']) == '重复簇'
+
+
+def test_deduplicate_fuzzy():
+    df = pd.DataFrame({'收货地址': [
+        '北京市朝阳区建国路88号SOHO现代城A座1201',
+        '北京市朝阳区建国路88号 SOHO现代城A座1201室',
+        '上海市浦东新区世纪大道100号',
+        None,
+        '上海市浦东新区世纪大道100号',
+        '深圳市南山区科技园南区',
+    ]})
+    result = DataCleaner(df).auto_clean({
+        '收货地址': {'method': 'deduplicate_fuzzy', 'threshold': 0.7},
+    })
+    clusters = result['相似簇'].tolist()
+    assert clusters[0] == clusters[1]
+    assert clusters[2] == clusters[4]
+    assert len({clusters[0], clusters[2], clusters[3], clusters[5]}) == 4
+
+
+def test_fuzzy_signatures_parallel_match_serial():
+    from data_cleaner_pro.fuzzy import minhash_signatures, fuzzy_clusters
+
+    texts = [f'杭州市西湖区文三路{i % 50}号' for i in range(300)]
+    serial = fuzzy_clusters(texts, block_size=64)
+    parallel = fuzzy_clusters(texts, block_size=64, n_jobs=2)
+    assert (serial == parallel).all()
+    assert minhash_signatures(texts[:3]).shape == (3, 64)
+
+
+def test_lsh_verifies_every_pair_in_a_bucket():
+    import numpy as np
+    from data_cleaner_pro.fuzzy import MAX_PAIRWISE_BUCKET, lsh_clusters
+
+    # 三行在第一段同桶；a、c 相似（7/8），中间的 b 与两者都不相似，也要比较 a-c
+    signatures = np.array([[1, 1, 1, 1, 2, 2, 2, 2],
+                           [1, 1, 1, 1, 9, 9, 9, 9],
+                           [1, 1, 1, 1, 2, 2, 2, 3]], dtype=np.uint32)
+    assert lsh_clusters(signatures, threshold=0.8, bands=2).tolist() == [0, 1, 0]
+
+    # 超过 MAX_PAIRWISE_BUCKET 的大桶与桶内代表比较，首尾两行仍能合并
+    size = MAX_PAIRWISE_BUCKET + 8
+    signatures = np.ones((size, 8), dtype=np.uint32)
+    signatures[:, 4:] = np.arange(10, 10 + size * 4).reshape(size, 4)
+    signatures[-1, 4:] = signatures[0, 4:]
+    signatures[-1, 7] = 1
+    labels = lsh_clusters(signatures, threshold=0.8, bands=2)
+    assert labels[0] == labels[-1]
+    assert len(set(labels.tolist())) == size - 1
+
+
+def test_learned_plan_keeps_results():
+    from data_cleaner_pro.learning import learn_spec
+
+    df = pd.DataFrame({
+        '价格': ['4999', '699', '¥129', None, '免费'],
+        '购买时间': ['2024.3.1 12时', '2024.3.2 12时', '2024/3/3', None, '2024-03-01 10:00:00'],
+    }, dtype=str)
+    spec = {
+        '价格': {'method': 'extract_number', 'output_col': '价格_clean'},
+        '购买时间': {'method': 'standardize_datetime', 'output_col': '购买时间_clean'},
+    }
+    learned, report = learn_spec(df, spec)
+    assert learned['价格']['fast_path'] is True
+    assert learned['购买时间']['formats'][0] == '%Y.%m.%d %H时'
+    assert report['购买时间']['format_counts']['%Y.%m.%d %H时'] == 2
+
+    expected = DataCleaner(df).auto_clean(spec)
+    pd.testing.assert_frame_equal(DataCleaner(df).auto_clean(learned), expected)
+
+
+def test_canonical_fast_path_matches_full_rules():
+    df = pd.DataFrame({
+        '价格': ['4999', '¥699', None, '12.5', '０９'],
+        '购买时间': ['2024-03-01 10:00:00', '2024-02-30 10:00:00', '2024-03-1  10:00:00',
+                 None, '2024/3/2'],
+    }, dtype=str)
+    spec = {
+        '价格': {'method': 'extract_number', 'output_col': '价格_clean'},
+        '购买时间': {'method': 'standardize_datetime', 'output_col': '购买时间_clean'},
+    }
+    slow = {column: dict(options, fast_path=False) for column, options in spec.items()}
+    fast = DataCleaner(df).auto_clean(spec)
+    pd.testing.assert_frame_equal(fast, DataCleaner(df).auto_clean(slow))
+    assert fast['价格_clean'].tolist()[:2] == [4999.0, 699.0]
+    assert fast['购买时间_clean'][0] == '2024-03-01 10:00:00'
+    assert fast['购买时间_clean'][4] == '2024-03-02 00:00:00'
+
+
+def test_canonical_fast_path_with_duplicate_index():
+    df = pd.DataFrame({'价格': ['¥699', '12元', '4999', '¥5']}, index=[0, 0, 1, 1], dtype=str)
+    spec = {'价格': {'method': 'extract_number', 'output_col': '价格_clean'}}
+    fast = DataCleaner(df).auto_clean(spec)
+    pd.testing.assert_frame_equal(fast, DataCleaner(df).auto_clean({'价格': dict(spec['价格'], fast_path=False)}))
+    assert fast['价格_clean'].tolist() == [699.0, 12.0, 4999.0, 5.0]
+
+
+def test_canonical_predicates():
+    from data_cleaner_pro.rules import datetime_canonical, fixed_width_mask
+
+    raw = pd.Series(['2024-03-01 10:00:00', '2024-03-1  10:00:00', '2024-02-30 10:00:00', None],
+                    dtype='string')
+    assert fixed_width_mask(raw, 'dddd-dd-dd dd:dd:dd').tolist() == [True, False, True, False]
+    mask, values = datetime_canonical(raw)
+    assert mask.tolist() == [True, False, False, False]
+    assert list(values) == ['2024-03-01 10:00:00']
+    # 输出格式含定长以外的指令时不走快速路径
+    assert datetime_canonical(raw, format='%Y年%m月%d日 %p') is None
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+"""
+流水线分块清洗测试
+"""
+
+import pandas as pd
+import pytest
+
+from data_cleaner_pro import DataCleaner, clean_csv
+
+
+SPEC = {
+    '价格': {'method': 'extract_number', 'output_col': '价格_clean'},
+    '手机号': {'method': 'validate_phone', 'output_col': '手机号_valid'},
+    '订单号': {'method': 'deduplicate', 'keep': 'first'},
+}
+
+
+def write_orders(path, num_records=500):
+    """写出带跨块重复订单号的测试数据"""
+    df = pd.DataFrame({
+        '订单号': [f'ODR{i % 400:06d}' for i in range(num_records)],
+        '价格': [f'¥{100 + i}' if i % 3 else f'{100 + i}元' for i in range(num_records)],
+        '手机号': ['13812345678' if i % 7 else '123456' for i in range(num_records)],
+    })
+    df.to_csv(path, index=False, encoding='utf-8')
+    return df
+
+
+def test_clean_csv_preserves_order_and_dedupes_across_chunks(tmp_path):
+    source = tmp_path / 'orders.csv'
+    output = tmp_path / 'cleaned.csv'
+    write_orders(source)
+
+    stats = clean_csv(source, output, SPEC, chunksize=37, workers=2, queue_size=2)
+
+    expected = DataCleaner(pd.read_csv(source, dtype=str)).auto_clean(SPEC)
+    result = pd.read_csv(output, dtype=str)
+    assert stats['chunks'] == 14
+    assert stats['rows_in'] == 500
+    assert stats['rows_out'] == 400
+    assert result['订单号'].tolist() == expected['订单号'].tolist()
+    assert result['价格_clean'].astype(float).tolist() == expected['价格_clean'].tolist()
+
+
+def test_clean_csv_single_worker(tmp_path):
+    source = tmp_path / 'orders.csv'
+    output = tmp_path / 'cleaned.csv'
+    write_orders(source, 50)
+
+    stats = clean_csv(source, output, SPEC, chunksize=10, workers=1)
+    assert stats['rows_out'] == 50
+    assert pd.read_csv(output)['手机号_valid'].sum() == 42
+
+
+def test_near_dedupe_across_chunks_is_rejected(tmp_path):
+    source = tmp_path / 'events.csv'
+    output = tmp_path / 'cleaned.csv'
+    # 同一用户相隔 10 秒的两次点击分别落在第 1、2 块
+    pd.DataFrame({
+        '用户ID': ['U1', 'U2', 'U3', 'U1'],
+        '时间': ['2024-01-01 10:00:00', '2024-01-01 11:00:00', '2024-01-01 12:00:00',
+               '2024-01-01 10:00:10'],
+    }).to_csv(source, index=False)
+    spec = {'时间': {'method': 'deduplicate_near', 'by': ['用户ID'], 'window': 60}}
+
+    expected = DataCleaner(pd.read_csv(source, dtype=str)).auto_clean(spec)
+    assert expected['重复簇'].iloc[0] == expected['重复簇'].iloc[3]
+    with pytest.raises(ValueError, match='deduplicate_near'):
+        clean_csv(source, output, spec, chunksize=2, workers=1)
+    assert not output.exists()
+
+
+def test_resume_from_checkpoint_is_byte_identical(tmp_path):
+    from data_cleaner_pro import rule
+
+    source = tmp_path / 'orders.csv'
+    df = write_orders(source)
+    df.loc[df.index % 5 == 0, '手机号'] = None
+    df['年龄'] = [None if i % 4 == 0 else str(20 + i % 30) for i in range(len(df))]
+    df.to_csv(source, index=False)
+
+    spec = {
+        '价格': {'method': 'extract_number', 'output_col': '价格_clean'},
+        '年龄': {'method': 'fillna', 'strategy': 'mean'},
+        '手机号': {'method': 'fillna', 'value': '未知'},
+        '订单号': {'method': 'deduplicate', 'keep': 'first'},
+    }
+    reference = tmp_path / 'reference.csv'
+    clean_csv(source, reference, spec, chunksize=40, workers=1, encoding='utf-8-sig')
+
+    # 第 6 块清洗时模拟进程崩溃
+    calls = {'count': 0}
+
+    @rule('crash_once')
+    def crash_once(df, column):
+        calls['count'] += 1
+        if calls['count'] == 6:
+            raise RuntimeError('killed')
+        return df
+
+    crashing = dict(spec, 价格_clean={'method': 'crash_once'})
+    output = tmp_path / 'cleaned.csv'
+    checkpoint = tmp_path / 'job.ckpt'
+    try:
+        clean_csv(source, output, crashing, chunksize=40, workers=1, encoding='utf-8-sig',
+                  checkpoint=checkpoint)
+    except RuntimeError:
+        pass
+    assert checkpoint.exists()
+
+    # 规则顺序不同结果可能不同，不能沿用断点
+    with pytest.raises(ValueError, match='不一致'):
+        clean_csv(source, output, dict(reversed(list(crashing.items()))), chunksize=40, workers=1,
+                  encoding='utf-8-sig', checkpoint=checkpoint, resume=True)
+
+    stats = clean_csv(source, output, crashing, chunksize=40, workers=1, encoding='utf-8-sig',
+                      checkpoint=checkpoint, resume=True)
+    assert stats['rows_in'] == 300
+    assert output.read_bytes() == reference.read_bytes()
+    assert not checkpoint.exists()
+
+
+def test_quality_gate_aborts_early(tmp_path):
+    from data_cleaner_pro.gates import QualityGateError
+
+    source = tmp_path / 'orders.csv'
+    output = tmp_path / 'cleaned.csv'
+    df = write_orders(source, num_records=2000)
+    # 后半部分价格列错位成文本
+    df.loc[1000:, '价格'] = '未知'
+    df.to_csv(source, index=False, encoding='utf-8')
+
+    gates = [{'column': '价格', 'metric': 'invalid_ratio', 'max': 0.3, 'min_rows': 100}]
+    with pytest.raises(QualityGateError) as failed:
+        clean_csv(source, output, SPEC, chunksize=100, workers=1, queue_size=1, gates=gates)
+    gate = failed.value.profile['gates'][0]
+    assert gate['value'] > 0.3
+    assert gate['samples'][0] == '未知'
+    # 越过阈值后立即停止，没有读完整个文件
+    assert failed.value.profile['chunks'] < 20
+
+    stats = clean_csv(source, output, SPEC, chunksize=100, workers=1,
+                      gates=[{'column': '手机号', 'metric': 'invalid_ratio', 'max': 0.2}])
+    assert stats['gates'][0]['invalid'] == 2000 // 7 + 1
+
+    with pytest.raises(QualityGateError, match='金额') as failed:
+        clean_csv(source, output, SPEC, chunksize=100, workers=1,
+                  gates=[{'column': '金额', 'metric': 'null_ratio', 'max': 0.1}])
+    assert failed.value.profile['gates'][0]['missing']
+
+    # 写出阶段才生成的列在工作进程中还没有，闸门直接拒绝
+    filled = dict(SPEC, 手机号={'method': 'fillna', 'value': '未知', 'output_col': '手机号_filled'})
+    for column in ('手机号', '手机号_filled'):
+        with pytest.raises(ValueError, match='写出阶段'):
+            clean_csv(source, output, filled, chunksize=100, workers=1,
+                      gates=[{'column': column, 'metric': 'invalid_ratio', 'max': 0.1}])
+
+
+def test_spillable_key_set(tmp_path):
+    import numpy as np
+    from data_cleaner_pro.spill import SpillableKeySet
+
+    keys = SpillableKeySet(max_keys=10, directory=tmp_path / 'spill')
+    for start in range(0, 200, 7):
+        batch = np.arange(start, start + 7, dtype=np.uint64)
+        keys.update(batch[~keys.contains(batch)])
+    assert len(keys) == 203
+    assert keys.spills > 8 and len(keys.runs) <= 9
+    probe = np.array([0, 150, 202, 203, 2 ** 63], dtype=np.uint64)
+    assert keys.contains(probe).tolist() == [True, True, True, False, False]
+    keys.close()
+    assert not list((tmp_path / 'spill').iterdir())
+
+
+def test_memory_budget_sizes_chunks_and_spills(tmp_path):
+    source = tmp_path / 'orders.csv'
+    output = tmp_path / 'cleaned.csv'
+    write_orders(source, num_records=5000)
+
+    stats = clean_csv(source, output, SPEC, workers=1, max_memory='100KB')
+    expected = DataCleaner(pd.read_csv(source, dtype=str)).auto_clean(SPEC)
+    result = pd.read_csv(output, dtype=str)
+    assert result['订单号'].tolist() == expected['订单号'].tolist()
+    # 预算很小：块大小取下限，去重状态溢写到磁盘
+    assert stats['chunksize'] == 1000
+    assert stats['spills'] > 0
+
+    stats = clean_csv(source, output, SPEC, max_memory='4GB')
+    assert stats['chunksize'] > 1000
+    assert pd.read_csv(output, dtype=str)['订单号'].tolist() == expected['订单号'].tolist()
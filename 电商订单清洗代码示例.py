@@ -189,6 +189,8 @@ def datacleaner_pro_method(df):
             '价格': {'method': 'extract_number', 'output_col': '价格_clean'},
             '购买时间': {'method': 'standardize_datetime', 'format': '%Y-%m-%d %H:%M:%S', 'output_col': '购买时间_clean'},
             '手机号': {'method': 'validate_phone', 'country_code': 'CN', 'output_col': '手机号_valid'},
+            '购买时间_clean': {'method': 'deduplicate_near', 'by': ['用户ID', '商品名称', '价格_clean'],
+                             'window': 60, 'output_col': '重复簇', 'keep': 'first'},
             '订单号': {'method': 'deduplicate', 'keep': 'first'}
         })
         